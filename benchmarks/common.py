@@ -0,0 +1,90 @@
+"""Shared setup for the benchmark scripts.
+
+Benchmarks run against the test settings with a throw-away in-memory SQLite
+database, so they never touch a developer's ``db.sqlite3``. Run them from the
+repository root, e.g. ``python -m benchmarks.shared_salt``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class BenchPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 with an adjustable iteration count (see ``use_pbkdf2``)."""
+
+    iterations = PBKDF2PasswordHasher.iterations
+
+
+def setup_django(settings_module: str = "example_project.settings_test") -> None:
+    for p in (ROOT / "src", ROOT):
+        if str(p) not in sys.path:
+            sys.path.insert(0, str(p))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+
+    django.setup()
+    # amnesia_initialize() trips the set_password() drift warning; keep output clean.
+    logging.getLogger("django_honeywords.signals").setLevel(logging.ERROR)
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def use_pbkdf2(iterations: int) -> None:
+    """Switch PASSWORD_HASHERS to PBKDF2-SHA256 with the given iteration count."""
+    from django.conf import settings
+    from django.test.signals import setting_changed
+
+    BenchPBKDF2PasswordHasher.iterations = iterations
+    settings.PASSWORD_HASHERS = ["benchmarks.common.BenchPBKDF2PasswordHasher"]
+    # Clears Django's cached hasher list.
+    setting_changed.send(sender=None, setting="PASSWORD_HASHERS", value=settings.PASSWORD_HASHERS, enter=True)
+
+
+HASHERS = ("pbkdf2", "md5", "argon2")
+
+
+def use_hasher(name: str, iterations: int) -> None:
+    """Switch PASSWORD_HASHERS to one of HASHERS (iterations applies to pbkdf2)."""
+    if name == "pbkdf2":
+        use_pbkdf2(iterations)
+        return
+    if name == "argon2":
+        try:
+            import argon2  # noqa: F401
+        except ImportError:
+            raise SystemExit("--hasher argon2 needs argon2-cffi (pip install argon2-cffi)") from None
+        path = "django.contrib.auth.hashers.Argon2PasswordHasher"
+    elif name == "md5":
+        path = "django.contrib.auth.hashers.MD5PasswordHasher"
+    else:
+        raise ValueError(f"unknown hasher: {name!r}")
+
+    from django.conf import settings
+    from django.test.signals import setting_changed
+
+    settings.PASSWORD_HASHERS = [path]
+    setting_changed.send(sender=None, setting="PASSWORD_HASHERS", value=settings.PASSWORD_HASHERS, enter=True)
+
+
+def time_call(fn, *, repeat: int) -> float:
+    """Median wall-clock seconds of ``repeat`` calls to ``fn``."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
@@ -0,0 +1,67 @@
+"""Login latency of amnesia_v1 vs amnesia_v2 (shared salt) for several k.
+
+    python -m benchmarks.shared_salt [--iterations N] [--repeat R] [--k 20 50 100]
+
+Both formats use PBKDF2-SHA256 at the same iteration count, so the numbers
+compare like for like: v1 pays up to k derivations per login, v2 pays one.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+
+from benchmarks.common import setup_django, time_call, use_pbkdf2
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--k", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    use_pbkdf2(args.iterations)
+
+    from django.contrib.auth import get_user_model
+
+    from django_honeywords.amnesia_service import amnesia_check, amnesia_initialize
+    from django_honeywords.models import AmnesiaSet
+
+    User = get_user_model()
+    rows = []
+    for k in args.k:
+        row = {"k": k}
+        for version in AmnesiaSet.ALGORITHMS:
+            user = User.objects.create_user(username=f"bench_{version}_{k}")
+            amnesia_initialize(
+                user, "Correct-Horse-42", k=k, p_remark=0.0,
+                algorithm_version=version, iterations=args.iterations,
+            )
+            user = User.objects.get(pk=user.pk)
+            row[f"{version}_invalid_ms"] = 1000 * time_call(
+                lambda: amnesia_check(user, "wrong-password"), repeat=args.repeat
+            )
+            row[f"{version}_success_ms"] = 1000 * time_call(
+                lambda: amnesia_check(user, "Correct-Horse-42"), repeat=args.repeat
+            )
+        rows.append(row)
+
+    if args.json:
+        print(json.dumps({"iterations": args.iterations, "results": rows}, indent=2))
+        return 0
+
+    print(f"PBKDF2-SHA256, {args.iterations} iterations, median of {args.repeat}")
+    print(f"{'k':>5} {'v1 invalid':>12} {'v2 invalid':>12} {'v1 success':>12} {'v2 success':>12} {'speedup':>8}")
+    for r in rows:
+        speedup = r["amnesia_v1_invalid_ms"] / r["amnesia_v2_invalid_ms"]
+        print(
+            f"{r['k']:>5} {r['amnesia_v1_invalid_ms']:>10.1f}ms {r['amnesia_v2_invalid_ms']:>10.1f}ms "
+            f"{r['amnesia_v1_success_ms']:>10.1f}ms {r['amnesia_v2_success_ms']:>10.1f}ms {speedup:>7.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,387 @@
+"""Benchmark suite with a tracked baseline.
+
+    python -m benchmarks.suite [--hasher pbkdf2|md5|argon2] [--iterations N] [--k K]
+                               [--repeat R] [--rounds N] [--only PATTERN ...] [--output results.json]
+                               [--baseline benchmarks/baseline.json] [--update-baseline]
+                               [--tolerance 0.3] [--queries-only]
+
+Covers amnesia_initialize, amnesia_check on each verdict (invalid, breach,
+success) and the remark branch, HoneywordsBackend.authenticate end to end,
+log_event, and SimpleMutationGenerator.honeywords across k and password
+lengths. Each case reports the median and p95 latency and the queries per
+call.
+
+With --baseline, results are compared against the stored file and the
+command exits 1 if a case got slower than the tolerance allows or runs more
+queries. Query counts are exact and machine-independent. Latencies are only
+comparable on the machine that wrote the baseline, so CI should keep its own
+baseline or pass --queries-only.
+"""
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from benchmarks.common import HASHERS, ROOT, setup_django, use_hasher
+
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+PASSWORD = "Correct-Horse-42"
+# Settings that change what a case measures; results are only compared
+# against a baseline recorded with the same values.
+CONFIG_KEYS = ("hasher", "iterations", "k")
+VERSIONS = ("amnesia_v1", "amnesia_v2")
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[["Context"], Callable[[], object]]
+    repeat_factor: int = 1
+
+
+CASES: list[Case] = []
+
+
+def case(name: str, *, repeat_factor: int = 1):
+    def register(setup):
+        CASES.append(Case(name, setup, repeat_factor))
+        return setup
+    return register
+
+
+class Words:
+    """The real password plus k - 1 known decoys, so honeyword logins can be timed."""
+
+    def honeywords(self, real: str, k: int) -> list[str]:
+        return [real] + [f"{real}~{i}" for i in range(1, k)]
+
+
+class FirstRNG:
+    """Never marks decoys (random() is high) and never remarks unless p_remark is 1."""
+
+    def random(self) -> float:
+        return 0.999
+
+    def randbelow(self, n: int) -> int:
+        return 0
+
+
+class Context:
+    def __init__(self, *, k: int, iterations: int, version: str = "amnesia_v1"):
+        self.k = k
+        self.iterations = iterations
+        self.version = version  # set format used by the backend cases
+        self._users = 0
+
+    def user(self, version: str | None = None, *, p_remark: float = 0.0):
+        """A fresh user, with an Amnesia set of the given version if any."""
+        from django.contrib.auth import get_user_model
+
+        from django_honeywords.amnesia_service import amnesia_initialize
+
+        self._users += 1
+        user = get_user_model().objects.create_user(username=f"bench{self._users}")
+        if version is not None:
+            amnesia_initialize(
+                user, PASSWORD, k=self.k, p_mark=0.0, p_remark=p_remark, generator=Words(),
+                real_index=0, rng=FirstRNG(), algorithm_version=version, iterations=self.iterations,
+            )
+        return user
+
+    def reload(self, user):
+        return type(user).objects.select_related("amnesia_set").get(pk=user.pk)
+
+    def request(self):
+        from django.test import RequestFactory
+
+        return RequestFactory().post("/login/", REMOTE_ADDR="198.51.100.7", HTTP_USER_AGENT="bench")
+
+
+def _register_service_cases():
+    for version in VERSIONS:
+        def initialize(ctx, version=version):
+            from django_honeywords.amnesia_service import amnesia_initialize
+
+            user = ctx.user()
+            return lambda: amnesia_initialize(
+                user, PASSWORD, k=ctx.k, p_mark=0.1, p_remark=0.0,
+                algorithm_version=version, iterations=ctx.iterations,
+            )
+
+        case(f"initialize[{version}]")(initialize)
+
+        for verdict, password, p_remark in (
+            ("invalid", "wrong-password", 0.0),
+            ("breach", f"{PASSWORD}~1", 0.0),
+            ("success", PASSWORD, 0.0),
+            ("success_remark", PASSWORD, 1.0),
+        ):
+            def check(ctx, version=version, verdict=verdict, password=password, p_remark=p_remark):
+                from django_honeywords.amnesia_service import amnesia_check
+
+                user = ctx.reload(ctx.user(version, p_remark=p_remark))
+                rng = FirstRNG()
+
+                def run():
+                    result = amnesia_check(user, password, rng=rng)
+                    assert result == verdict.split("_")[0], (verdict, result)
+
+                return run
+
+            case(f"check[{version}-{verdict}]")(check)
+
+
+_register_service_cases()
+
+
+@case("backend[real]")
+def backend_real(ctx):
+    from django.contrib.auth import authenticate
+
+    user, request = ctx.user(ctx.version), ctx.request()
+    return lambda: authenticate(request, username=user.username, password=PASSWORD)
+
+
+@case("backend[invalid]")
+def backend_invalid(ctx):
+    from django.contrib.auth import authenticate
+
+    user, request = ctx.user(ctx.version), ctx.request()
+    return lambda: authenticate(request, username=user.username, password="wrong-password")
+
+
+@case("backend[unknown_user]")
+def backend_unknown(ctx):
+    from django.contrib.auth import authenticate
+
+    request = ctx.request()
+    return lambda: authenticate(request, username="nobody", password=PASSWORD)
+
+
+@case("log_event", repeat_factor=5)
+def log_event_case(ctx):
+    from django_honeywords.events import log_event
+    from django_honeywords.models import HoneywordEvent
+
+    user, request = ctx.user(), ctx.request()
+    return lambda: log_event(
+        user=user, username=user.username, outcome=HoneywordEvent.OUTCOME_INVALID, request=request
+    )
+
+
+def _register_generator_cases():
+    for k in (20, 50, 100):
+        for length in (8, 16, 32):
+            def honeywords(ctx, k=k, length=length):
+                from django_honeywords.generator import SimpleMutationGenerator
+
+                generator = SimpleMutationGenerator()
+                real = ("Tr0ub4dor&3xyz!" * 3)[:length]
+                return lambda: generator.honeywords(real, k)
+
+            case(f"generator[k={k},len={length}]", repeat_factor=5)(honeywords)
+
+
+_register_generator_cases()
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _timed(fn, n: int) -> tuple[list[float], list[int]]:
+    """Milliseconds and query counts of n calls to fn."""
+    from django.db import connection
+
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    times, counts = [], []
+    with connection.execute_wrapper(count):
+        for _ in range(n):
+            before = queries
+            t0 = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - t0) * 1000)
+            counts.append(queries - before)
+    return times, counts
+
+
+def run_cases(cases: list[Case], ctx: Context, *, repeat: int, rounds: int) -> dict[str, dict]:
+    """Measure cases in interleaved rounds so a burst of machine noise is
+    spread over every case instead of landing on one."""
+    fns = {}
+    for c in cases:
+        fns[c.name] = c.setup(ctx)
+        fns[c.name]()  # warm-up: caches, lazy imports, first-query compilation
+    samples = {c.name: ([], []) for c in cases}
+    for _ in range(rounds):
+        for c in cases:
+            times, counts = _timed(fns[c.name], repeat * c.repeat_factor)
+            samples[c.name][0].extend(times)
+            samples[c.name][1].extend(counts)
+
+    results = {}
+    for c in cases:
+        times, counts = samples[c.name]
+        times.sort()
+        results[c.name] = r = {
+            "median_ms": statistics.median(times),
+            "p95_ms": _percentile(times, 95),
+            "queries": statistics.median(counts),
+            "samples": len(times),
+        }
+        print(f"{c.name:<32} {r['median_ms']:>10.3f} ms  p95 {r['p95_ms']:>10.3f} ms  {r['queries']:>4g} queries",
+              file=sys.stderr)
+    return results
+
+
+def compare(results: dict, baseline: dict, *, tolerance: float, min_delta_ms: float,
+            queries_only: bool = False) -> list[tuple[str, str, str]]:
+    """Regressions of results against baseline as (case, kind, message).
+
+    kind is "config" (the runs are not comparable), "queries" or "latency".
+    An empty list means no regressions.
+    """
+    problems = []
+    for key in CONFIG_KEYS:
+        if results["config"].get(key) != baseline["config"].get(key):
+            problems.append((
+                "config", "config",
+                f"baseline recorded with {key}={baseline['config'].get(key)!r}, "
+                f"this run used {results['config'].get(key)!r}",
+            ))
+    if problems:
+        return problems
+
+    for name, now in results["results"].items():
+        then = baseline["results"].get(name)
+        if then is None:
+            continue
+        if now["queries"] > then["queries"]:
+            problems.append((name, "queries", f"{now['queries']:g} queries per call, baseline {then['queries']:g}"))
+        if queries_only:
+            continue
+        limit = then["median_ms"] * (1 + tolerance)
+        if now["median_ms"] > limit and now["median_ms"] - then["median_ms"] > min_delta_ms:
+            change = (now["median_ms"] / then["median_ms"] - 1) * 100 if then["median_ms"] else math.inf
+            problems.append((
+                name, "latency",
+                f"median {now['median_ms']:.3f} ms, baseline {then['median_ms']:.3f} ms (+{change:.0f}%)",
+            ))
+    return problems
+
+
+def _environment() -> dict:
+    import sqlite3
+
+    import django
+
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hasher", choices=HASHERS, default="pbkdf2")
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="PBKDF2 iterations for the Django hasher and amnesia_v2 sets.")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10, help="timed calls per case and round (some cases run more)")
+    parser.add_argument("--rounds", type=int, default=3, help="interleaved passes over all cases")
+    parser.add_argument("--only", nargs="+", metavar="PATTERN", help="run cases matching these globs")
+    parser.add_argument("--output", help="write results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--baseline", nargs="?", const=str(DEFAULT_BASELINE), default=None,
+                        help=f"compare against this file (default: {DEFAULT_BASELINE.relative_to(ROOT)})")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed median slowdown (0.3 = 30%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1, help="ignore slowdowns smaller than this")
+    parser.add_argument("--queries-only", action="store_true", help="compare query counts, not latency")
+    args = parser.parse_args(argv)
+    if args.update_baseline and args.baseline is None:
+        args.baseline = str(DEFAULT_BASELINE)
+
+    setup_django()
+    use_hasher(args.hasher, args.iterations)
+
+    from django.conf import settings
+
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"AMNESIA_V2_ITERATIONS": args.iterations, "ON_HONEYWORD": "log"}
+
+    selected = [c for c in CASES if not args.only or any(fnmatch.fnmatch(c.name, p) for p in args.only)]
+
+    ctx = Context(k=args.k, iterations=args.iterations)
+    results = {
+        "config": {"hasher": args.hasher, "iterations": args.iterations, "k": args.k,
+                   "repeat": args.repeat, "rounds": args.rounds},
+        "environment": _environment(),
+        "results": {},
+    }
+    results["results"] = run_cases(selected, ctx, repeat=args.repeat, rounds=args.rounds)
+
+    status = 0
+    if args.baseline and not args.update_baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        options = {"tolerance": args.tolerance, "min_delta_ms": args.min_delta_ms, "queries_only": args.queries_only}
+        problems = compare(results, baseline, **options)
+        # A slowdown has to survive a second measurement before it counts;
+        # one noisy run should not fail the build.
+        slow = {name for name, kind, _ in problems if kind == "latency"}
+        if slow:
+            print(f"re-measuring {len(slow)} slower case(s)", file=sys.stderr)
+            results["results"].update(
+                run_cases([c for c in selected if c.name in slow], ctx, repeat=args.repeat, rounds=args.rounds)
+            )
+            problems = compare(results, baseline, **options)
+        if problems:
+            print("REGRESSIONS against " + args.baseline + ":", file=sys.stderr)
+            for name, _, message in problems:
+                print(f"  {name}: {message}", file=sys.stderr)
+            status = 1
+        else:
+            print(f"no regressions against {args.baseline}", file=sys.stderr)
+
+    if args.output == "-":
+        print(json.dumps(results, indent=2))
+    elif args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.update_baseline:
+        stored = results
+        if args.only and os.path.exists(args.baseline):
+            # Refresh only the selected cases of an existing baseline.
+            with open(args.baseline) as fh:
+                stored = json.load(fh)
+            if any(stored["config"].get(key) != results["config"].get(key) for key in CONFIG_KEYS):
+                raise SystemExit(f"{args.baseline} was recorded with a different configuration")
+            stored["results"].update(results["results"])
+            stored["environment"] = results["environment"]
+        with open(args.baseline, "w") as fh:
+            json.dump(stored, fh, indent=2)
+            fh.write("\n")
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
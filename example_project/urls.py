@@ -1,6 +1,7 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-]
\ No newline at end of file
+    path("honeywords/", include("django_honeywords.urls")),
+]
@@ -1,7 +1,30 @@
+from datetime import timedelta
+
+from django import forms
 from django.contrib import admin
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied, ValidationError
+from django.core.paginator import Paginator
+from django.core.validators import validate_ipv46_address
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html_join
 
-from .models import AmnesiaCredential, AmnesiaSet, HoneywordEvent, HoneywordUserState
+from .amnesia_service import packed_digests
+from . import policy_cache
+from .conf import get_setting
+from .models import (
+    AmnesiaCredential,
+    AmnesiaSet,
+    HoneywordEvent,
+    HoneywordInvalidCounter,
+    HoneywordRollup,
+    HoneywordUserState,
+)
+from .rollup import hourly_totals, rollup_watermark, top_keys
 
 
 # ── Inline: credentials shown inside AmnesiaSet ─────────────────────
@@ -22,14 +45,85 @@ class AmnesiaCredentialInline(admin.TabularInline):
 # ── AmnesiaSet ───────────────────────────────────────────────────────
 
 
+class AmnesiaSetAdminForm(forms.ModelForm):
+    """Edits the marks bitmask of packed sets as one checkbox per candidate."""
+
+    marked_indices = forms.TypedMultipleChoiceField(
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        label="Marked candidates",
+    )
+
+    class Meta:
+        model = AmnesiaSet
+        fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        aset = self.instance
+        if aset.pk and aset.storage == AmnesiaSet.STORAGE_PACKED:
+            self.fields["marked_indices"].choices = [(i, f"#{i}") for i in range(aset.k)]
+            self.fields["marked_indices"].initial = [i for i in range(aset.k) if aset.marks >> i & 1]
+
+    def save(self, commit=True):
+        aset = self.instance
+        if aset.storage == AmnesiaSet.STORAGE_PACKED and "marked_indices" in self.changed_data:
+            aset.marks = sum(1 << i for i in self.cleaned_data["marked_indices"])
+        return super().save(commit=commit)
+
+
 @admin.register(AmnesiaSet)
 class AmnesiaSetAdmin(admin.ModelAdmin):
-    list_display = ("user", "k", "p_mark", "p_remark", "algorithm_version", "created_at")
-    list_filter = ("algorithm_version", "k")
+    form = AmnesiaSetAdminForm
+    list_display = ("user", "k", "p_mark", "p_remark", "algorithm_version", "storage", "created_at")
+    list_filter = ("algorithm_version", "storage", "k")
     search_fields = ("user__username",)
-    readonly_fields = ("user", "k", "p_mark", "p_remark", "algorithm_version", "created_at")
+    readonly_fields = (
+        "user", "k", "p_mark", "p_remark", "algorithm_version", "storage",
+        "salt", "iterations", "created_at", "packed_candidates",
+    )
     inlines = [AmnesiaCredentialInline]
 
+    def get_fields(self, request, obj=None):
+        fields = [
+            "user", "k", "p_mark", "p_remark", "algorithm_version", "storage",
+            "salt", "iterations", "created_at",
+        ]
+        if obj is not None and obj.storage == AmnesiaSet.STORAGE_PACKED:
+            fields += ["marked_indices", "packed_candidates"]
+        return fields
+
+    def get_inlines(self, request, obj):
+        # Packed sets have no credential rows; their marks are edited on the form.
+        if obj is not None and obj.storage == AmnesiaSet.STORAGE_PACKED:
+            return []
+        return self.inlines
+
+    def packed_candidates(self, obj):
+        digests = packed_digests(obj)
+        return format_html_join(
+            "\n", "<div><code>#{}</code> {} <code>{}</code></div>",
+            ((i, "✔" if obj.marks >> i & 1 else "·", d) for i, d in enumerate(digests)),
+        )
+    packed_candidates.short_description = "Candidates"
+
+    def save_model(self, request, obj, form, change):
+        # Only the marks are editable. obj.save() would also write back the
+        # version read when the form was built, undoing concurrent remarks.
+        if obj.storage == AmnesiaSet.STORAGE_PACKED and "marked_indices" in form.changed_data:
+            # Marks and version bump in one UPDATE, as _remark writes them.
+            AmnesiaSet.objects.filter(pk=obj.pk).update(marks=obj.marks, version=F("version") + 1)
+
+    def save_related(self, request, form, formsets, change):
+        if form.instance.storage == AmnesiaSet.STORAGE_PACKED:
+            super().save_related(request, form, formsets, change)
+            return
+        with transaction.atomic():
+            # Bump first: concurrent remarks wait on the row, then lose on the version.
+            AmnesiaSet.objects.filter(pk=form.instance.pk).update(version=F("version") + 1)
+            super().save_related(request, form, formsets, change)
+
     def has_add_permission(self, request):
         # Sets should only be created via amnesia_initialize()
         return False
@@ -38,14 +132,114 @@ class AmnesiaSetAdmin(admin.ModelAdmin):
 # ── HoneywordEvent ───────────────────────────────────────────────────
 
 
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts more than ADMIN_COUNT_LIMIT rows.
+
+    An unfiltered PostgreSQL table is sized from planner statistics
+    (pg_class.reltuples); everything else is counted with
+    SELECT COUNT(*) FROM (... LIMIT ADMIN_COUNT_LIMIT), so the cost is bounded
+    by the limit, not by the table.
+    """
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        limit = int(get_setting("ADMIN_COUNT_LIMIT"))
+        conn = connections[qs.db]
+        if conn.vendor == "postgresql" and not qs.query.where:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [qs.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 (or tiny) before the first ANALYZE.
+            if row and row[0] >= limit:
+                return int(row[0])
+        return qs.order_by().values("pk")[:limit].count()
+
+
+class RecentEventsFilter(admin.SimpleListFilter):
+    """Time window on created_at; defaults to the last 24 hours."""
+
+    title = "created"
+    parameter_name = "window"
+    default = "24h"
+    windows = {
+        "1h": timedelta(hours=1),
+        "24h": timedelta(hours=24),
+        "7d": timedelta(days=7),
+        "30d": timedelta(days=30),
+    }
+
+    def lookups(self, request, model_admin):
+        return [
+            ("1h", "Last hour"),
+            ("24h", "Last 24 hours"),
+            ("7d", "Last 7 days"),
+            ("30d", "Last 30 days"),
+            ("all", "All time"),
+        ]
+
+    def value(self):
+        value = super().value()
+        return value if value in self.windows or value == "all" else self.default
+
+    def queryset(self, request, queryset):
+        window = self.windows.get(self.value())
+        if window is None:
+            return queryset
+        return queryset.filter(created_at__gte=timezone.now() - window)
+
+    def choices(self, changelist):
+        # No "All" entry without a parameter: the absence of one means the default.
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": self.value() == lookup,
+                "query_string": changelist.get_query_string({self.parameter_name: lookup}),
+                "display": title,
+            }
+
+
 @admin.register(HoneywordEvent)
 class HoneywordEventAdmin(admin.ModelAdmin):
-    list_display = ("created_at", "username", "outcome", "ip_address", "short_ua")
-    list_filter = ("outcome", "created_at")
-    search_fields = ("username", "ip_address")
+    list_display = ("created_at", "username", "user", "outcome", "ip_address", "short_ua")
+    list_filter = (RecentEventsFilter, "outcome")
     readonly_fields = ("user", "username", "outcome", "created_at", "ip_address", "user_agent")
-    date_hierarchy = "created_at"
+    raw_id_fields = ("user",)
+    list_select_related = ("user",)
     ordering = ("-created_at",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_fields(self, request):
+        return ("username", "ip_address")
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search by ADMIN_SEARCH_MODE.
+
+        "prefix" (startswith) and "exact" avoid case folding on username so
+        the (username, created_at) index applies (on PostgreSQL, prefix search
+        uses the varchar_pattern_ops index from migration 0010); an IP address
+        term matches ip_address by equality. "contains" is Django's icontains
+        search.
+        """
+        mode = get_setting("ADMIN_SEARCH_MODE")
+        term = search_term.strip()
+        if mode == "contains" or not term:
+            return super().get_search_results(request, queryset, search_term)
+        if mode not in ("prefix", "exact"):
+            raise ImproperlyConfigured(
+                f"HONEYWORDS['ADMIN_SEARCH_MODE'] must be 'prefix', 'exact' or 'contains', not {mode!r}"
+            )
+        q = Q(username__startswith=term) if mode == "prefix" else Q(username=term)
+        try:
+            validate_ipv46_address(term)
+        except ValidationError:
+            pass
+        else:
+            q |= Q(ip_address=term)
+        return queryset.filter(q), False
 
     def short_ua(self, obj):
         """Truncated user-agent for the list view."""
@@ -59,6 +253,99 @@ class HoneywordEventAdmin(admin.ModelAdmin):
         return False
 
 
+# ── HoneywordInvalidCounter ──────────────────────────────────────────
+
+
+@admin.register(HoneywordInvalidCounter)
+class HoneywordInvalidCounterAdmin(admin.ModelAdmin):
+    list_display = ("bucket", "username", "ip_address", "count", "last_seen")
+    search_fields = ("username", "ip_address")
+    readonly_fields = ("username", "ip_address", "bucket", "count", "last_seen")
+    ordering = ("-bucket", "-count")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# ── HoneywordRollup + dashboard ──────────────────────────────────────
+
+
+@admin.register(HoneywordRollup)
+class HoneywordRollupAdmin(admin.ModelAdmin):
+    list_display = ("bucket", "dimension", "key", "outcome", "count")
+    list_filter = ("dimension", "outcome")
+    readonly_fields = ("bucket", "dimension", "key", "outcome", "count")
+    ordering = ("-bucket",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = "admin/django_honeywords/honeywordrollup/change_list.html"
+
+    dashboard_outcomes = (
+        HoneywordEvent.OUTCOME_HONEY,
+        HoneywordEvent.OUTCOME_INVALID,
+        HoneywordEvent.OUTCOME_REAL,
+        HoneywordEvent.OUTCOME_THROTTLED,
+    )
+    max_dashboard_hours = 24 * 30
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path("dashboard/", self.admin_site.admin_view(self.dashboard_view), name="%s_%s_dashboard" % info),
+            *super().get_urls(),
+        ]
+
+    def dashboard_view(self, request):
+        """Outcome charts per hour, address and user, read from the rollups only."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            hours = int(request.GET.get("hours", 24))
+        except ValueError:
+            hours = 24
+        hours = max(1, min(hours, self.max_dashboard_hours))
+        since = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+
+        totals = hourly_totals(since)
+        peak = max((sum(c.values()) for c in totals.values()), default=0) or 1
+        rows = []
+        for bucket, counts in totals.items():
+            total = sum(counts.values())
+            rows.append({
+                "bucket": bucket,
+                "counts": [counts.get(o, 0) for o in self.dashboard_outcomes],
+                "total": total,
+                "width": round(100 * total / peak),
+            })
+
+        bad = (HoneywordEvent.OUTCOME_HONEY, HoneywordEvent.OUTCOME_INVALID)
+        watermark, updated_at = rollup_watermark()
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": "Honeyword outcomes",
+            "hours": hours,
+            "hour_choices": (1, 24, 24 * 7, 24 * 30),
+            "outcomes": self.dashboard_outcomes,
+            "rows": rows,
+            "top_ips": top_keys(HoneywordRollup.DIMENSION_IP, since, bad),
+            "top_users_honey": top_keys(HoneywordRollup.DIMENSION_USER, since, (HoneywordEvent.OUTCOME_HONEY,)),
+            "top_users_invalid": top_keys(HoneywordRollup.DIMENSION_USER, since, (HoneywordEvent.OUTCOME_INVALID,)),
+            "watermark": watermark,
+            "watermark_updated_at": updated_at,
+        }
+        return TemplateResponse(request, "admin/django_honeywords/rollup_dashboard.html", context)
+
+
 # ── HoneywordUserState ───────────────────────────────────────────────
 
 
@@ -77,12 +364,24 @@ class HoneywordUserStateAdmin(admin.ModelAdmin):
 
     @admin.action(description="Clear must-reset flag for selected users")
     def clear_reset(self, request, queryset):
-        updated = queryset.filter(must_reset=True).update(must_reset=False)
+        queryset = queryset.filter(must_reset=True)
+        user_ids = list(queryset.values_list("user_id", flat=True))
+        updated = queryset.update(must_reset=False)
+        self._invalidate_policy_cache(user_ids)
         self.message_user(request, f"Cleared reset flag for {updated} user(s).")
 
     @admin.action(description="Unlock selected users")
     def clear_lock(self, request, queryset):
-        updated = queryset.filter(locked_until__isnull=False).update(
+        queryset = queryset.filter(locked_until__isnull=False)
+        user_ids = list(queryset.values_list("user_id", flat=True))
+        updated = queryset.update(
             locked_until=None, lock_count=0
         )
+        self._invalidate_policy_cache(user_ids)
         self.message_user(request, f"Unlocked {updated} user(s).")
+
+    @staticmethod
+    def _invalidate_policy_cache(user_ids):
+        # QuerySet.update() sends no post_save, so drop cached gate entries here.
+        if user_ids and policy_cache.enabled():
+            transaction.on_commit(lambda: policy_cache.invalidate(*user_ids))
@@ -0,0 +1,57 @@
+"""Write-time aggregation of invalid attempts.
+
+With AGGREGATE_INVALID enabled, log_event() does not record OUTCOME_INVALID
+attempts individually. Each one increments a HoneywordInvalidCounter row keyed
+by (username, ip_address, bucket), where bucket is the attempt time floored to
+AGGREGATE_BUCKET_SECONDS. Table growth then follows the number of distinct
+(username, address) pairs per bucket rather than the number of attempts.
+Honeyword and real outcomes are still recorded one row per attempt.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .conf import get_setting
+from .models import HoneywordInvalidCounter
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def bucket_start(at: datetime, seconds: int) -> datetime:
+    """Floor at to a multiple of seconds since the Unix epoch (UTC).
+
+    A naive at (USE_TZ=False) is read in the default time zone, and the
+    bucket is returned naive in that zone as well.
+    """
+    if seconds <= 0:
+        raise ValueError("AGGREGATE_BUCKET_SECONDS must be positive")
+    naive = timezone.is_naive(at)
+    if naive:
+        at = timezone.make_aware(at, timezone.get_default_timezone())
+    elapsed = int((at - _EPOCH).total_seconds())
+    start = _EPOCH + timedelta(seconds=elapsed - elapsed % seconds)
+    if naive:
+        return timezone.make_naive(start, timezone.get_default_timezone())
+    return start
+
+
+def increment_invalid(*, username: str, ip_address: str | None, at: datetime) -> None:
+    """Count one invalid attempt in its (username, ip_address, bucket) row."""
+    key = {
+        "username": username or "",
+        "ip_address": ip_address or "",
+        "bucket": bucket_start(at, int(get_setting("AGGREGATE_BUCKET_SECONDS"))),
+    }
+    counters = HoneywordInvalidCounter.objects.filter(**key)
+    if counters.update(count=F("count") + 1, last_seen=at):
+        return
+    try:
+        with transaction.atomic():
+            HoneywordInvalidCounter.objects.create(count=1, last_seen=at, **key)
+    except IntegrityError:
+        # Another attempt created the row first; increment it instead.
+        counters.update(count=F("count") + 1, last_seen=at)
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
 import secrets
 from dataclasses import dataclass
 from typing import Protocol
 
-from django.contrib.auth.hashers import check_password, make_password
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+from django.core.exceptions import ImproperlyConfigured
 from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils.crypto import constant_time_compare, get_random_string, pbkdf2, salted_hmac
 from .conf import get_setting
+from .limiter import KDFSaturated, kdf_slot
+from .parallel import find_first, map_ordered
+from .timing import kdf_timer, phase
 
 from .models import AmnesiaSet, AmnesiaCredential
 
@@ -31,8 +41,129 @@ def _bernoulli(rng: RNG, p: float) -> bool:
     return rng.random() < p
 
 
-def amnesia_initialize(
-    user,
+def _v2_iterations() -> int:
+    iterations = get_setting("AMNESIA_V2_ITERATIONS")
+    if iterations is None:
+        return PBKDF2PasswordHasher.iterations
+    return int(iterations)
+
+
+def _v2_derive(password: str, salt: str, iterations: int) -> str:
+    """PBKDF2-SHA256 digest of password, base64-encoded (amnesia_v2 candidates)."""
+    with kdf_timer():
+        digest = pbkdf2(password, salt, iterations, digest=hashlib.sha256)
+    return base64.b64encode(digest).decode("ascii")
+
+
+# Every KDF in this module goes through these wrappers (or _v2_derive) so it
+# is timed. The KDF limiter admits a whole verification instead (see
+# _match_candidate); enrollment is not limited.
+
+def _make_password(password: str) -> str:
+    with kdf_timer():
+        encoded = make_password(password)
+    return encoded
+
+
+def _check_password(password: str, encoded: str) -> bool:
+    with kdf_timer():
+        matched = check_password(password, encoded)
+    return matched
+
+
+def _fingerprint_digest(password: str) -> str | None:
+    """Full keyed-HMAC hex digest of password, or None if no pepper is configured.
+
+    Stored fingerprints are a prefix of this digest; comparing against the
+    stored length keeps old fingerprints valid when FINGERPRINT_LENGTH changes.
+    """
+    pepper = get_setting("FINGERPRINT_PEPPER")
+    if not pepper:
+        return None
+    return salted_hmac(
+        "django_honeywords.fingerprint", password, secret=pepper, algorithm="sha256"
+    ).hexdigest()
+
+
+def _fingerprint_length() -> int:
+    length = int(get_setting("FINGERPRINT_LENGTH"))
+    if not (1 <= length <= 16):
+        raise ImproperlyConfigured("HONEYWORDS['FINGERPRINT_LENGTH'] must be in [1, 16]")
+    return length
+
+
+def _hash_all(hash_one, words: list[str]) -> list[str]:
+    """hash_one over words, in order; on the shared pool if PARALLEL_INIT is set."""
+    if get_setting("PARALLEL_INIT") and len(words) > 1:
+        return map_ordered(hash_one, words, max_workers=int(get_setting("PARALLEL_INIT_MAX_WORKERS")))
+    return [hash_one(w) for w in words]
+
+
+class PreparedSet:
+    """Everything amnesia_initialize() computes before touching the database.
+
+    Picklable, so bulk enrollment can build sets in worker processes.
+    """
+
+    __slots__ = (
+        "k", "p_mark", "p_remark", "algorithm_version", "salt", "iterations",
+        "storage", "hashes", "fingerprints", "marks",
+    )
+
+    def __init__(self, k, p_mark, p_remark, algorithm_version, salt, iterations,
+                 storage, hashes, fingerprints, marks):
+        self.k = k
+        self.p_mark = p_mark
+        self.p_remark = p_remark
+        self.algorithm_version = algorithm_version
+        self.salt = salt
+        self.iterations = iterations
+        self.storage = storage
+        self.hashes = hashes
+        self.fingerprints = fingerprints
+        self.marks = marks
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    @property
+    def packed(self) -> bool:
+        return self.storage == AmnesiaSet.STORAGE_PACKED
+
+    def set_fields(self) -> dict:
+        """AmnesiaSet field values (everything but user and version)."""
+        return {
+            "k": self.k,
+            "p_mark": self.p_mark,
+            "p_remark": self.p_remark,
+            "algorithm_version": self.algorithm_version,
+            "salt": self.salt,
+            "iterations": self.iterations,
+            "storage": self.storage,
+            "packed_hashes": _pack_digests(self.hashes) if self.packed else b"",
+            "marks": _marks_to_mask(self.marks) if self.packed else 0,
+        }
+
+    def credentials(self, aset: AmnesiaSet) -> list[AmnesiaCredential]:
+        if self.packed:
+            return []
+        return [
+            AmnesiaCredential(
+                aset=aset,
+                index=i,
+                password_hash=self.hashes[i],
+                fingerprint=self.fingerprints[i],
+                marked=self.marks[i],
+            )
+            for i in range(self.k)
+        ]
+
+
+def prepare_set(
     real_password: str,
     *,
     k: int = 20,
@@ -41,15 +172,18 @@ def amnesia_initialize(
     generator=None,
     real_index: int | None = None,   # TESTING ONLY (not stored)
     rng: RNG | None = None,
-) -> None:
-    """
-    Creates an Amnesia set for user:
-      - generates k candidate passwords (one is the real password)
-      - hashes all candidates
-      - sets initial marks: real marked True, others marked Bernoulli(p_mark)
+    algorithm_version: str = AmnesiaSet.ALGORITHM_V1,
+    iterations: int | None = None,
+    storage: str = AmnesiaSet.STORAGE_ROWS,
+) -> PreparedSet:
+    """Validate, generate and hash a set without touching the database.
 
-    NOTE: real_index is only to make tests deterministic; Amnesia does NOT store it.
+    Arguments as for amnesia_initialize().
     """
+    if algorithm_version not in AmnesiaSet.ALGORITHMS:
+        raise ValueError(f"unknown algorithm_version: {algorithm_version!r}")
+    if storage not in AmnesiaSet.STORAGES:
+        raise ValueError(f"unknown storage: {storage!r}")
     if k < 2:
         raise ValueError("k must be >= 2")
     if not (0.0 <= p_mark <= 1.0):
@@ -80,52 +214,327 @@ def amnesia_initialize(
     current = words.index(real_password)
     words[current], words[real_index] = words[real_index], words[current]
 
+    if storage == AmnesiaSet.STORAGE_PACKED:
+        if algorithm_version != AmnesiaSet.ALGORITHM_V2:
+            raise ValueError("packed storage requires algorithm_version 'amnesia_v2'")
+        if k > AmnesiaSet.PACKED_MAX_K:
+            raise ValueError(f"packed storage supports k <= {AmnesiaSet.PACKED_MAX_K}")
+
+    if algorithm_version == AmnesiaSet.ALGORITHM_V2:
+        salt = get_random_string(22)
+        iterations = iterations or _v2_iterations()
+        hashes = _hash_all(lambda w: _v2_derive(w, salt, iterations), words)
+    else:
+        salt, iterations = "", 0
+        hashes = _hash_all(_make_password, words)
+
+    fingerprints = [""] * k
+    if get_setting("FINGERPRINT_PEPPER") and storage == AmnesiaSet.STORAGE_ROWS:
+        length = _fingerprint_length()
+        fingerprints = [_fingerprint_digest(w)[:length] for w in words]
+
+    marks = [True if i == real_index else _bernoulli(rng, p_mark) for i in range(k)]
+
+    return PreparedSet(
+        k, p_mark, p_remark, algorithm_version, salt, iterations, storage, hashes, fingerprints, marks
+    )
+
+
+def amnesia_initialize(
+    user,
+    real_password: str,
+    *,
+    k: int = 20,
+    p_mark: float = 0.1,
+    p_remark: float = 0.01,
+    generator=None,
+    real_index: int | None = None,   # TESTING ONLY (not stored)
+    rng: RNG | None = None,
+    algorithm_version: str = AmnesiaSet.ALGORITHM_V1,
+    iterations: int | None = None,
+    storage: str = AmnesiaSet.STORAGE_ROWS,
+) -> None:
+    """
+    Creates an Amnesia set for user:
+      - generates k candidate passwords (one is the real password)
+      - hashes all candidates
+      - sets initial marks: real marked True, others marked Bernoulli(p_mark)
+
+    algorithm_version selects the stored format:
+      - "amnesia_v1": each candidate is hashed with make_password()
+      - "amnesia_v2": candidates share one per-set salt and iteration count
+        (iterations defaults to AMNESIA_V2_ITERATIONS)
+
+    storage selects the layout: one AmnesiaCredential row per candidate
+    ("rows"), or all digests and marks on the AmnesiaSet row itself
+    ("packed"; amnesia_v2 only, k <= 63).
+
+    NOTE: real_index is only to make tests deterministic; Amnesia does NOT store it.
+    """
+    prepared = prepare_set(
+        real_password, k=k, p_mark=p_mark, p_remark=p_remark, generator=generator,
+        real_index=real_index, rng=rng, algorithm_version=algorithm_version,
+        iterations=iterations, storage=storage,
+    )
+
     with transaction.atomic():
-        aset, _ = AmnesiaSet.objects.update_or_create(
-            user=user,
-            defaults={
-                "k": k,
-                "p_mark": p_mark,
-                "p_remark": p_remark,
-                "algorithm_version": "amnesia_v1",
-            },
-        )
+        aset, created = AmnesiaSet.objects.update_or_create(user=user, defaults=prepared.set_fields())
 
-        AmnesiaCredential.objects.filter(aset=aset).delete()
+        if not created:
+            # Invalidate remarks computed against the previous candidates.
+            AmnesiaSet.objects.filter(pk=aset.pk).update(version=F("version") + 1)
+            aset.refresh_from_db(fields=["version"])
 
-        creds = []
-        for i in range(k):
-            is_real = (i == real_index)
-            marked = True if is_real else _bernoulli(rng, p_mark)
-            creds.append(
-                AmnesiaCredential(
-                    aset=aset,
-                    index=i,
-                    password_hash=make_password(words[i]),
-                    marked=marked,
-                )
-            )
-        AmnesiaCredential.objects.bulk_create(creds)
+        # Keep a previously cached user.amnesia_set from going stale.
+        user.amnesia_set = aset
+
+        AmnesiaCredential.objects.filter(aset=aset).delete()
+        AmnesiaCredential.objects.bulk_create(prepared.credentials(aset))
 
         # Block default Django password auth
         user.set_unusable_password()
         user.save(update_fields=["password"])
 
 
-def _find_candidate(aset: AmnesiaSet, password: str) -> AmnesiaCredential | None:
+# ── packed storage helpers ───────────────────────────────────────────
+
+
+def _pack_digests(hashes: list[str]) -> bytes:
+    return b"".join(base64.b64decode(h) for h in hashes)
+
+
+def _unpack_digests(packed: bytes, k: int) -> list[str]:
+    packed = bytes(packed)
+    size = len(packed) // k
+    return [base64.b64encode(packed[i * size:(i + 1) * size]).decode("ascii") for i in range(k)]
+
+
+def packed_digests(aset: AmnesiaSet) -> list[str]:
+    """Base64 candidate digests of a packed set, in index order."""
+    if aset.storage != AmnesiaSet.STORAGE_PACKED:
+        raise ValueError("set is not packed")
+    return _unpack_digests(aset.packed_hashes, aset.k)
+
+
+def _marks_to_mask(marks: list[bool]) -> int:
+    return sum(1 << i for i, marked in enumerate(marks) if marked)
+
+
+def _mask_to_marks(mask: int, k: int) -> list[bool]:
+    return [bool(mask >> i & 1) for i in range(k)]
+
+
+def pack_set(aset: AmnesiaSet) -> bool:
+    """Move an amnesia_v2 set from credential rows into its packed columns.
+
+    Returns False (and changes nothing) if the set is already packed or cannot
+    be packed (amnesia_v1, k too large, or incomplete rows). The version is
+    bumped, so remarks that read the old layout fail their version check.
+    """
+    if aset.storage == AmnesiaSet.STORAGE_PACKED:
+        return False
+    if aset.algorithm_version != AmnesiaSet.ALGORITHM_V2 or aset.k > AmnesiaSet.PACKED_MAX_K:
+        return False
+    with transaction.atomic():
+        # Lock the set before reading marks: a remark bumps it before writing them.
+        locked = AmnesiaSet.objects.select_for_update().only("storage").get(pk=aset.pk)
+        if locked.storage != AmnesiaSet.STORAGE_ROWS:
+            return False
+        creds = list(
+            AmnesiaCredential.objects.select_for_update()
+            .filter(aset=aset)
+            .order_by("index")
+            .values_list("password_hash", "marked")
+        )
+        if len(creds) != aset.k:
+            return False
+        aset.packed_hashes = _pack_digests([h for h, _ in creds])
+        aset.marks = _marks_to_mask([m for _, m in creds])
+        aset.storage = AmnesiaSet.STORAGE_PACKED
+        AmnesiaSet.objects.filter(pk=aset.pk).update(
+            packed_hashes=aset.packed_hashes, marks=aset.marks, storage=aset.storage,
+            version=F("version") + 1,
+        )
+        AmnesiaCredential.objects.filter(aset=aset).delete()
+    aset.refresh_from_db(fields=["version"])
+    return True
+
+
+def unpack_set(aset: AmnesiaSet) -> bool:
+    """Move a packed set back to one AmnesiaCredential row per candidate.
+
+    The version is bumped, as in pack_set().
+    """
+    if aset.storage != AmnesiaSet.STORAGE_PACKED:
+        return False
+    with transaction.atomic():
+        aset = AmnesiaSet.objects.select_for_update().get(pk=aset.pk)
+        if aset.storage != AmnesiaSet.STORAGE_PACKED:
+            return False
+        hashes = _unpack_digests(aset.packed_hashes, aset.k)
+        marks = _mask_to_marks(aset.marks, aset.k)
+        AmnesiaCredential.objects.bulk_create(
+            AmnesiaCredential(aset=aset, index=i, password_hash=hashes[i], marked=marks[i])
+            for i in range(aset.k)
+        )
+        AmnesiaSet.objects.filter(pk=aset.pk).update(
+            packed_hashes=b"", marks=0, storage=AmnesiaSet.STORAGE_ROWS, version=F("version") + 1,
+        )
+    return True
+
+
+class Candidate:
+    """Read-only view of one candidate, as loaded for a login.
+
+    pk is the AmnesiaCredential id, or None for packed sets.
+    """
+
+    __slots__ = ("pk", "index", "password_hash", "fingerprint", "marked")
+
+    def __init__(self, pk, index, password_hash, fingerprint, marked):
+        self.pk = pk
+        self.index = index
+        self.password_hash = password_hash
+        self.fingerprint = fingerprint
+        self.marked = marked
+
+
+def _packed_candidates(aset: AmnesiaSet) -> list[Candidate]:
+    hashes = _unpack_digests(aset.packed_hashes, aset.k)
+    marks = _mask_to_marks(aset.marks, aset.k)
+    return [Candidate(None, i, hashes[i], "", marks[i]) for i in range(aset.k)]
+
+
+def _candidate_rows(aset: AmnesiaSet):
+    # values_list avoids building k model instances on every login
+    return (
+        AmnesiaCredential.objects.filter(aset_id=aset.pk)
+        .order_by("index")
+        .values_list(*Candidate.__slots__)
+    )
+
+
+def _load_candidates(aset: AmnesiaSet) -> list[Candidate]:
+    if aset.storage == AmnesiaSet.STORAGE_PACKED:
+        return _packed_candidates(aset)
+    return [Candidate(*row) for row in _candidate_rows(aset)]
+
+
+async def _aload_candidates(aset: AmnesiaSet) -> list[Candidate]:
+    if aset.storage == AmnesiaSet.STORAGE_PACKED:
+        return _packed_candidates(aset)
+    return [Candidate(*row) async for row in _candidate_rows(aset)]
+
+
+def _match_candidate(aset: AmnesiaSet, creds: list[Candidate], password: str) -> Candidate | None:
+    """Return the candidate password matches, or None. No database access.
+
+    Takes one KDF limiter slot for all of its hashes, so an admitted login is
+    never rejected halfway through its candidates. Raises KDFSaturated if it
+    is not admitted.
+    """
+    # Peppered prefilter: only candidates whose fingerprint matches (or that
+    # were stored without one) need the expensive hash check.
+    fingerprint = _fingerprint_digest(password)
+    if fingerprint is not None:
+        creds = [c for c in creds if not c.fingerprint or fingerprint.startswith(c.fingerprint)]
+        if not creds:
+            return None
+
+    with kdf_slot():
+        return _verify(aset, creds, password)
+
+
+def _verify(aset: AmnesiaSet, creds: list[Candidate], password: str) -> Candidate | None:
+    if aset.algorithm_version == AmnesiaSet.ALGORITHM_V2:
+        # One derivation, then compare against every stored digest without
+        # short-circuiting so timing does not reveal the matching index.
+        digest = _v2_derive(password, aset.salt, aset.iterations)
+        match = None
+        for cred in creds:
+            if constant_time_compare(digest, cred.password_hash) and match is None:
+                match = cred
+        return match
+
+    if aset.algorithm_version != AmnesiaSet.ALGORITHM_V1:
+        raise ValueError(f"unknown algorithm_version: {aset.algorithm_version!r}")
+
+    if get_setting("PARALLEL_VERIFY") and len(creds) > 1:
+        return find_first(
+            lambda c: _check_password(password, c.password_hash),
+            creds,
+            max_workers=int(get_setting("PARALLEL_VERIFY_MAX_WORKERS")),
+        )
+
     # small k -> linear scan is fine
-    for cred in aset.credentials.all().order_by("index"):
-        if check_password(password, cred.password_hash):
+    for cred in creds:
+        if _check_password(password, cred.password_hash):
             return cred
     return None
 
 
+# Conditional remark writes attempted before giving up on a contended set.
+_REMARK_ATTEMPTS = 3
+
+
+def _remark(aset: AmnesiaSet, cred: Candidate, rng: RNG) -> bool:
+    """Keep cred marked and re-sample every other mark ~ Bernoulli(p_mark).
+
+    Optimistic: the write only applies if AmnesiaSet.version still equals the
+    version the marks were read at, and it bumps the version. On conflict the
+    matched mark is re-read; if it is still set, the remark is retried.
+
+    Returns False if cred turned out to be unmarked by a concurrent remark.
+    """
+    version = aset.version
+    for _ in range(_REMARK_ATTEMPTS):
+        marks = [i == cred.index or _bernoulli(rng, aset.p_mark) for i in range(aset.k)]
+        claimed = AmnesiaSet.objects.filter(pk=aset.pk, version=version)
+
+        if aset.storage == AmnesiaSet.STORAGE_PACKED:
+            # One conditional UPDATE: new marks + version bump.
+            if claimed.update(marks=_marks_to_mask(marks), version=F("version") + 1):
+                return True
+            version, mask = AmnesiaSet.objects.values_list("version", "marks").get(pk=aset.pk)
+            still_marked = bool(mask >> cred.index & 1)
+        else:
+            with transaction.atomic():
+                if claimed.update(version=F("version") + 1):
+                    marked_indexes = [i for i, m in enumerate(marks) if m]
+                    AmnesiaCredential.objects.filter(aset_id=aset.pk).update(
+                        marked=Case(
+                            When(index__in=marked_indexes, then=Value(True)),
+                            default=Value(False),
+                        )
+                    )
+                    return True
+            row = AmnesiaCredential.objects.filter(pk=cred.pk).values_list("marked", "aset__version").first()
+            if row is None:
+                # The set was re-initialized meanwhile; nothing left to remark.
+                return True
+            still_marked, version = row
+
+        if not still_marked:
+            return False
+
+    # Persistent contention: skip this remark; the login itself stands.
+    return True
+
+
+def _defer_remark(aset: AmnesiaSet, cred: Candidate) -> None:
+    from .remarks import get_remark_queue
+
+    aset_pk, index, password_hash = aset.pk, cred.index, cred.password_hash
+    transaction.on_commit(lambda: get_remark_queue().submit(aset_pk, index, password_hash))
+
+
 def amnesia_check(user, password: str, *, rng: RNG | None = None) -> str:
     """
     Returns:
       - "invalid": password not in candidate set
       - "breach": password matches an unmarked candidate (reject login + detect)
       - "success": password matches a marked candidate (accept) and maybe remark
+      - "throttled": the KDF limiter had no capacity; nothing was verified
     """
     if not hasattr(user, "amnesia_set"):
         return "invalid"
@@ -133,40 +542,88 @@ def amnesia_check(user, password: str, *, rng: RNG | None = None) -> str:
     rng = rng or DefaultRNG()
     aset: AmnesiaSet = user.amnesia_set
 
-    cred = _find_candidate(aset, password)
+    try:
+        with phase("load_candidates"):
+            creds = _load_candidates(aset)
+        with phase("verify"):
+            cred = _match_candidate(aset, creds, password)
+    except KDFSaturated:
+        return "throttled"
+
+    verdict = _verdict(aset, cred, rng)
+    if verdict != "remark":
+        return verdict
+    with phase("remark"):
+        if get_setting("REMARK_MODE") == "deferred":
+            _defer_remark(aset, cred)
+            remarked = True
+        else:
+            remarked = _remark(aset, cred, rng)
+    return _remark_verdict(remarked)
+
+
+def _verdict(aset: AmnesiaSet, cred: Candidate | None, rng: RNG) -> str:
+    """Verdict for a verified candidate; "remark" means success pending a remark."""
     if cred is None:
         return "invalid"
-
     if not cred.marked:
         # breach detected
         return "breach"
-
     # success path; maybe remark
-    if _bernoulli(rng, aset.p_remark):
-        # Remark rule:
-        # - keep the used credential marked=True
-        # - for each other credential: re-sample marked ~ Bernoulli(p_mark)
-        #
-        # Important: remarking must NOT monotonically accumulate marks over time,
-        # otherwise detection probability collapses as all entries become marked.
-        with transaction.atomic():
-            cred = AmnesiaCredential.objects.select_for_update().get(pk=cred.pk)
-            if not cred.marked:
-                # race: another thread unmarked it between our check and lock
-                return "breach"
-
-            others = list(
-                AmnesiaCredential.objects.select_for_update()
-                .filter(aset=aset)
-                .exclude(pk=cred.pk)
-            )
-            for o in others:
-                o.marked = _bernoulli(rng, aset.p_mark)
+    # Remark rule:
+    # - keep the used credential marked=True
+    # - for each other credential: re-sample marked ~ Bernoulli(p_mark)
+    #
+    # Important: remarking must NOT monotonically accumulate marks over time,
+    # otherwise detection probability collapses as all entries become marked.
+    return "remark" if _bernoulli(rng, aset.p_remark) else "success"
+
+
+def _remark_verdict(remarked: bool) -> str:
+    # Not remarked: another thread unmarked the candidate between our check
+    # and our write.
+    return "success" if remarked else "breach"
 
-            if others:
-                AmnesiaCredential.objects.bulk_update(others, ["marked"])
 
-    return "success"
+async def _aget_amnesia_set(user) -> AmnesiaSet | None:
+    # Use the relation cache when the user was loaded with select_related.
+    if type(user).amnesia_set.related.is_cached(user):
+        return getattr(user, "amnesia_set", None)
+    return await AmnesiaSet.objects.filter(user_id=user.pk).afirst()
+
+
+async def aamnesia_check(user, password: str, *, rng: RNG | None = None) -> str:
+    """Async amnesia_check(); same verdicts.
+
+    Reads use the async ORM. Hashing runs in a worker thread so the event loop
+    keeps serving other requests; the remark transaction runs via
+    sync_to_async because transactions are sync-only.
+    """
+    aset = await _aget_amnesia_set(user)
+    if aset is None:
+        return "invalid"
+
+    rng = rng or DefaultRNG()
+    with phase("load_candidates"):
+        creds = await _aload_candidates(aset)
+
+    try:
+        with phase("verify"):
+            cred = await asyncio.to_thread(_match_candidate, aset, creds, password)
+    except KDFSaturated:
+        return "throttled"
+
+    verdict = _verdict(aset, cred, rng)
+    if verdict != "remark":
+        return verdict
+    with phase("remark"):
+        if get_setting("REMARK_MODE") == "deferred":
+            await sync_to_async(_defer_remark)(aset, cred)
+            remarked = True
+        else:
+            remarked = await sync_to_async(_remark)(aset, cred, rng)
+    return _remark_verdict(remarked)
+
 
 def amnesia_initialize_from_settings(
     user,
@@ -182,6 +639,8 @@ def amnesia_initialize_from_settings(
         k=int(get_setting("AMNESIA_K")),
         p_mark=float(get_setting("AMNESIA_P_MARK")),
         p_remark=float(get_setting("AMNESIA_P_REMARK")),
+        algorithm_version=get_setting("AMNESIA_ALGORITHM"),
+        storage=get_setting("AMNESIA_STORAGE"),
         generator=generator,
         rng=rng,
         real_index=real_index,
@@ -15,3 +15,10 @@ class DjangoHoneywordsConfig(AppConfig):
 
         User = get_user_model()
         pre_save.connect(_on_user_password_change, sender=User)
+
+        from django.db.models.signals import post_delete, post_save
+        from .models import HoneywordUserState
+        from .policy_cache import _on_state_deleted, _on_state_saved
+
+        post_save.connect(_on_state_saved, sender=HoneywordUserState)
+        post_delete.connect(_on_state_deleted, sender=HoneywordUserState)
@@ -0,0 +1,248 @@
+"""Compact binary archive of HoneywordEvent rows.
+
+Layout (little-endian)::
+
+    header    HEADER (64 bytes)
+    records   record_count x RECORD (40 bytes each)
+    offsets   string_count x uint64 (start of each string in the blob)
+    blob      UTF-8 strings, back to back
+
+A record holds the event id, created_at as microseconds since the Unix epoch
+(datetimes must be timezone-aware; callers convert naive USE_TZ=False values),
+user_id (-1 for none) and string-table indexes for username, outcome,
+ip_address and user_agent (NO_STRING for a missing address). Strings are
+deduplicated, so repeated user agents and addresses cost four bytes per event.
+
+Records are fixed width, so ArchiveReader memory-maps the file and scans them
+with struct.iter_unpack; strings are decoded only for rows that are returned.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterator, NamedTuple
+
+MAGIC = b"HWEA"
+VERSION = 1
+# magic, version, record_count, records_offset, string_count, offsets_offset, blob_offset
+HEADER = struct.Struct("<4sHxxQQQQQ16x")
+RECORD = struct.Struct("<qqqIIII")
+NO_STRING = 0xFFFFFFFF
+NO_USER = -1
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+class ArchivedEvent(NamedTuple):
+    id: int
+    created_at: datetime
+    user_id: int | None
+    username: str
+    outcome: str
+    ip_address: str | None
+    user_agent: str
+
+
+def _to_micros(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        raise ValueError(f"naive datetime {dt.isoformat()}: pass a timezone-aware value")
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+class ArchiveWriter:
+    """Stream events into an archive file.
+
+    Records go to disk as they are added; the string table is kept in memory
+    and written by close(). The file is built as <path>.partial and renamed
+    into place only once complete.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp = f"{path}.partial"
+        self._fh = open(self._tmp, "wb")
+        self._fh.write(b"\0" * HEADER.size)
+        self._strings: dict[str, int] = {}
+        self.count = 0
+
+    def _intern(self, value: str | None) -> int:
+        if value is None:
+            return NO_STRING
+        idx = self._strings.get(value)
+        if idx is None:
+            idx = self._strings[value] = len(self._strings)
+        return idx
+
+    def add(self, *, id: int, created_at: datetime, user_id: int | None, username: str,
+            outcome: str, ip_address: str | None, user_agent: str) -> None:
+        self._fh.write(RECORD.pack(
+            id,
+            _to_micros(created_at),
+            NO_USER if user_id is None else user_id,
+            self._intern(username or ""),
+            self._intern(outcome),
+            self._intern(ip_address),
+            self._intern(user_agent or ""),
+        ))
+        self.count += 1
+
+    def close(self) -> None:
+        fh = self._fh
+        offsets_offset = HEADER.size + self.count * RECORD.size
+        encoded = [s.encode("utf-8") for s in self._strings]
+        blob_offset = offsets_offset + 8 * len(encoded)
+        pos = 0
+        starts = []
+        for data in encoded:
+            starts.append(pos)
+            pos += len(data)
+        fh.write(struct.pack(f"<{len(starts)}Q", *starts))
+        # One sentinel so string i is blob[starts[i]:starts[i + 1]].
+        fh.write(struct.pack("<Q", pos))
+        blob_offset += 8
+        for data in encoded:
+            fh.write(data)
+        fh.seek(0)
+        fh.write(HEADER.pack(MAGIC, VERSION, self.count, HEADER.size, len(encoded), offsets_offset, blob_offset))
+        fh.flush()
+        os.fsync(fh.fileno())
+        fh.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._fh.close()
+        os.unlink(self._tmp)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ArchiveReader:
+    """Memory-mapped, read-only view of an archive file."""
+
+    def __init__(self, path: str):
+        self._fh = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            self._fh.close()
+            raise ArchiveError(f"{path} is not a honeywords event archive") from e
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ArchiveError(f"{path} is not a honeywords event archive")
+        magic, version, count, records_offset, string_count, offsets_offset, blob_offset = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            self.close()
+            raise ArchiveError(f"{path} is not a honeywords event archive")
+        if version != VERSION:
+            self.close()
+            raise ArchiveError(f"{path}: unsupported archive version {version}")
+        self._count = count
+        self._records_offset = records_offset
+        self._string_count = string_count
+        self._offsets = memoryview(self._mm)[offsets_offset:offsets_offset + 8 * (string_count + 1)].cast("Q")
+        self._blob_offset = blob_offset
+        self._cache: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def string(self, idx: int) -> str | None:
+        if idx == NO_STRING:
+            return None
+        value = self._cache.get(idx)
+        if value is None:
+            start = self._blob_offset + self._offsets[idx]
+            end = self._blob_offset + self._offsets[idx + 1]
+            value = self._cache[idx] = self._mm[start:end].decode("utf-8")
+        return value
+
+    def string_index(self, value: str) -> int | None:
+        """Index of value in the string table, or None if absent."""
+        for idx in range(self._string_count):
+            if self.string(idx) == value:
+                return idx
+        return None
+
+    def raw_records(self) -> Iterator[tuple]:
+        """Undecoded (id, micros, user_id, username, outcome, ip, ua) tuples."""
+        end = self._records_offset + self._count * RECORD.size
+        return RECORD.iter_unpack(memoryview(self._mm)[self._records_offset:end])
+
+    def _decode(self, raw: tuple) -> ArchivedEvent:
+        id_, micros, user_id, username, outcome, ip, ua = raw
+        return ArchivedEvent(
+            id=id_,
+            created_at=_from_micros(micros),
+            user_id=None if user_id == NO_USER else user_id,
+            username=self.string(username),
+            outcome=self.string(outcome),
+            ip_address=self.string(ip),
+            user_agent=self.string(ua),
+        )
+
+    def __iter__(self) -> Iterator[ArchivedEvent]:
+        return (self._decode(raw) for raw in self.raw_records())
+
+    def scan(
+        self,
+        *,
+        outcome: str | None = None,
+        username: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[ArchivedEvent]:
+        """Yield events matching every given filter (until is exclusive).
+
+        Filters compare raw integers, so non-matching rows are never decoded.
+        """
+        want_outcome = want_username = None
+        if outcome is not None:
+            want_outcome = self.string_index(outcome)
+            if want_outcome is None:
+                return
+        if username is not None:
+            want_username = self.string_index(username)
+            if want_username is None:
+                return
+        lo = None if since is None else _to_micros(since)
+        hi = None if until is None else _to_micros(until)
+        for raw in self.raw_records():
+            if want_outcome is not None and raw[4] != want_outcome:
+                continue
+            if want_username is not None and raw[3] != want_username:
+                continue
+            if lo is not None and raw[1] < lo:
+                continue
+            if hi is not None and raw[1] >= hi:
+                continue
+            yield self._decode(raw)
+
+    def close(self) -> None:
+        if hasattr(self, "_offsets"):
+            self._offsets.release()
+        self._mm.close()
+        self._fh.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import BaseBackend
-from django.utils import timezone
+from django.contrib.auth.base_user import BaseUserManager
 
-from django_honeywords.amnesia_service import amnesia_check
+from django_honeywords.amnesia_service import aamnesia_check, amnesia_check
 from django_honeywords.conf import get_setting
-from django_honeywords.events import log_event
+from django_honeywords.events import alog_event, log_event
 from django_honeywords.models import HoneywordEvent
-from django_honeywords.policy import apply_lock, apply_reset, get_state
+from django_honeywords.policy import (
+    aapply_lock,
+    aapply_reset,
+    apeek_state,
+    apply_lock,
+    apply_reset,
+    is_blocked,
+    peek_state,
+)
+from django_honeywords import metrics, policy_cache, timing
 from django_honeywords.signals import honeyword_detected
+from django_honeywords.timing import phase, set_outcome
 
 
 class HoneywordsBackend(BaseBackend):
@@ -27,72 +38,205 @@ class HoneywordsBackend(BaseBackend):
 
         return getattr(user, "is_active", True)
 
-    def authenticate(self, request, username=None, password=None, **kwargs):
-        if password is None:
-            return None
+    @staticmethod
+    def _manager_overrides_natural_key(manager) -> bool:
+        return getattr(type(manager), "get_by_natural_key", None) is not BaseUserManager.get_by_natural_key
 
-        User = get_user_model()
-        username_field = getattr(User, "USERNAME_FIELD", "username")
-        if username is None:
-            username = kwargs.get(username_field)
+    def _load_user(self, User, username):
+        """Fetch the user together with its AmnesiaSet and policy state.
 
+        One joined query replaces the natural-key lookup plus the lazy
+        amnesia_set / honeywords_state loads. Managers that override
+        get_by_natural_key (e.g. case-insensitive usernames) keep their lookup.
+        """
+        manager = User._default_manager
+        if self._manager_overrides_natural_key(manager):
+            return manager.get_by_natural_key(username)
+        return manager.select_related(*self._related()).get(**{User.USERNAME_FIELD: username})
+
+    async def _aload_user(self, User, username):
+        manager = User._default_manager
+        if self._manager_overrides_natural_key(manager):
+            return await sync_to_async(manager.get_by_natural_key)(username)
+        return await manager.select_related(*self._related()).aget(**{User.USERNAME_FIELD: username})
+
+    @staticmethod
+    def _related() -> tuple[str, ...]:
+        # With the policy cache the state row is only read on a cache miss.
+        if policy_cache.enabled():
+            return ("amnesia_set",)
+        return ("amnesia_set", "honeywords_state")
+
+    def _blocked(self, user) -> bool:
+        if policy_cache.enabled():
+            return policy_cache.is_blocked(user)
+        return is_blocked(peek_state(user))
+
+    async def _ablocked(self, user) -> bool:
+        if policy_cache.enabled():
+            return await policy_cache.ais_blocked(user)
+        return is_blocked(await apeek_state(user))
+
+    @staticmethod
+    def _username(username, kwargs):
         if username is None:
-            return None
-        try:
-            # Respect custom user models and normalization rules.
-            user = User._default_manager.get_by_natural_key(username)
-        except User.DoesNotExist:
-            log_event(user=None, username=username, outcome=HoneywordEvent.OUTCOME_INVALID, request=request)
-            return None
+            User = get_user_model()
+            username = kwargs.get(getattr(User, "USERNAME_FIELD", "username"))
+        return username
 
-        # Respect Django's inactive-user semantics (and any custom override).
-        if not self.user_can_authenticate(user):
-            log_event(user=user, username=username, outcome=HoneywordEvent.OUTCOME_INVALID, request=request)
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        username = self._username(username, kwargs)
+        if password is None or username is None:
             return None
-
-        # Policy gate: lock + must_reset block auth
-        state = get_state(user)
-        locked = state.locked_until is not None and state.locked_until > timezone.now()
-        if locked or state.must_reset:
-            log_event(user=user, username=username, outcome=HoneywordEvent.OUTCOME_INVALID, request=request)
+        if not timing.enabled():
+            return self._authenticate(request, username, password)
+        with timing.collect(request, username, sender=self.__class__):
+            return self._authenticate(request, username, password)
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        """Native async authenticate(); same flow and verdicts (Django 5.0+)."""
+        username = self._username(username, kwargs)
+        if password is None or username is None:
+            return None
+        if not timing.enabled():
+            return await self._aauthenticate(request, username, password)
+        async with timing.acollect(request, username, sender=self.__class__):
+            return await self._aauthenticate(request, username, password)
+
+    # The sync and async flows below differ only in their I/O calls; every
+    # decision is made by the shared helpers that follow them.
+
+    def _authenticate(self, request, username, password):
+        user = self._find_user(username)
+        reason = self._rejection(user)
+        if reason is None:
+            with phase("policy_gate"):
+                if self._blocked(user):
+                    reason = "blocked"
+        if reason is not None:
+            set_outcome(reason)
+            self._log(user=user, username=username, outcome=HoneywordEvent.OUTCOME_INVALID, request=request)
             return None
 
         verdict = amnesia_check(user, password)
-
-        if verdict == "success":
-            if get_setting("LOG_REAL_SUCCESS"):
-                # In Amnesia, success means a *marked* credential matched (real or honeyword).
-                log_event(user=user, username=username, outcome=HoneywordEvent.OUTCOME_REAL, request=request)
-            return user
+        outcome = self._event_outcome(verdict)
+        event = None
+        if outcome is not None:
+            event = self._log(user=user, username=username, outcome=outcome, request=request)
 
         if verdict == "breach":
-            event = log_event(user=user, username=username, outcome=HoneywordEvent.OUTCOME_HONEY, request=request)
             honeyword_detected.send(
-                sender=self.__class__,
-                user=user,
-                username=username,
-                request=request,
-                event=event,
+                sender=self.__class__, user=user, username=username, request=request, event=event,
+            )
+            action, apply, kwargs = self._policy_action(sync=True)
+            if apply is not None:
+                with phase("policy_action"):
+                    apply(user, **kwargs)
+            metrics.count_policy_action(action)
+
+        return user if verdict == "success" else None
+
+    async def _aauthenticate(self, request, username, password):
+        user = await self._afind_user(username)
+        reason = self._rejection(user)
+        if reason is None:
+            with phase("policy_gate"):
+                if await self._ablocked(user):
+                    reason = "blocked"
+        if reason is not None:
+            set_outcome(reason)
+            await self._alog(user=user, username=username, outcome=HoneywordEvent.OUTCOME_INVALID, request=request)
+            return None
+
+        verdict = await aamnesia_check(user, password)
+        outcome = self._event_outcome(verdict)
+        event = None
+        if outcome is not None:
+            event = await self._alog(user=user, username=username, outcome=outcome, request=request)
+
+        if verdict == "breach":
+            await honeyword_detected.asend(
+                sender=self.__class__, user=user, username=username, request=request, event=event,
             )
+            action, apply, kwargs = self._policy_action(sync=False)
+            if apply is not None:
+                with phase("policy_action"):
+                    await apply(user, **kwargs)
+            metrics.count_policy_action(action)
+
+        return user if verdict == "success" else None
 
-            action = get_setting("ON_HONEYWORD")
-            if action == "reset":
-                apply_reset(user)
-            elif action == "lock":
-                apply_lock(
-                    user,
-                    base_seconds=get_setting("LOCK_BASE_SECONDS"),
-                    max_seconds=get_setting("LOCK_MAX_SECONDS"),
-                )
+    def _find_user(self, username):
+        User = get_user_model()
+        try:
+            # Respect custom user models and normalization rules.
+            with phase("user_lookup"):
+                return self._load_user(User, username)
+        except User.DoesNotExist:
+            return None
+
+    async def _afind_user(self, username):
+        User = get_user_model()
+        try:
+            with phase("user_lookup"):
+                return await self._aload_user(User, username)
+        except User.DoesNotExist:
             return None
 
-        # "invalid"
-        log_event(user=user, username=username, outcome=HoneywordEvent.OUTCOME_INVALID, request=request)
+    def _rejection(self, user) -> str | None:
+        """Why a user is refused before the policy gate, or None."""
+        if user is None:
+            return "unknown_user"
+        # Respect Django's inactive-user semantics (and any custom override).
+        if not self.user_can_authenticate(user):
+            return "inactive"
         return None
 
+    @staticmethod
+    def _event_outcome(verdict: str) -> str | None:
+        """Record the verdict; the HoneywordEvent outcome to log for it, if any."""
+        set_outcome(verdict)
+        if verdict == "success":
+            # In Amnesia, success means a *marked* credential matched (real or honeyword).
+            return HoneywordEvent.OUTCOME_REAL if get_setting("LOG_REAL_SUCCESS") else None
+        if verdict == "breach":
+            return HoneywordEvent.OUTCOME_HONEY
+        if verdict == "throttled":
+            return HoneywordEvent.OUTCOME_THROTTLED
+        return HoneywordEvent.OUTCOME_INVALID
+
+    @staticmethod
+    def _policy_action(*, sync: bool):
+        """(ON_HONEYWORD action, policy function or None, its kwargs)."""
+        action = get_setting("ON_HONEYWORD")
+        if action == "reset":
+            return action, apply_reset if sync else aapply_reset, {}
+        if action == "lock":
+            kwargs = {
+                "base_seconds": get_setting("LOCK_BASE_SECONDS"),
+                "max_seconds": get_setting("LOCK_MAX_SECONDS"),
+            }
+            return action, apply_lock if sync else aapply_lock, kwargs
+        return action, None, {}
+
+    def _log(self, **kwargs):
+        with phase("event"):
+            return log_event(**kwargs)
+
+    async def _alog(self, **kwargs):
+        with phase("event"):
+            return await alog_event(**kwargs)
+
     def get_user(self, user_id):
         User = get_user_model()
         try:
             return User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+
+    async def aget_user(self, user_id):
+        User = get_user_model()
+        try:
+            return await User.objects.aget(pk=user_id)
         except User.DoesNotExist:
             return None
\ No newline at end of file
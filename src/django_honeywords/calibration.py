@@ -0,0 +1,192 @@
+"""Hasher cost calibration that accounts for k.
+
+A login against an amnesia_v1 set runs up to k password-hasher calls (every
+candidate, for a wrong password) and amnesia_initialize() always runs k, so
+the per-login cost is not the single-hash cost operators usually tune for.
+amnesia_v2 sets run one PBKDF2 derivation per login and k per enrollment.
+
+measure() times one hash on this machine; estimate() turns that into login
+and enrollment latency for a k and algorithm; recommend() scales the hasher
+work factor, or k, to fit a latency budget. Used by the honeywords_calibrate
+command and the LOGIN_COST_BUDGET_MS system check.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import statistics
+import time
+from dataclasses import dataclass
+
+from django.contrib.auth.hashers import get_hasher
+from django.utils.crypto import get_random_string, pbkdf2
+
+from .amnesia_service import _v2_iterations
+from .conf import get_setting
+from .models import AmnesiaSet
+
+_PASSWORD = "calibration-password"
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Milliseconds for one candidate hash under the given parameters."""
+
+    algorithm: str  # hasher algorithm, or "amnesia_v2" for the v2 derivation
+    params: dict
+    hash_ms: float
+
+
+@dataclass(frozen=True)
+class Estimate:
+    algorithm_version: str
+    k: int
+    verify_lanes: int
+    init_lanes: int
+    hash_ms: float
+    login_worst_ms: float  # wrong password: every candidate checked
+    login_average_ms: float  # correct password: half the candidates on average
+    enroll_ms: float
+
+
+def _tunable(hasher) -> dict:
+    """The work-factor parameters of a Django hasher, if it has any we know."""
+    params = {}
+    for name in ("iterations", "rounds", "time_cost", "memory_cost", "work_factor"):
+        value = getattr(hasher, name, None)
+        if isinstance(value, int):
+            params[name] = value
+    return params
+
+
+def _median_ms(fn, samples: int) -> float:
+    times = []
+    for _ in range(max(1, samples)):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000.0
+
+
+def measure(algorithm_version: str, *, hasher=None, samples: int = 3, max_iterations: int | None = None) -> Measurement:
+    """Time one candidate hash for algorithm_version.
+
+    amnesia_v1 uses hasher (default: the first of PASSWORD_HASHERS);
+    amnesia_v2 uses PBKDF2-SHA256 at AMNESIA_V2_ITERATIONS. Iteration-based
+    KDFs scale linearly, so with max_iterations set a larger count is timed
+    at max_iterations and scaled up (a quick estimate for system checks).
+    """
+    if algorithm_version == AmnesiaSet.ALGORITHM_V2:
+        salt = get_random_string(22)
+        iterations = _v2_iterations()
+        timed = min(iterations, max_iterations or iterations)
+        ms = _median_ms(lambda: pbkdf2(_PASSWORD, salt, timed, digest=hashlib.sha256), samples)
+        return Measurement("amnesia_v2", {"iterations": iterations}, ms * iterations / timed)
+
+    if algorithm_version != AmnesiaSet.ALGORITHM_V1:
+        raise ValueError(f"unknown algorithm_version: {algorithm_version!r}")
+
+    hasher = hasher or get_hasher("default")
+    salt = hasher.salt()
+    params = _tunable(hasher)
+    iterations = params.get("iterations")
+    if iterations and max_iterations and iterations > max_iterations:
+        ms = _median_ms(lambda: hasher.encode(_PASSWORD, salt, max_iterations), samples)
+        ms *= iterations / max_iterations
+    else:
+        ms = _median_ms(lambda: hasher.encode(_PASSWORD, salt), samples)
+    return Measurement(hasher.algorithm, params, ms)
+
+
+def _lanes(enabled: str, max_workers: str, k: int) -> int:
+    if not get_setting(enabled):
+        return 1
+    return max(1, min(int(get_setting(max_workers)), k, os.cpu_count() or 1))
+
+
+def estimate(measurement: Measurement, *, k: int, algorithm_version: str) -> Estimate:
+    """Login and enrollment latency for k candidates at measurement.hash_ms.
+
+    Parallel verification and initialization (PARALLEL_VERIFY / PARALLEL_INIT)
+    split the work over up to their MAX_WORKERS lanes, capped at the CPU
+    count. The worst case ignores the fingerprint prefilter, which sets
+    stored without fingerprints do not get.
+    """
+    verify_lanes = _lanes("PARALLEL_VERIFY", "PARALLEL_VERIFY_MAX_WORKERS", k)
+    init_lanes = _lanes("PARALLEL_INIT", "PARALLEL_INIT_MAX_WORKERS", k)
+    ms = measurement.hash_ms
+    if algorithm_version == AmnesiaSet.ALGORITHM_V2:
+        login_worst = login_average = ms
+    else:
+        login_worst = math.ceil(k / verify_lanes) * ms
+        login_average = math.ceil((k + 1) / 2 / verify_lanes) * ms
+    return Estimate(
+        algorithm_version=algorithm_version,
+        k=k,
+        verify_lanes=verify_lanes,
+        init_lanes=init_lanes,
+        hash_ms=ms,
+        login_worst_ms=login_worst,
+        login_average_ms=login_average,
+        enroll_ms=math.ceil(k / init_lanes) * ms,
+    )
+
+
+def scale_params(params: dict, factor: float) -> dict | None:
+    """Work-factor parameters for factor times the current cost, or None.
+
+    Iterations and Argon2 time_cost scale linearly (Argon2 memory_cost takes
+    over when time_cost would drop below 1); bcrypt rounds and the scrypt
+    work factor are powers of two.
+    """
+    if factor <= 0:
+        return None
+    if "iterations" in params:
+        iterations = int(params["iterations"] * factor)
+        if iterations >= 10000:
+            iterations -= iterations % 1000
+        return {"iterations": max(1, iterations)}
+    if "time_cost" in params:
+        time_cost = int(params["time_cost"] * factor)
+        if time_cost >= 1:
+            return {"time_cost": time_cost, "memory_cost": params.get("memory_cost")}
+        memory = params.get("memory_cost")
+        if not memory:
+            return {"time_cost": 1}
+        return {"time_cost": 1, "memory_cost": max(8, int(memory * params["time_cost"] * factor))}
+    if "rounds" in params:
+        return {"rounds": max(4, params["rounds"] + math.floor(math.log2(factor)))}
+    if "work_factor" in params:
+        return {"work_factor": max(2, 2 ** math.floor(math.log2(params["work_factor"] * factor)))}
+    return None
+
+
+@dataclass(frozen=True)
+class Recommendation:
+    budget_ms: float
+    params: dict | None  # work factor that fits the budget at the current k
+    k: int | None  # largest k that fits the budget at the current parameters
+
+
+def recommend(measurement: Measurement, est: Estimate, budget_ms: float) -> Recommendation:
+    """Fit the worst-case login into budget_ms by changing one knob at a time."""
+    factor = budget_ms / est.login_worst_ms if est.login_worst_ms > 0 else 0.0
+    params = scale_params(measurement.params, factor)
+
+    k = None
+    if est.algorithm_version == AmnesiaSet.ALGORITHM_V1 and measurement.hash_ms > 0:
+        # ceil(k / lanes) hashes per worst-case login
+        k = int(budget_ms // measurement.hash_ms) * est.verify_lanes
+    return Recommendation(budget_ms=budget_ms, params=params, k=k)
+
+
+def calibrate(*, k: int | None = None, algorithm_version: str | None = None, samples: int = 3,
+              max_iterations: int | None = None) -> tuple[Measurement, Estimate]:
+    """measure() and estimate() for the configured (or given) k and algorithm."""
+    if k is None:
+        k = int(get_setting("AMNESIA_K"))
+    if algorithm_version is None:
+        algorithm_version = get_setting("AMNESIA_ALGORITHM")
+    measurement = measure(algorithm_version, samples=samples, max_iterations=max_iterations)
+    return measurement, estimate(measurement, k=k, algorithm_version=algorithm_version)
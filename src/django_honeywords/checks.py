@@ -4,6 +4,12 @@ from django.conf import settings
 from django.core.checks import Warning, register
 from django.urls import NoReverseMatch, reverse
 
+from .conf import get_setting
+
+# Iteration-based hashers are timed at this count and scaled, so the check
+# stays fast even with Django's default PBKDF2 iterations.
+_CHECK_MAX_ITERATIONS = 10000
+
 
 @register()
 def honeywords_deployment_checks(app_configs, **kwargs):
@@ -72,4 +78,44 @@ def honeywords_deployment_checks(app_configs, **kwargs):
                 )
             )
 
+    if get_setting("FINGERPRINT_PEPPER") and get_setting("AMNESIA_STORAGE") == "packed":
+        errors.append(
+            Warning(
+                "FINGERPRINT_PEPPER is set but AMNESIA_STORAGE is 'packed'.",
+                hint=(
+                    "Packed sets store no fingerprints, so their logins skip the prefilter and "
+                    "always run the amnesia_v2 derivation (amnesia_convert_storage --to packed "
+                    "drops existing fingerprints too). Use 'rows' storage to keep the prefilter, "
+                    "or unset the pepper."
+                ),
+                id="django_honeywords.W007",
+            )
+        )
+
     return errors
+
+
+@register(deploy=True)
+def honeywords_login_cost_check(app_configs, **kwargs):
+    """W006: live hash benchmark, so only run by 'manage.py check --deploy'."""
+    budget = get_setting("LOGIN_COST_BUDGET_MS")
+    if budget is None:
+        return []
+
+    from .calibration import calibrate
+
+    measurement, est = calibrate(samples=1, max_iterations=_CHECK_MAX_ITERATIONS)
+    if est.login_worst_ms <= float(budget):
+        return []
+    return [
+        Warning(
+            f"Estimated worst-case login cost is {est.login_worst_ms:.0f} ms "
+            f"({est.algorithm_version}, k={est.k}, {est.hash_ms:.1f} ms per {measurement.algorithm} hash), "
+            f"above LOGIN_COST_BUDGET_MS={budget}.",
+            hint=(
+                "A wrong password checks every candidate. Run 'manage.py honeywords_calibrate' "
+                "for hasher parameters and k that fit the budget."
+            ),
+            id="django_honeywords.W006",
+        )
+    ]
@@ -10,6 +10,66 @@ DEFAULTS = {
     "AMNESIA_K": 20,
     "AMNESIA_P_MARK": 0.1,
     "AMNESIA_P_REMARK": 0.01,
+    "AMNESIA_ALGORITHM": "amnesia_v1",  # amnesia_v1 | amnesia_v2
+    "AMNESIA_V2_ITERATIONS": None,  # None -> Django's PBKDF2 default
+    "AMNESIA_STORAGE": "rows",  # rows | packed (packed requires amnesia_v2)
+    "REMARK_MODE": "inline",  # inline | deferred
+    "REMARK_QUEUE_SIZE": 10000,  # max sets waiting for a deferred remark
+
+    # Event sink: db | buffered | logging | null | dotted path to an EventSink
+    "EVENT_SINK": "db",
+    "EVENT_BUFFER_SIZE": 10000,  # max events held by the buffered sink
+    "EVENT_BATCH_SIZE": 500,  # rows per bulk_create
+    "EVENT_FLUSH_INTERVAL": 1.0,  # seconds between background flushes
+
+    "EVENT_RETENTION_DAYS": None,  # default window for honeywords_purge_events
+
+    # Policy gate cache (see policy_cache.py)
+    "POLICY_CACHE": False,
+    "POLICY_CACHE_ALIAS": "default",  # Django cache used as the shared tier
+    "POLICY_CACHE_TTL": 300,  # seconds; lock entries never outlive the lock
+    "POLICY_CACHE_L1_TTL": 2.0,  # seconds an entry is reused from process memory
+    "POLICY_CACHE_L1_SIZE": 10000,  # entries kept in process memory
+
+    # Event admin
+    "ADMIN_COUNT_LIMIT": 10000,  # changelist counts stop here
+    "ADMIN_SEARCH_MODE": "prefix",  # prefix | exact | contains
+
+    # Hourly rollups (honeywords_rollup)
+    "ROLLUP_LAG_SECONDS": 300,  # leave events this recent for the next run
+
+    # Fold OUTCOME_INVALID attempts into per-(username, ip, bucket) counters
+    "AGGREGATE_INVALID": False,
+    "AGGREGATE_BUCKET_SECONDS": 300,
+
+    # Candidate prefilter (disabled unless a pepper is set)
+    "FINGERPRINT_PEPPER": None,
+    "FINGERPRINT_LENGTH": 4,  # hex chars stored per candidate (4 -> 16 bits)
+
+    # Parallel candidate verification (amnesia_v1 sets)
+    "PARALLEL_VERIFY": False,
+    "PARALLEL_POOL_SIZE": None,  # None -> os.cpu_count(); fixed per process
+    "PARALLEL_VERIFY_MAX_WORKERS": 4,  # threads one login may use
+
+    # Parallel hashing of new sets (amnesia_initialize), on the same pool
+    "PARALLEL_INIT": False,
+    "PARALLEL_INIT_MAX_WORKERS": 4,  # threads one initialization may use
+
+    # KDF concurrency limiter (disabled unless KDF_MAX_INFLIGHT is set)
+    "KDF_MAX_INFLIGHT": None,
+    "KDF_MAX_QUEUE": None,  # None -> unbounded, bounded by KDF_QUEUE_TIMEOUT
+    "KDF_QUEUE_TIMEOUT": 1.0,  # seconds
+
+    # Worst-case login latency budget checked at startup (check W006)
+    "LOGIN_COST_BUDGET_MS": None,
+
+    # Per-login phase / hash / query breakdown (see timing.py)
+    "LOGIN_TIMING": False,
+
+    # Prometheus metrics (see metrics.py, served by django_honeywords.urls)
+    "METRICS": False,
+    "METRICS_DIR": None,  # None -> per-process memory; a directory -> aggregated across processes
+    "METRICS_TOKEN": None,  # bearer token required by the metrics view
 }
 
 
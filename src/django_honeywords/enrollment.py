@@ -0,0 +1,124 @@
+"""Bulk enrollment: build and store Amnesia sets for many users at once.
+
+Used by the amnesia_bulk_init command. Records stream in from JSONL or CSV;
+sets are prepared (generated and hashed) in worker processes, and each batch
+is stored with a few bulk statements in one transaction.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+from typing import Iterable, Iterator, TextIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .amnesia_service import PreparedSet, prepare_set
+from .models import AmnesiaCredential, AmnesiaSet
+
+FORMATS = ("jsonl", "csv")
+
+
+class RecordError(ValueError):
+    pass
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[tuple[int, str, str] | tuple[int, None, str]]:
+    """Yield (record number, username, password) without reading ahead.
+
+    A malformed record yields (number, None, reason) so the caller can count
+    and report it without stopping the run.
+    """
+    if fmt == "jsonl":
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield number, _field(record, "username"), _field(record, "password")
+            except (ValueError, TypeError) as e:
+                yield number, None, str(e)
+    elif fmt == "csv":
+        for number, record in enumerate(csv.DictReader(stream), 1):
+            try:
+                yield number, _field(record, "username"), _field(record, "password")
+            except RecordError as e:
+                yield number, None, str(e)
+    else:
+        raise ValueError(f"unknown format: {fmt!r}")
+
+
+def _field(record, name: str) -> str:
+    value = record.get(name) if isinstance(record, dict) else None
+    if not isinstance(value, str) or not value:
+        raise RecordError(f"missing or empty {name!r}")
+    return value
+
+
+def prepare_record(job: tuple[str, str, dict]) -> tuple[str, PreparedSet | None, str]:
+    """Worker-side: (username, password, options) -> (username, set or None, error)."""
+    username, password, options = job
+    try:
+        return username, prepare_set(password, **options), ""
+    except ValueError as e:
+        return username, None, str(e)
+
+
+def init_worker() -> None:
+    """Process-pool initializer for start methods that don't fork."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def store_batch(prepared: Iterable[tuple[str, PreparedSet]], *, batch_size: int = 1000) -> tuple[int, list[str]]:
+    """Store sets for existing users in one transaction.
+
+    Existing sets of those users are replaced. Returns (stored, unknown
+    usernames).
+    """
+    prepared = dict(prepared)
+    User = get_user_model()
+    username_field = User.USERNAME_FIELD
+    users = {
+        getattr(u, username_field): u
+        for u in User._default_manager.filter(**{f"{username_field}__in": list(prepared)}).only("pk", username_field)
+    }
+    unknown = [name for name in prepared if name not in users]
+
+    with transaction.atomic():
+        AmnesiaSet.objects.filter(user__in=users.values()).delete()
+        sets = AmnesiaSet.objects.bulk_create(
+            [AmnesiaSet(user=user, **prepared[name].set_fields()) for name, user in users.items()],
+            batch_size=batch_size,
+        )
+        if sets and sets[0].pk is None:
+            # Backends that don't return primary keys from bulk inserts.
+            by_user = {a.user_id: a for a in AmnesiaSet.objects.filter(user__in=users.values())}
+            sets = [by_user[u.pk] for u in users.values()]
+        creds = []
+        for aset, name in zip(sets, users):
+            creds.extend(prepared[name].credentials(aset))
+        AmnesiaCredential.objects.bulk_create(creds, batch_size=batch_size)
+        # One unusable hash per batch; any "!"-prefixed value blocks password login.
+        User._default_manager.filter(pk__in=[u.pk for u in users.values()]).update(password=make_password(None))
+
+    return len(sets), unknown
+
+
+def read_checkpoint(path: str) -> dict:
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def write_checkpoint(path: str, state: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(state, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
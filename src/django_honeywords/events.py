@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from typing import Optional
 
+from asgiref.sync import sync_to_async
 from django.http import HttpRequest
 
+from .aggregation import increment_invalid
+from .conf import get_setting
 from .models import HoneywordEvent
+from .sinks import get_sink
 
 
 def _get_ip(request: Optional[HttpRequest]) -> str | None:
@@ -20,11 +24,41 @@ def _get_ua(request: Optional[HttpRequest]) -> str:
     return request.META.get("HTTP_USER_AGENT", "")[:2000]
 
 
-def log_event(*, user, username: str, outcome: str, request: Optional[HttpRequest]) -> HoneywordEvent:
-    return HoneywordEvent.objects.create(
+def _build_event(*, user, username: str, outcome: str, request: Optional[HttpRequest]) -> HoneywordEvent:
+    return HoneywordEvent(
         user=user,
         username=username or "",
         outcome=outcome,
         ip_address=_get_ip(request),
         user_agent=_get_ua(request),
     )
+
+
+def _aggregated(event: HoneywordEvent) -> bool:
+    return event.outcome == HoneywordEvent.OUTCOME_INVALID and get_setting("AGGREGATE_INVALID")
+
+
+def log_event(*, user, username: str, outcome: str, request: Optional[HttpRequest]) -> HoneywordEvent:
+    """Record an attempt through the configured sink (see sinks.py).
+
+    Always returns the HoneywordEvent; it is unsaved when the sink does not
+    write it to the database immediately, or when the attempt was folded into
+    a HoneywordInvalidCounter (AGGREGATE_INVALID).
+    """
+    event = _build_event(user=user, username=username, outcome=outcome, request=request)
+    if _aggregated(event):
+        increment_invalid(username=event.username, ip_address=event.ip_address, at=event.created_at)
+    else:
+        get_sink().emit(event)
+    return event
+
+
+async def alog_event(*, user, username: str, outcome: str, request: Optional[HttpRequest]) -> HoneywordEvent:
+    event = _build_event(user=user, username=username, outcome=outcome, request=request)
+    if _aggregated(event):
+        await sync_to_async(increment_invalid)(
+            username=event.username, ip_address=event.ip_address, at=event.created_at
+        )
+    else:
+        await get_sink().aemit(event)
+    return event
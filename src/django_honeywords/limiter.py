@@ -0,0 +1,139 @@
+"""Process-wide cap on concurrent password verifications.
+
+Each amnesia_v1 login can run up to k KDFs, and memory-hard hashers such as
+Argon2 allocate their memory cost for each one. The limiter bounds how many
+logins verify candidates at once in this process, queues the rest with a
+timeout and raises KDFSaturated when the queue is full, so a login flood
+degrades into fast rejections instead of exhausting CPU or memory.
+
+A login takes one slot for its whole candidate scan: once admitted it runs
+to completion, so no KDF work is spent on a login that is then rejected.
+Enrollment (amnesia_initialize) does not take slots.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from .conf import get_setting
+
+
+class KDFSaturated(Exception):
+    """No KDF slot became available (queue full or wait timed out)."""
+
+
+class KDFLimiter:
+    def __init__(self, max_inflight: int, *, max_queue: int | None = None, timeout: float = 1.0):
+        if max_inflight < 1:
+            raise ValueError("max_inflight must be >= 1")
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._queued = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._cond:
+            self._max_queued = 0
+            self._acquired = 0
+            self._rejected = 0
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+
+    def acquire(self) -> None:
+        start = time.monotonic()
+        with self._cond:
+            if self._queued == 0 and self._inflight < self.max_inflight:
+                self._inflight += 1
+                self._acquired += 1
+                return
+
+            if self.max_queue is not None and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise KDFSaturated("KDF queue is full")
+
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+            try:
+                ok = self._cond.wait_for(lambda: self._inflight < self.max_inflight, self.timeout)
+            finally:
+                self._queued -= 1
+
+            waited = time.monotonic() - start
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            if not ok:
+                self._rejected += 1
+                raise KDFSaturated(f"no KDF slot within {self.timeout}s")
+
+            self._inflight += 1
+            self._acquired += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_inflight": self.max_inflight,
+                "inflight": self._inflight,
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "acquired": self._acquired,
+                "rejected": self._rejected,
+                "wait_seconds_total": self._wait_total,
+                "wait_seconds_max": self._wait_max,
+            }
+
+
+_limiter: KDFLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> KDFLimiter | None:
+    """Return the process-wide limiter, or None if KDF_MAX_INFLIGHT is unset.
+
+    The limiter is rebuilt (and its stats reset) if the settings change.
+    """
+    global _limiter
+    max_inflight = get_setting("KDF_MAX_INFLIGHT")
+    if not max_inflight:
+        return None
+    max_queue = get_setting("KDF_MAX_QUEUE")
+    timeout = float(get_setting("KDF_QUEUE_TIMEOUT"))
+    with _limiter_lock:
+        current = _limiter
+        if (
+            current is None
+            or current.max_inflight != int(max_inflight)
+            or current.max_queue != max_queue
+            or current.timeout != timeout
+        ):
+            current = _limiter = KDFLimiter(int(max_inflight), max_queue=max_queue, timeout=timeout)
+        return current
+
+
+def kdf_slot():
+    """Context manager holding one verification slot (a no-op when limiting is disabled)."""
+    limiter = get_limiter()
+    if limiter is None:
+        return nullcontext()
+    return limiter.slot()
+
+
+def kdf_stats() -> dict | None:
+    limiter = get_limiter()
+    return None if limiter is None else limiter.stats()
@@ -0,0 +1,271 @@
+"""In-process load generator for the full authenticate() path.
+
+Used by the honeywords_loadtest command. Synthetic users are seeded through
+the bulk enrollment path (prepare_set + store_batch, as amnesia_bulk_init),
+then authenticate() runs a weighted mix of real, honey and invalid passwords
+from several threads or processes against the configured database.
+
+Seeded passwords embed a random per-run token, so users left behind by a run
+cannot be logged into afterwards. Cleanup deletes only the users a run
+created, by primary key, never by username prefix.
+"""
+from __future__ import annotations
+
+import math
+import random
+import secrets
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.db.models import Q
+
+from .enrollment import init_worker, prepare_record, store_batch
+from .limiter import kdf_stats
+from .models import HoneywordEvent, HoneywordInvalidCounter
+from .sinks import flush_events
+
+KINDS = ("real", "honey", "invalid")
+MODES = ("thread", "process")
+
+
+class SyntheticGenerator:
+    """Honeywords derived from the real password, so the load test knows one."""
+
+    def honeywords(self, real: str, k: int) -> list[str]:
+        return [real] + [f"{real}~{i}" for i in range(1, k)]
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """'real=80,honey=5,invalid=15' -> {kind: weight}."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, sep, weight = part.partition("=")
+        if not sep or kind not in KINDS:
+            raise ValueError(f"mix entries look like {'|'.join(KINDS)}=<weight>, got {part!r}")
+        try:
+            mix[kind] = float(weight)
+        except ValueError:
+            raise ValueError(f"weight for {kind!r} is not a number: {weight!r}") from None
+        if mix[kind] < 0:
+            raise ValueError(f"weight for {kind!r} must not be negative")
+    if not any(mix.values()):
+        raise ValueError("mix needs at least one positive weight")
+    return mix
+
+
+def _password(token: str, i: int) -> str:
+    return f"{token}-{i}"
+
+
+def seed_users(n: int, *, prefix: str, options: dict, workers: int = 0,
+               batch_size: int = 1000) -> tuple[str, list[int]]:
+    """Create n users named prefix + number with Amnesia sets.
+
+    Returns (run token, pks of the created users). Pass the pks to
+    purge_users(); nothing else is ever deleted. If seeding fails, the users
+    created so far are removed before the error propagates.
+    """
+    token = secrets.token_urlsafe(12)
+    User = get_user_model()
+    username_field = User.USERNAME_FIELD
+    unusable = make_password(None)
+    options = dict(options, generator=SyntheticGenerator())
+    pks: list[int] = []
+
+    pool = None
+    if workers > 0:
+        connections.close_all()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+    try:
+        for start in range(0, n, batch_size):
+            numbers = range(start, min(n, start + batch_size))
+            usernames = [f"{prefix}{i}" for i in numbers]
+            created = User._default_manager.bulk_create(
+                [User(**{username_field: name, "password": unusable}) for name in usernames],
+                batch_size=batch_size,
+            )
+            if created and created[0].pk is None:
+                # Backends that don't return primary keys from bulk inserts.
+                created = User._default_manager.filter(**{f"{username_field}__in": usernames}).only("pk")
+            pks.extend(u.pk for u in created)
+            jobs = [(f"{prefix}{i}", _password(token, i), options) for i in numbers]
+            results = pool.map(prepare_record, jobs, chunksize=16) if pool else map(prepare_record, jobs)
+            prepared = []
+            for username, aset, error in results:
+                if aset is None:
+                    raise ValueError(f"{username}: {error}")
+                prepared.append((username, aset))
+            store_batch(prepared, batch_size=batch_size)
+    except BaseException:
+        purge_users(pks)
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return token, pks
+
+
+def purge_users(pks, *, batch_size: int = 500) -> int:
+    """Delete the given seeded users and the events and counters they produced."""
+    User = get_user_model()
+    username_field = User.USERNAME_FIELD
+    pks = list(pks)
+    deleted = 0
+    for start in range(0, len(pks), batch_size):
+        chunk = pks[start:start + batch_size]
+        usernames = list(User._default_manager.filter(pk__in=chunk).values_list(username_field, flat=True))
+        HoneywordEvent.objects.filter(Q(user_id__in=chunk) | Q(username__in=usernames)).delete()
+        HoneywordInvalidCounter.objects.filter(username__in=usernames).delete()
+        n, _ = User._default_manager.filter(pk__in=chunk).delete()
+        deleted += n
+    return deleted
+
+
+def build_jobs(requests: int, *, users: int, k: int, prefix: str, token: str, mix: dict[str, float],
+               seed: int | None = None) -> list[tuple[str, str, str]]:
+    """(kind, username, password) for each login, drawn from mix."""
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+    jobs = []
+    for kind in kinds:
+        i = rng.randrange(users)
+        password = _password(token, i)
+        if kind == "honey":
+            password = f"{password}~{rng.randrange(1, k)}"
+        elif kind == "invalid":
+            password = f"wrong-{rng.getrandbits(64):x}"
+        jobs.append((kind, f"{prefix}{i}", password))
+    return jobs
+
+
+@dataclass
+class WorkerResult:
+    latencies: list[float] = field(default_factory=list)  # seconds, one per login
+    queries: int = 0
+    db_seconds: float = 0.0  # wall time inside queries, lock waits included
+    outcomes: Counter = field(default_factory=Counter)  # (kind, accepted|rejected|error)
+    errors: Counter = field(default_factory=Counter)  # exception class name
+    kdf_wait_seconds: float = 0.0
+    kdf_rejected: int = 0
+
+    def merge(self, other: "WorkerResult") -> None:
+        self.latencies.extend(other.latencies)
+        self.queries += other.queries
+        self.db_seconds += other.db_seconds
+        self.outcomes.update(other.outcomes)
+        self.errors.update(other.errors)
+        self.kdf_wait_seconds += other.kdf_wait_seconds
+        self.kdf_rejected += other.kdf_rejected
+
+
+def _kdf_totals() -> tuple[float, int]:
+    stats = kdf_stats()
+    if stats is None:
+        return 0.0, 0
+    return stats["wait_seconds_total"], stats["rejected"]
+
+
+def run_jobs(jobs) -> WorkerResult:
+    """Log in for each job on this thread, counting queries and database time."""
+    result = WorkerResult()
+
+    def count(execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            result.queries += 1
+            result.db_seconds += time.perf_counter() - t0
+
+    try:
+        with connection.execute_wrapper(count):
+            for kind, username, password in jobs:
+                t0 = time.perf_counter()
+                try:
+                    user = authenticate(None, username=username, password=password)
+                except Exception as e:
+                    result.outcomes[kind, "error"] += 1
+                    result.errors[type(e).__name__] += 1
+                else:
+                    result.outcomes[kind, "accepted" if user is not None else "rejected"] += 1
+                result.latencies.append(time.perf_counter() - t0)
+    finally:
+        connection.close()
+    return result
+
+
+def _process_worker(jobs) -> WorkerResult:
+    wait_before, rejected_before = _kdf_totals()
+    result = run_jobs(jobs)
+    # Pool processes exit without running atexit hooks.
+    flush_events()
+    wait_after, rejected_after = _kdf_totals()
+    result.kdf_wait_seconds = wait_after - wait_before
+    result.kdf_rejected = rejected_after - rejected_before
+    return result
+
+
+def run_load(jobs, *, concurrency: int, mode: str = "thread") -> tuple[WorkerResult, float]:
+    """Split jobs over concurrency threads or processes; return (result, wall seconds)."""
+    if mode not in MODES:
+        raise ValueError(f"unknown mode: {mode!r}")
+    lanes = [jobs[i::concurrency] for i in range(concurrency)]
+    total = WorkerResult()
+
+    if mode == "process":
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=concurrency, initializer=init_worker) as pool:
+            started = time.perf_counter()
+            for result in pool.map(_process_worker, lanes):
+                total.merge(result)
+            elapsed = time.perf_counter() - started
+        return total, elapsed
+
+    wait_before, rejected_before = _kdf_totals()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="honeywords-load") as pool:
+        started = time.perf_counter()
+        for result in pool.map(run_jobs, lanes):
+            total.merge(result)
+        elapsed = time.perf_counter() - started
+    wait_after, rejected_after = _kdf_totals()
+    total.kdf_wait_seconds = wait_after - wait_before
+    total.kdf_rejected = rejected_after - rejected_before
+    return total, elapsed
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(result: WorkerResult, elapsed: float) -> dict:
+    ordered = sorted(result.latencies)
+    n = len(ordered)
+    outcomes: dict[str, dict[str, int]] = {}
+    for (kind, outcome), count in sorted(result.outcomes.items()):
+        outcomes.setdefault(kind, {"accepted": 0, "rejected": 0, "error": 0})[outcome] = count
+    return {
+        "logins": n,
+        "seconds": elapsed,
+        "logins_per_second": n / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(ordered, 50) * 1000,
+            "p95": percentile(ordered, 95) * 1000,
+            "p99": percentile(ordered, 99) * 1000,
+            "max": (ordered[-1] if ordered else 0.0) * 1000,
+        },
+        "queries": result.queries,
+        "queries_per_login": result.queries / n if n else 0.0,
+        "db_ms_per_login": result.db_seconds * 1000 / n if n else 0.0,
+        "kdf_wait_seconds": result.kdf_wait_seconds,
+        "kdf_rejected": result.kdf_rejected,
+        "outcomes": outcomes,
+        "errors": dict(result.errors),
+    }
@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from django_honeywords.conf import get_setting
+from django_honeywords.enrollment import (
+    FORMATS,
+    init_worker,
+    iter_records,
+    prepare_record,
+    read_checkpoint,
+    store_batch,
+    write_checkpoint,
+)
+from django_honeywords.models import AmnesiaSet
+
+
+class Command(BaseCommand):
+    help = "Initialize Amnesia credentials for many users from a JSONL or CSV stream of username/password records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Path to a .jsonl or .csv file, or '-' for stdin.")
+        parser.add_argument("--format", choices=FORMATS, default=None,
+                            help="Input format (default: from the file extension; jsonl for stdin).")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Hashing processes (default: CPU count; 0 hashes in this process).")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Users stored per transaction.")
+        parser.add_argument("--checkpoint", metavar="PATH",
+                            help="Record progress here after every batch.")
+        parser.add_argument("--resume", action="store_true",
+                            help="Skip the records already stored according to --checkpoint.")
+        parser.add_argument("--k", type=int, default=None)
+        parser.add_argument("--p-mark", type=float, default=None)
+        parser.add_argument("--p-remark", type=float, default=None)
+        parser.add_argument("--algorithm", default=None, choices=AmnesiaSet.ALGORITHMS)
+        parser.add_argument("--storage", default=None, choices=AmnesiaSet.STORAGES)
+
+    def handle(self, *args, **opts):
+        source = opts["input"]
+        fmt = opts["format"] or ("csv" if source.endswith(".csv") else "jsonl")
+        batch_size = opts["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+        workers = opts["workers"] if opts["workers"] is not None else (os.cpu_count() or 1)
+        if opts["resume"] and not opts["checkpoint"]:
+            raise CommandError("--resume needs --checkpoint.")
+
+        options = {
+            "k": opts["k"] if opts["k"] is not None else int(get_setting("AMNESIA_K")),
+            "p_mark": opts["p_mark"] if opts["p_mark"] is not None else float(get_setting("AMNESIA_P_MARK")),
+            "p_remark": opts["p_remark"] if opts["p_remark"] is not None else float(get_setting("AMNESIA_P_REMARK")),
+            "algorithm_version": opts["algorithm"] or get_setting("AMNESIA_ALGORITHM"),
+            "storage": opts["storage"] or get_setting("AMNESIA_STORAGE"),
+        }
+
+        skip = 0
+        totals = {"stored": 0, "unknown": 0, "invalid": 0}
+        if opts["resume"] and os.path.exists(opts["checkpoint"]):
+            checkpoint = read_checkpoint(opts["checkpoint"])
+            if checkpoint.get("input") != source:
+                raise CommandError(f"Checkpoint belongs to {checkpoint.get('input')!r}, not {source!r}.")
+            skip = checkpoint["records"]
+            totals.update(checkpoint["totals"])
+            self.stdout.write(f"Resuming after record {skip}.")
+
+        stream = sys.stdin if source == "-" else open(source, newline="" if fmt == "csv" else None)
+        pool = None
+        if workers > 0:
+            # Children must not share the parent's database connections.
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+        hash_map = pool.map if pool else map
+
+        started = time.monotonic()
+        processed = 0
+        try:
+            records = iter_records(stream, fmt)
+            for _ in islice(records, skip):
+                pass
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                jobs = []
+                for number, username, password in batch:
+                    if username is None:
+                        totals["invalid"] += 1
+                        self.stderr.write(f"record {number}: {password}")
+                    else:
+                        jobs.append((username, password, options))
+                prepared = []
+                for username, aset, error in hash_map(prepare_record, jobs, **({"chunksize": 16} if pool else {})):
+                    if aset is None:
+                        totals["invalid"] += 1
+                        self.stderr.write(f"{username}: {error}")
+                    else:
+                        prepared.append((username, aset))
+                del jobs
+
+                stored, unknown = store_batch(prepared)
+                totals["stored"] += stored
+                totals["unknown"] += len(unknown)
+                for username in unknown:
+                    self.stderr.write(f"{username}: user not found")
+
+                processed += len(batch)
+                if opts["checkpoint"]:
+                    write_checkpoint(
+                        opts["checkpoint"], {"input": source, "records": skip + processed, "totals": totals}
+                    )
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{skip + processed} records read, {totals['stored']} stored "
+                    f"({processed / elapsed if elapsed else 0:.0f} records/s)"
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {totals['stored']} set(s); {totals['unknown']} unknown user(s), "
+            f"{totals['invalid']} invalid record(s); {processed} record(s) in {elapsed:.1f}s ({rate:.0f}/s)."
+        ))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from django_honeywords.amnesia_service import pack_set, unpack_set
+from django_honeywords.models import AmnesiaSet
+
+
+class Command(BaseCommand):
+    help = "Convert amnesia_v2 sets between the row-per-credential and packed storage layouts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--to", required=True, choices=AmnesiaSet.STORAGES, dest="target")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        target = opts["target"]
+        batch_size = opts["batch_size"]
+
+        qs = AmnesiaSet.objects.exclude(storage=target)
+        if target == AmnesiaSet.STORAGE_PACKED:
+            qs = qs.filter(
+                algorithm_version=AmnesiaSet.ALGORITHM_V2, k__lte=AmnesiaSet.PACKED_MAX_K
+            )
+        convert = pack_set if target == AmnesiaSet.STORAGE_PACKED else unpack_set
+
+        if opts["dry_run"]:
+            self.stdout.write(f"{qs.count()} set(s) would be converted to '{target}'.")
+            return
+
+        converted = skipped = 0
+        last_pk = 0
+        while True:
+            # Walk by primary key so converted sets never shift the window.
+            batch = list(qs.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+            if not batch:
+                break
+            for aset in batch:
+                if convert(aset):
+                    converted += 1
+                else:
+                    skipped += 1
+            last_pk = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f"Converted {converted} set(s) to '{target}' ({skipped} skipped)."))
@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 
 from django_honeywords.amnesia_service import amnesia_initialize
 from django_honeywords.conf import get_setting
+from django_honeywords.models import AmnesiaSet
 
 
 class Command(BaseCommand):
@@ -14,6 +15,8 @@ class Command(BaseCommand):
         parser.add_argument("--k", type=int, default=None)
         parser.add_argument("--p-mark", type=float, default=None)
         parser.add_argument("--p-remark", type=float, default=None)
+        parser.add_argument("--algorithm", default=None, choices=AmnesiaSet.ALGORITHMS)
+        parser.add_argument("--storage", default=None, choices=AmnesiaSet.STORAGES)
 
     def handle(self, *args, **opts):
         username = opts["username"]
@@ -22,6 +25,8 @@ class Command(BaseCommand):
         k = opts["k"]
         p_mark = opts["p_mark"]
         p_remark = opts["p_remark"]
+        algorithm = opts["algorithm"]
+        storage = opts["storage"]
 
         if k is None:
             k = int(get_setting("AMNESIA_K"))
@@ -29,6 +34,10 @@ class Command(BaseCommand):
             p_mark = float(get_setting("AMNESIA_P_MARK"))
         if p_remark is None:
             p_remark = float(get_setting("AMNESIA_P_REMARK"))
+        if algorithm is None:
+            algorithm = get_setting("AMNESIA_ALGORITHM")
+        if storage is None:
+            storage = get_setting("AMNESIA_STORAGE")
 
         User = get_user_model()
         try:
@@ -36,5 +45,11 @@ class Command(BaseCommand):
         except User.DoesNotExist:
             raise CommandError(f"User not found: {username}")
 
-        amnesia_initialize(user, password, k=k, p_mark=p_mark, p_remark=p_remark)
-        self.stdout.write(self.style.SUCCESS(f"Initialized Amnesia for {username} (k={k}, p_mark={p_mark}, p_remark={p_remark})"))
+        try:
+            amnesia_initialize(
+                user, password, k=k, p_mark=p_mark, p_remark=p_remark,
+                algorithm_version=algorithm, storage=storage,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Initialized Amnesia for {username} (k={k}, p_mark={p_mark}, p_remark={p_remark}, algorithm={algorithm})"))
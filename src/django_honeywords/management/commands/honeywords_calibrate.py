@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_honeywords.calibration import calibrate, recommend
+from django_honeywords.conf import get_setting
+from django_honeywords.models import AmnesiaSet
+
+
+def _params(params: dict) -> str:
+    return ", ".join(f"{name}={value}" for name, value in params.items() if value is not None) or "no work factor"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the configured password hasher and report per-login and per-enrollment "
+        "latency for k candidates; with a budget, recommend hasher parameters and k."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=None, help="Candidates per set (default: AMNESIA_K).")
+        parser.add_argument("--algorithm", default=None, choices=AmnesiaSet.ALGORITHMS)
+        parser.add_argument("--budget-ms", type=float, default=None,
+                            help="Worst-case login budget (default: LOGIN_COST_BUDGET_MS).")
+        parser.add_argument("--samples", type=int, default=3, help="Hashes timed; the median is used.")
+
+    def handle(self, *args, **opts):
+        k = opts["k"] if opts["k"] is not None else int(get_setting("AMNESIA_K"))
+        budget = opts["budget_ms"] if opts["budget_ms"] is not None else get_setting("LOGIN_COST_BUDGET_MS")
+        if k < 2:
+            raise CommandError("--k must be >= 2.")
+        if opts["samples"] < 1:
+            raise CommandError("--samples must be positive.")
+        if budget is not None and float(budget) <= 0:
+            raise CommandError("--budget-ms must be positive.")
+
+        measurement, est = calibrate(k=k, algorithm_version=opts["algorithm"], samples=opts["samples"])
+
+        self.stdout.write(f"Hasher: {measurement.algorithm} ({_params(measurement.params)})")
+        self.stdout.write(f"One hash: {est.hash_ms:.1f} ms (median of {opts['samples']})")
+        self.stdout.write(
+            f"{est.algorithm_version}, k={est.k}, {est.verify_lanes} verify lane(s), {est.init_lanes} init lane(s):"
+        )
+        self.stdout.write(f"  login, wrong password (worst case): {est.login_worst_ms:.0f} ms")
+        self.stdout.write(f"  login, correct password (average):  {est.login_average_ms:.0f} ms")
+        self.stdout.write(f"  enrollment / password change:       {est.enroll_ms:.0f} ms")
+
+        if budget is None:
+            return
+        budget = float(budget)
+        rec = recommend(measurement, est, budget)
+        if est.login_worst_ms <= budget:
+            self.stdout.write(self.style.SUCCESS(f"Within the {budget:.0f} ms login budget."))
+        else:
+            self.stdout.write(self.style.WARNING(f"Over the {budget:.0f} ms login budget."))
+
+        if rec.params is not None:
+            self.stdout.write(f"  keep k={est.k}: {_params(rec.params)}")
+        else:
+            self.stdout.write(f"  keep k={est.k}: {measurement.algorithm} has no work factor to tune")
+        if est.algorithm_version == AmnesiaSet.ALGORITHM_V2:
+            self.stdout.write("  k does not change amnesia_v2 login cost (one derivation per login)")
+        elif rec.k is not None and rec.k >= 2:
+            self.stdout.write(f"  keep the hasher: k <= {rec.k}")
+        else:
+            self.stdout.write("  keep the hasher: no k >= 2 fits")
+        if rec.params is not None and est.login_worst_ms > budget:
+            note = "Lowering the work factor weakens every stored hash."
+            if est.algorithm_version == AmnesiaSet.ALGORITHM_V1:
+                note += " PARALLEL_VERIFY or amnesia_v2 cut login latency without doing so."
+            self.stdout.write(note)
@@ -0,0 +1,137 @@
+import json
+import os
+import secrets
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from django_honeywords.conf import get_setting
+from django_honeywords.loadgen import MODES, build_jobs, parse_mix, purge_users, run_load, seed_users, summarize
+from django_honeywords.models import AmnesiaSet
+from django_honeywords.sinks import flush_events
+
+_LANES = {"thread": "thread(s)", "process": "process(es)"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users and measure authenticate() throughput, latency percentiles, "
+        "queries and database time per login and KDF limiter waits against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000, help="Synthetic users to seed.")
+        parser.add_argument("--requests", type=int, default=10000, help="Logins to run.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Threads or processes logging in.")
+        parser.add_argument("--mode", choices=MODES, default="thread")
+        parser.add_argument("--mix", default="real=90,honey=1,invalid=9",
+                            help="Weights of real, honey and invalid passwords.")
+        parser.add_argument("--seed-workers", type=int, default=None,
+                            help="Hashing processes for seeding (default: CPU count; 0 hashes in this process).")
+        parser.add_argument("--prefix", default="honeywords-load-",
+                            help="Username prefix; each run adds its own tag after it.")
+        parser.add_argument("--yes", action="store_true",
+                            help="Run even if existing users match --prefix (they are left untouched).")
+        parser.add_argument("--keep-users", action="store_true",
+                            help="Leave the seeded users, their events and counters in place.")
+        parser.add_argument("--random-seed", type=int, default=None, help="Seed for the login mix.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+        parser.add_argument("--k", type=int, default=None)
+        parser.add_argument("--algorithm", default=None, choices=AmnesiaSet.ALGORITHMS)
+        parser.add_argument("--storage", default=None, choices=AmnesiaSet.STORAGES)
+
+    def handle(self, *args, **opts):
+        for name in ("users", "requests", "concurrency"):
+            if opts[name] < 1:
+                raise CommandError(f"--{name} must be positive.")
+        if not opts["prefix"]:
+            raise CommandError("--prefix must not be empty.")
+        try:
+            mix = parse_mix(opts["mix"])
+        except ValueError as e:
+            raise CommandError(f"--mix: {e}")
+
+        options = {
+            "k": opts["k"] if opts["k"] is not None else int(get_setting("AMNESIA_K")),
+            "p_mark": float(get_setting("AMNESIA_P_MARK")),
+            "p_remark": float(get_setting("AMNESIA_P_REMARK")),
+            "algorithm_version": opts["algorithm"] or get_setting("AMNESIA_ALGORITHM"),
+            "storage": opts["storage"] or get_setting("AMNESIA_STORAGE"),
+        }
+        seed_workers = opts["seed_workers"] if opts["seed_workers"] is not None else (os.cpu_count() or 1)
+
+        User = get_user_model()
+        existing = User._default_manager.filter(**{f"{User.USERNAME_FIELD}__startswith": opts["prefix"]}).count()
+        if existing and not opts["yes"]:
+            raise CommandError(
+                f"{existing} existing user(s) match --prefix {opts['prefix']!r}. Choose another prefix, "
+                "or pass --yes to run anyway (existing users are never modified or deleted)."
+            )
+        # The per-run tag keeps seeded usernames clear of existing ones.
+        prefix = f"{opts['prefix']}{secrets.token_hex(4)}-"
+
+        started = time.perf_counter()
+        try:
+            token, pks = seed_users(opts["users"], prefix=prefix, options=options, workers=seed_workers)
+        except ValueError as e:
+            raise CommandError(str(e))
+        seeded = time.perf_counter() - started
+
+        try:
+            jobs = build_jobs(opts["requests"], users=opts["users"], k=options["k"], prefix=prefix,
+                              token=token, mix=mix, seed=opts["random_seed"])
+            result, elapsed = run_load(jobs, concurrency=opts["concurrency"], mode=opts["mode"])
+        finally:
+            flush_events()
+            if not opts["keep_users"]:
+                purge_users(pks)
+
+        report = summarize(result, elapsed)
+        report.update({
+            "users": opts["users"],
+            "prefix": prefix,
+            "seed_seconds": seeded,
+            "concurrency": opts["concurrency"],
+            "mode": opts["mode"],
+            "k": options["k"],
+            "algorithm_version": options["algorithm_version"],
+            "storage": options["storage"],
+        })
+        if opts["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self._write(report)
+
+    def _write(self, r):
+        latency = r["latency_ms"]
+        self.stdout.write(
+            f"Seeded {r['users']} user(s) named {r['prefix']}<n> in {r['seed_seconds']:.1f}s "
+            f"(k={r['k']}, {r['algorithm_version']}, {r['storage']})."
+        )
+        self.stdout.write(
+            f"{r['logins']} login(s) in {r['seconds']:.2f}s with {r['concurrency']} {_LANES[r['mode']]}: "
+            f"{r['logins_per_second']:.1f} logins/s"
+        )
+        self.stdout.write(
+            f"latency ms: p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+            f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}"
+        )
+        self.stdout.write(
+            f"queries: {r['queries_per_login']:.2f} per login ({r['queries']} total), "
+            f"{r['db_ms_per_login']:.2f} ms database time per login (execution and lock waits)"
+        )
+        if get_setting("KDF_MAX_INFLIGHT"):
+            self.stdout.write(
+                f"KDF limiter: {r['kdf_wait_seconds']:.2f}s waiting for slots, {r['kdf_rejected']} rejected"
+            )
+        else:
+            self.stdout.write("KDF limiter: disabled")
+        for kind, counts in r["outcomes"].items():
+            self.stdout.write(
+                f"  {kind}: {counts['accepted']} accepted, {counts['rejected']} rejected, {counts['error']} error(s)"
+            )
+        if r["errors"]:
+            self.stdout.write(self.style.WARNING(
+                "errors: " + ", ".join(f"{name} x{n}" for name, n in sorted(r["errors"].items()))
+            ))
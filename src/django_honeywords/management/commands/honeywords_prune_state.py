@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_honeywords.models import HoneywordUserState
+
+# Rows equal to what a missing row means: no reset, no lock, no lock history.
+DEFAULT_FILTER = {
+    "must_reset": False,
+    "locked_until__isnull": True,
+    "lock_count": 0,
+    "last_lock_at__isnull": True,
+}
+
+
+class Command(BaseCommand):
+    help = "Delete default-valued HoneywordUserState rows (a missing row means unrestricted)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--sleep", type=float, default=0.0,
+                            help="Seconds to pause between chunks.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        defaults = HoneywordUserState.objects.filter(**DEFAULT_FILTER)
+        if opts["dry_run"]:
+            self.stdout.write(f"{defaults.count()} default state row(s) would be deleted.")
+            return
+
+        deleted = 0
+        last_pk = 0
+        while True:
+            pks = list(defaults.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            # Re-filter on the defaults so rows locked since the scan are kept;
+            # apply_lock/apply_reset recreate a row lost to a narrower race.
+            n, _ = defaults.filter(pk__gte=pks[0], pk__lte=pks[-1]).delete()
+            deleted += n
+            last_pk = pks[-1]
+            if opts["sleep"]:
+                time.sleep(opts["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} default state row(s)."))
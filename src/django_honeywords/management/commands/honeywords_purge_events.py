@@ -0,0 +1,90 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from django_honeywords.archive import ArchiveWriter
+from django_honeywords.conf import get_setting
+from django_honeywords.models import HoneywordEvent
+
+ARCHIVE_FIELDS = ("id", "created_at", "user_id", "username", "outcome", "ip_address", "user_agent")
+
+
+class Command(BaseCommand):
+    help = "Delete (optionally archiving first) HoneywordEvent rows older than the retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Retention window in days (default: EVENT_RETENTION_DAYS).")
+        parser.add_argument("--archive", metavar="PATH",
+                            help="Write the events to a binary archive before deleting them.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--sleep", type=float, default=0.0,
+                            help="Seconds to pause between chunks.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        days = opts["days"] if opts["days"] is not None else get_setting("EVENT_RETENTION_DAYS")
+        if days is None:
+            raise CommandError("Pass --days or set HONEYWORDS['EVENT_RETENTION_DAYS'].")
+        if days < 0:
+            raise CommandError("--days must not be negative.")
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        cutoff = timezone.now() - timedelta(days=days)
+        expired = HoneywordEvent.objects.filter(created_at__lt=cutoff)
+
+        if opts["dry_run"]:
+            self.stdout.write(f"{expired.count()} event(s) older than {cutoff:%Y-%m-%d %H:%M} would be purged.")
+            return
+
+        max_pk = None
+        if opts["archive"]:
+            archived, max_pk = self._archive(expired, opts["archive"], opts["batch_size"], opts["sleep"])
+            self.stdout.write(f"Archived {archived} event(s) to {opts['archive']}.")
+            if max_pk is None:
+                return
+            # Only delete what made it into the (complete) archive.
+            expired = expired.filter(pk__lte=max_pk)
+
+        deleted = self._delete(expired, opts["batch_size"], opts["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} event(s) older than {cutoff:%Y-%m-%d %H:%M}."))
+
+    def _chunks(self, qs, batch_size, sleep, fields):
+        # Walk by primary key so each query is an index range scan and deleted
+        # rows never shift the window.
+        last_pk = 0
+        while True:
+            rows = list(qs.filter(pk__gt=last_pk).order_by("pk").values_list(*fields)[:batch_size])
+            if not rows:
+                return
+            yield rows
+            last_pk = rows[-1][0]
+            if sleep:
+                time.sleep(sleep)
+
+    def _archive(self, qs, path, batch_size, sleep):
+        max_pk = None
+        with ArchiveWriter(path) as writer:
+            for rows in self._chunks(qs, batch_size, sleep, ARCHIVE_FIELDS):
+                for row in rows:
+                    fields = dict(zip(ARCHIVE_FIELDS, row))
+                    if timezone.is_naive(fields["created_at"]):
+                        # USE_TZ=False stores local time in TIME_ZONE.
+                        fields["created_at"] = timezone.make_aware(
+                            fields["created_at"], timezone.get_default_timezone()
+                        )
+                    writer.add(**fields)
+                max_pk = rows[-1][0]
+            count = writer.count
+        return count, max_pk
+
+    def _delete(self, qs, batch_size, sleep):
+        deleted = 0
+        for rows in self._chunks(qs, batch_size, sleep, ("pk",)):
+            # Bounded DELETE over the chunk's primary-key range.
+            n, _ = qs.filter(pk__gte=rows[0][0], pk__lte=rows[-1][0]).delete()
+            deleted += n
+        return deleted
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_honeywords.rollup import roll_up
+
+
+class Command(BaseCommand):
+    help = "Fold HoneywordEvent rows added since the last run into the hourly rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lag", type=int, default=None,
+                            help="Skip events younger than this many seconds (default: ROLLUP_LAG_SECONDS).")
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        if opts["lag"] is not None and opts["lag"] < 0:
+            raise CommandError("--lag must not be negative.")
+
+        folded, watermark = roll_up(lag_seconds=opts["lag"], batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {folded} event(s); watermark at event {watermark}."))
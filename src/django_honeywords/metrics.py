@@ -0,0 +1,287 @@
+"""In-process metrics registry with Prometheus text exposition (METRICS).
+
+Counters and histograms recorded on the login path:
+
+- honeywords_login_verdicts_total{verdict}: one per login handled by
+  HoneywordsBackend (the amnesia_check verdict, or unknown_user / inactive /
+  blocked)
+- honeywords_policy_actions_total{action}: ON_HONEYWORD action taken on a
+  breach (log / lock / reset)
+- honeywords_kdf_seconds: each password-hash derivation, logins and
+  enrollment alike
+- honeywords_login_db_seconds: database time of one login
+- honeywords_login_seconds: total time of one login
+
+Values live in a store. Without METRICS_DIR it is a dict in process memory.
+With METRICS_DIR every process writes its own memory-mapped file there, and
+render() sums the files of all processes, so any worker can answer a scrape
+for the whole host. Clear the directory when the service (re)starts; files
+of exited workers keep counting until then.
+"""
+from __future__ import annotations
+
+import bisect
+import glob
+import mmap
+import os
+import struct
+import threading
+from typing import Iterable
+
+from .conf import get_setting
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def enabled() -> bool:
+    return bool(get_setting("METRICS"))
+
+
+# -- stores -----------------------------------------------------------------
+
+class _MemoryStore:
+    def __init__(self):
+        self._values: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key: str, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def close(self) -> None:
+        pass
+
+
+# File layout: an 8-byte "used" offset, then 8-byte aligned entries of
+#   u32 key length | key (UTF-8, padded to 8 bytes) | 4 pad bytes | f64 value
+# Only the owning process writes; readers stop at "used".
+_USED = struct.Struct("<Q")
+_KEY_LEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_SIZE = 64 * 1024
+
+
+def _entry_size(key: bytes) -> int:
+    return _KEY_LEN.size + (len(key) + 7) // 8 * 8 + 4 + _VALUE.size
+
+
+class _FileStore:
+    """Per-process memory-mapped file in METRICS_DIR."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"honeywords-{os.getpid()}.metrics")
+        self._lock = threading.Lock()
+        self._offsets: dict[str, int] = {}
+        self._file = open(self.path, "a+b")
+        if os.fstat(self._file.fileno()).st_size < _INITIAL_SIZE:
+            self._file.truncate(_INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = _USED.unpack_from(self._map, 0)[0] or _USED.size
+        for key, value, offset in _entries(self._map, self._used):
+            self._offsets[key] = offset
+
+    def _append(self, key: str) -> int:
+        raw = key.encode()
+        size = _entry_size(raw)
+        if self._used + size > len(self._map):
+            new_size = max(len(self._map) * 2, self._used + size)
+            self._map.close()
+            self._file.truncate(new_size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        offset = self._used
+        _KEY_LEN.pack_into(self._map, offset, len(raw))
+        self._map[offset + _KEY_LEN.size:offset + _KEY_LEN.size + len(raw)] = raw
+        value_offset = offset + size - _VALUE.size
+        _VALUE.pack_into(self._map, value_offset, 0.0)
+        # Publish the entry only once it is complete.
+        self._used += size
+        _USED.pack_into(self._map, 0, self._used)
+        self._offsets[key] = value_offset
+        return value_offset
+
+    def inc(self, key: str, amount: float) -> None:
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            _VALUE.pack_into(self._map, offset, _VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def collect(self) -> dict[str, float]:
+        totals: dict[str, float] = {}
+        for path in glob.glob(os.path.join(self.directory, "honeywords-*.metrics")):
+            try:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+            except FileNotFoundError:
+                continue
+            if len(data) < _USED.size:
+                continue
+            for key, value, _ in _entries(data, _USED.unpack_from(data, 0)[0]):
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def close(self) -> None:
+        with self._lock:
+            self._map.close()
+            self._file.close()
+
+
+def _entries(buf, used: int) -> Iterable[tuple[str, float, int]]:
+    """(key, value, value offset) for each complete entry below used."""
+    offset = _USED.size
+    used = min(used, len(buf))
+    while offset + _KEY_LEN.size <= used:
+        (length,) = _KEY_LEN.unpack_from(buf, offset)
+        raw = bytes(buf[offset + _KEY_LEN.size:offset + _KEY_LEN.size + length])
+        size = _entry_size(raw)
+        if length == 0 or offset + size > used:
+            break
+        value_offset = offset + size - _VALUE.size
+        yield raw.decode(), _VALUE.unpack_from(buf, value_offset)[0], value_offset
+        offset += size
+
+
+_store = None
+_store_key = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The store for this process; rebuilt after fork() or a METRICS_DIR change."""
+    global _store, _store_key
+    key = (os.getpid(), get_setting("METRICS_DIR"))
+    with _store_lock:
+        if _store is None or _store_key != key:
+            if _store is not None and _store_key[0] == key[0]:
+                _store.close()
+            directory = key[1]
+            _store = _FileStore(directory) if directory else _MemoryStore()
+            _store_key = key
+        return _store
+
+
+def reset() -> None:
+    """Drop this process's in-memory values (tests); file stores are left alone."""
+    global _store, _store_key
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = _store_key = None
+
+
+# -- metrics ----------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label: str, known: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.known = tuple(known)  # always exposed, as 0 until seen
+
+    def _key(self, value: str) -> str:
+        return f'{self.name}{{{self.label}="{_escape(value)}"}}'
+
+    def inc(self, value: str, amount: float = 1.0) -> None:
+        get_store().inc(self._key(value), amount)
+
+    def render(self, values: dict[str, float]) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        prefix = self.name + "{"
+        samples = {key: v for key, v in values.items() if key.startswith(prefix)}
+        for known in self.known:
+            samples.setdefault(self._key(known), 0.0)
+        lines.extend(f"{key} {_fmt(v)}" for key, v in sorted(samples.items()))
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float]):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_keys = [f'{name}_bucket{{le="{_fmt(b)}"}}' for b in self.buckets]
+        self._inf_key = f'{name}_bucket{{le="+Inf"}}'
+
+    def observe(self, seconds: float) -> None:
+        store = get_store()
+        # Buckets are stored non-cumulative; render() accumulates them.
+        i = bisect.bisect_left(self.buckets, seconds)
+        store.inc(self._bucket_keys[i] if i < len(self.buckets) else self._inf_key, 1.0)
+        store.inc(f"{self.name}_sum", seconds)
+        store.inc(f"{self.name}_count", 1.0)
+
+    def render(self, values: dict[str, float]) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        cumulative = 0.0
+        for key in self._bucket_keys:
+            cumulative += values.get(key, 0.0)
+            lines.append(f"{key} {_fmt(cumulative)}")
+        count = values.get(f"{self.name}_count", 0.0)
+        lines.append(f"{self._inf_key} {_fmt(count)}")
+        lines.append(f"{self.name}_sum {_fmt(values.get(f'{self.name}_sum', 0.0))}")
+        lines.append(f"{self.name}_count {_fmt(count)}")
+        return lines
+
+
+VERDICTS = ("success", "breach", "invalid", "throttled", "unknown_user", "inactive", "blocked")
+
+LOGIN_VERDICTS = Counter(
+    "honeywords_login_verdicts_total", "Logins handled by HoneywordsBackend, by verdict.", "verdict", VERDICTS
+)
+POLICY_ACTIONS = Counter(
+    "honeywords_policy_actions_total", "ON_HONEYWORD actions taken on honeyword hits.", "action",
+    ("log", "lock", "reset"),
+)
+KDF_SECONDS = Histogram(
+    "honeywords_kdf_seconds", "Duration of one password-hash derivation.",
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+LOGIN_DB_SECONDS = Histogram(
+    "honeywords_login_db_seconds", "Database time of one login.",
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+LOGIN_SECONDS = Histogram(
+    "honeywords_login_seconds", "Total time of one login.",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+REGISTRY = (LOGIN_VERDICTS, POLICY_ACTIONS, KDF_SECONDS, LOGIN_DB_SECONDS, LOGIN_SECONDS)
+
+
+def observe_login(timing) -> None:
+    """Record a finished timing.LoginTiming."""
+    LOGIN_VERDICTS.inc(timing.outcome or "error")
+    LOGIN_DB_SECONDS.observe(timing.query_seconds)
+    LOGIN_SECONDS.observe(timing.total_seconds)
+
+
+def count_policy_action(action: str) -> None:
+    if enabled():
+        POLICY_ACTIONS.inc(action)
+
+
+def render() -> str:
+    """All metrics in Prometheus text format, summed over processes."""
+    values = get_store().collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render(values))
+    return "\n".join(lines) + "\n"
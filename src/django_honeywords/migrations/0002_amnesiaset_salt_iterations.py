@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='amnesiaset',
+            name='iterations',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='amnesiaset',
+            name='salt',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='honeywordevent',
+            name='outcome',
+            field=models.CharField(choices=[('real', 'Marked credential'), ('honey', 'Honeyword'), ('invalid', 'Invalid')], max_length=16),
+        ),
+    ]
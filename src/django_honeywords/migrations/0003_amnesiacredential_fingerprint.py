@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0002_amnesiaset_salt_iterations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='amnesiacredential',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
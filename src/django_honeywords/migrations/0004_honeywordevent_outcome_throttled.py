@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0003_amnesiacredential_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='honeywordevent',
+            name='outcome',
+            field=models.CharField(choices=[('real', 'Marked credential'), ('honey', 'Honeyword'), ('invalid', 'Invalid'), ('throttled', 'Throttled')], max_length=16),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0004_honeywordevent_outcome_throttled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='amnesiaset',
+            name='marks',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='amnesiaset',
+            name='packed_hashes',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.AddField(
+            model_name='amnesiaset',
+            name='storage',
+            field=models.CharField(default='rows', max_length=16),
+        ),
+    ]
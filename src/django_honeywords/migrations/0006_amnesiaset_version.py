@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0005_amnesiaset_packed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='amnesiaset',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
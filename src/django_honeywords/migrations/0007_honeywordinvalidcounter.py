@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0006_amnesiaset_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HoneywordInvalidCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, default='', max_length=150)),
+                ('ip_address', models.CharField(blank=True, default='', max_length=45)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('last_seen', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket'], name='honeyword_invalid_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('username', 'ip_address', 'bucket'), name='uniq_honeyword_invalid_counter')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0007_honeywordinvalidcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='honeywordevent',
+            index=models.Index(fields=['created_at'], name='hw_event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='honeywordevent',
+            index=models.Index(fields=['outcome', 'created_at'], name='hw_event_outcome_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='honeywordevent',
+            index=models.Index(fields=['user', 'created_at'], name='hw_event_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='honeywordevent',
+            index=models.Index(fields=['username', 'created_at'], name='hw_event_username_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='honeywordevent',
+            index=models.Index(fields=['ip_address', 'created_at'], name='hw_event_ip_created_idx'),
+        ),
+        # Drop the plain FK index only once (user, created_at) exists.
+        migrations.AlterField(
+            model_name='honeywordevent',
+            name='user',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0008_honeywordevent_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HoneywordRollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32, unique=True)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HoneywordRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('dimension', models.CharField(max_length=8)),
+                ('key', models.CharField(blank=True, default='', max_length=150)),
+                ('outcome', models.CharField(choices=[('real', 'Marked credential'), ('honey', 'Honeyword'), ('invalid', 'Invalid'), ('throttled', 'Throttled')], max_length=16)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'bucket', 'key', 'outcome'), name='uniq_honeyword_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+INDEX_NAME = "hw_event_username_like_idx"
+
+
+def create_like_index(apps, schema_editor):
+    # PostgreSQL only uses a btree for LIKE 'term%' with a pattern operator
+    # class (or the C collation). Django adds such "_like" indexes for
+    # db_index fields, but not for Meta.indexes, so the admin's prefix search
+    # on username needs its own. Other backends use the plain index.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    HoneywordEvent = apps.get_model("django_honeywords", "HoneywordEvent")
+    qn = schema_editor.quote_name
+    # IF NOT EXISTS: the index may have been built beforehand with CONCURRENTLY.
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {qn(INDEX_NAME)} "
+        f"ON {qn(HoneywordEvent._meta.db_table)} ({qn('username')} varchar_pattern_ops)"
+    )
+
+
+def drop_like_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(INDEX_NAME)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_honeywords', '0009_honeywordrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_like_index, drop_like_index),
+    ]
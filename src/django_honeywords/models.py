@@ -6,6 +6,7 @@ class HoneywordEvent(models.Model):
     OUTCOME_REAL = "real"
     OUTCOME_HONEY = "honey"
     OUTCOME_INVALID = "invalid"
+    OUTCOME_THROTTLED = "throttled"
 
     OUTCOME_CHOICES = [
         # NOTE: In Amnesia, a successful login means a *marked credential* matched.
@@ -13,9 +14,14 @@ class HoneywordEvent(models.Model):
         (OUTCOME_REAL, "Marked credential"),
         (OUTCOME_HONEY, "Honeyword"),
         (OUTCOME_INVALID, "Invalid"),
+        # The KDF limiter was saturated; the password was not checked.
+        (OUTCOME_THROTTLED, "Throttled"),
     ]
 
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    # Indexed through (user, created_at) below.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, db_index=False
+    )
     username = models.CharField(max_length=150, blank=True, default="")
     outcome = models.CharField(max_length=16, choices=OUTCOME_CHOICES)
     created_at = models.DateTimeField(default=timezone.now)
@@ -23,6 +29,77 @@ class HoneywordEvent(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True, default="")
 
+    class Meta:
+        # One index per access path we serve: recent events overall (admin
+        # ordering, retention), and recent events per outcome / user /
+        # username / address (admin filters and searches, investigations).
+        indexes = [
+            models.Index(fields=["created_at"], name="hw_event_created_idx"),
+            models.Index(fields=["outcome", "created_at"], name="hw_event_outcome_created_idx"),
+            models.Index(fields=["user", "created_at"], name="hw_event_user_created_idx"),
+            models.Index(fields=["username", "created_at"], name="hw_event_username_created_idx"),
+            models.Index(fields=["ip_address", "created_at"], name="hw_event_ip_created_idx"),
+        ]
+
+class HoneywordInvalidCounter(models.Model):
+    """Invalid attempts folded per (username, ip_address, time bucket).
+
+    Written instead of individual HoneywordEvent rows when AGGREGATE_INVALID
+    is enabled; see aggregation.py.
+    """
+
+    username = models.CharField(max_length=150, blank=True, default="")
+    # "" when the address is unknown (NULLs would defeat the unique constraint).
+    ip_address = models.CharField(max_length=45, blank=True, default="")
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+    last_seen = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["username", "ip_address", "bucket"],
+                name="uniq_honeyword_invalid_counter",
+            ),
+        ]
+        indexes = [models.Index(fields=["bucket"], name="honeyword_invalid_bucket_idx")]
+
+
+class HoneywordRollup(models.Model):
+    """Hourly event counts per outcome, maintained by honeywords_rollup.
+
+    dimension "all" has key ""; "ip" is keyed by address ("" if unknown) and
+    "user" by the attempted username.
+    """
+
+    DIMENSION_ALL = "all"
+    DIMENSION_IP = "ip"
+    DIMENSION_USER = "user"
+    DIMENSIONS = (DIMENSION_ALL, DIMENSION_IP, DIMENSION_USER)
+
+    bucket = models.DateTimeField()
+    dimension = models.CharField(max_length=8)
+    key = models.CharField(max_length=150, blank=True, default="")
+    outcome = models.CharField(max_length=16, choices=HoneywordEvent.OUTCOME_CHOICES)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "bucket", "key", "outcome"],
+                name="uniq_honeyword_rollup",
+            ),
+        ]
+
+
+class HoneywordRollupWatermark(models.Model):
+    """Highest HoneywordEvent id folded into HoneywordRollup."""
+
+    name = models.CharField(max_length=32, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+
 class HoneywordUserState(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="honeywords_state")
 
@@ -34,6 +111,22 @@ class HoneywordUserState(models.Model):
 
 class AmnesiaSet(models.Model):
     """Amnesia scheme state (no stored real index)."""
+
+    # amnesia_v1: every candidate is an independent Django password hash.
+    # amnesia_v2: candidates share one per-set salt and iteration count, so a
+    #             login derives the submitted password once (PBKDF2-SHA256).
+    ALGORITHM_V1 = "amnesia_v1"
+    ALGORITHM_V2 = "amnesia_v2"
+    ALGORITHMS = (ALGORITHM_V1, ALGORITHM_V2)
+
+    # rows:   one AmnesiaCredential per candidate
+    # packed: digests concatenated in packed_hashes, marks as a bitmask
+    #         (amnesia_v2 only; bit i of marks = candidate i is marked)
+    STORAGE_ROWS = "rows"
+    STORAGE_PACKED = "packed"
+    STORAGES = (STORAGE_ROWS, STORAGE_PACKED)
+    PACKED_MAX_K = 63  # marks must fit a signed 64-bit integer
+
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -43,7 +136,18 @@ class AmnesiaSet(models.Model):
     p_mark = models.FloatField(default=0.1)
     p_remark = models.FloatField(default=0.01)
     created_at = models.DateTimeField(default=timezone.now)
-    algorithm_version = models.CharField(max_length=32, default="amnesia_v1")
+    algorithm_version = models.CharField(max_length=32, default=ALGORITHM_V1)
+
+    # amnesia_v2 only: KDF parameters shared by all k candidates.
+    salt = models.CharField(max_length=64, blank=True, default="")
+    iterations = models.PositiveIntegerField(default=0)
+
+    storage = models.CharField(max_length=16, default=STORAGE_ROWS)
+    packed_hashes = models.BinaryField(blank=True, default=b"")
+    marks = models.BigIntegerField(default=0)
+
+    # Bumped by every remark/re-initialization; remarks are conditional on it.
+    version = models.PositiveIntegerField(default=0)
 
 
 class AmnesiaCredential(models.Model):
@@ -54,6 +158,8 @@ class AmnesiaCredential(models.Model):
     )
     index = models.PositiveSmallIntegerField()
     password_hash = models.CharField(max_length=256)
+    # Truncated HMAC(FINGERPRINT_PEPPER, candidate) hex prefix; "" if no pepper.
+    fingerprint = models.CharField(max_length=16, blank=True, default="")
     marked = models.BooleanField(default=False)
 
     class Meta:
@@ -0,0 +1,140 @@
+"""Process-wide worker pool for password-hash work.
+
+PBKDF2 (hashlib) and Argon2 release the GIL while deriving, so spreading the
+k candidate checks of one login over a few threads cuts its wall-clock time
+without changing what is stored. The same holds for hashing the k
+candidates of a new set (map_ordered).
+"""
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Sequence, TypeVar
+
+from .conf import get_setting
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ThreadPoolExecutor:
+    """Return the shared executor, creating it on first use.
+
+    Its size comes from PARALLEL_POOL_SIZE (default: CPU count) and is fixed
+    for the life of the process.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            size = get_setting("PARALLEL_POOL_SIZE") or os.cpu_count() or 1
+            _pool = ThreadPoolExecutor(max_workers=int(size), thread_name_prefix="honeywords")
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the shared executor; the next get_pool() call builds a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def find_first(predicate: Callable[[T], bool], items: Sequence[T], *, max_workers: int) -> T | None:
+    """Return an item for which predicate(item) is true, or None.
+
+    Items are striped over at most max_workers lanes. The calling thread runs
+    the first lane itself and the rest go to the shared pool. Once any lane
+    finds a match, the other lanes stop before their next item and queued
+    lanes are cancelled. A predicate call that is already running is allowed
+    to finish. A lane still queued when the caller is done is taken back and
+    run inline, as in map_ordered().
+
+    A match wins over errors: an exception raised by predicate propagates
+    only if no lane found a match.
+    """
+    lanes = max(1, min(int(max_workers), len(items)))
+    if lanes == 1:
+        for item in items:
+            if predicate(item):
+                return item
+        return None
+
+    found = threading.Event()
+
+    def run(lane: int) -> T | None:
+        for item in items[lane::lanes]:
+            if found.is_set():
+                return None
+            if predicate(item):
+                found.set()
+                return item
+        return None
+
+    pool = get_pool()
+    futures = [(lane, pool.submit(contextvars.copy_context().run, run, lane)) for lane in range(1, lanes)]
+    match = error = None
+    try:
+        match = run(0)
+    except Exception as exc:
+        error = exc
+    except BaseException:
+        found.set()
+        for _, f in futures:
+            f.cancel()
+        raise
+
+    for lane, f in futures:
+        try:
+            if f.cancel():
+                # Queued: run it here unless a match already made it moot.
+                result = None if match is not None else run(lane)
+            else:
+                result = f.result()
+        except Exception as exc:
+            error = error or exc
+            continue
+        if match is None and result is not None:
+            match = result
+    if match is None and error is not None:
+        raise error
+    return match
+
+
+def map_ordered(fn: Callable[[T], R], items: Sequence[T], *, max_workers: int) -> list[R]:
+    """Return [fn(item) for item in items], computed over at most max_workers lanes.
+
+    Lanes are striped as in find_first() and the calling thread runs the
+    first one. A lane still queued when the caller is done is taken back and
+    run inline, so a busy pool never leaves the caller waiting on queued work.
+    The first exception raised by fn propagates.
+    """
+    lanes = max(1, min(int(max_workers), len(items)))
+    if lanes == 1:
+        return [fn(item) for item in items]
+
+    results: list = [None] * len(items)
+
+    def run(lane: int) -> None:
+        for i in range(lane, len(items), lanes):
+            results[i] = fn(items[i])
+
+    pool = get_pool()
+    futures = [(lane, pool.submit(contextvars.copy_context().run, run, lane)) for lane in range(1, lanes)]
+    try:
+        run(0)
+    except BaseException:
+        for _, f in futures:
+            f.cancel()
+        raise
+    for lane, f in futures:
+        if f.cancel():
+            run(lane)
+        else:
+            f.result()
+    return results
@@ -1,14 +1,54 @@
 from __future__ import annotations
 
 from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Case, F, Value, When
 from django.utils import timezone
 
 from .models import HoneywordUserState
 
 
 def get_state(user) -> HoneywordUserState:
-    state, _ = HoneywordUserState.objects.get_or_create(user=user)
-    return state
+    """Return the user's state, or an unsaved default one if there is no row.
+
+    Reads never create rows: a missing row means "unrestricted". Rows are
+    created by apply_lock() / apply_reset() when they first need one.
+    """
+    state = HoneywordUserState.objects.filter(user=user).first()
+    return state if state is not None else HoneywordUserState(user=user)
+
+
+async def aget_state(user) -> HoneywordUserState:
+    state = await HoneywordUserState.objects.filter(user=user).afirst()
+    return state if state is not None else HoneywordUserState(user=user)
+
+
+def peek_state(user) -> HoneywordUserState | None:
+    """Return the user's state row if one exists, without creating it.
+
+    Uses the relation cache, so a user loaded with
+    select_related("honeywords_state") costs no extra query.
+    """
+    try:
+        return user.honeywords_state
+    except HoneywordUserState.DoesNotExist:
+        return None
+
+
+async def apeek_state(user) -> HoneywordUserState | None:
+    if type(user).honeywords_state.related.is_cached(user):
+        return peek_state(user)
+    return await HoneywordUserState.objects.filter(user_id=user.pk).afirst()
+
+
+def is_blocked(state: HoneywordUserState | None) -> bool:
+    """True if state forbids authentication (active lock or pending reset)."""
+    if state is None:
+        return False
+    locked = state.locked_until is not None and state.locked_until > timezone.now()
+    return locked or state.must_reset
 
 
 def is_locked(user) -> bool:
@@ -16,26 +56,134 @@ def is_locked(user) -> bool:
     return state.locked_until is not None and state.locked_until > timezone.now()
 
 
+async def ais_locked(user) -> bool:
+    state = await aget_state(user)
+    return state.locked_until is not None and state.locked_until > timezone.now()
+
+
+def _supports_upsert(connection) -> bool:
+    # INSERT ... ON CONFLICT ... DO UPDATE ... RETURNING
+    return connection.vendor in ("sqlite", "postgresql") and connection.features.can_return_columns_from_insert
+
+
+_MAX_DOUBLINGS = 10  # lock_count beyond this no longer lengthens the lock
+
+
+def _lock_schedule(now, base_seconds: int, max_seconds: int) -> list:
+    """locked_until for a row whose current lock_count is i (last entry: >= i)."""
+    return [
+        now + timedelta(seconds=min(base_seconds * (2 ** count), max_seconds))
+        for count in range(_MAX_DOUBLINGS + 1)
+    ]
+
+
+def _refresh_cache(user_id, entry) -> None:
+    from . import policy_cache
+
+    if not policy_cache.enabled():
+        return
+    if entry is None:
+        transaction.on_commit(lambda: policy_cache.invalidate(user_id))
+    else:
+        transaction.on_commit(lambda: policy_cache.store(user_id, entry))
+
+
 def apply_reset(user) -> None:
-    state = get_state(user)
-    if not state.must_reset:
-        state.must_reset = True
-        state.save(update_fields=["must_reset"])
+    """Set must_reset, creating the state row if needed.
+
+    One statement where the backend supports upserts; otherwise an UPDATE,
+    then an INSERT if there was no row.
+    """
+    connection = connections[router.db_for_write(HoneywordUserState)]
+    if _supports_upsert(connection):
+        HoneywordUserState.objects.bulk_create(
+            [HoneywordUserState(user=user, must_reset=True)],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["must_reset"],
+        )
+    else:
+        rows = HoneywordUserState.objects.filter(user=user)
+        if not rows.update(must_reset=True):
+            try:
+                with transaction.atomic(using=connection.alias):
+                    HoneywordUserState.objects.create(user=user, must_reset=True)
+            except IntegrityError:
+                rows.update(must_reset=True)
+    # must_reset blocks regardless of any lock, so the entry needs no lock time.
+    _refresh_cache(user.pk, (None, True))
+
+
+async def aapply_reset(user) -> None:
+    await sync_to_async(apply_reset)(user)
 
 
 def apply_lock(user, base_seconds: int = 60, max_seconds: int = 3600) -> None:
     """
     Throttled lockout to reduce DoS risk.
     lock duration = min(base * 2^lock_count, max)
+
+    The escalation is one atomic statement: the new locked_until is picked
+    from precomputed capped values by a CASE over the row's current
+    lock_count, so concurrent honeyword hits each escalate exactly once.
     """
-    state = get_state(user)
     now = timezone.now()
+    schedule = _lock_schedule(now, base_seconds, max_seconds)
+    connection = connections[router.db_for_write(HoneywordUserState)]
+
+    if _supports_upsert(connection):
+        lock_count, must_reset = _upsert_lock(connection, user.pk, now, schedule)
+        locked_until = schedule[min(lock_count - 1, _MAX_DOUBLINGS)]
+        _refresh_cache(user.pk, (locked_until.timestamp(), bool(must_reset)))
+        return
+
+    # Other backends: one UPDATE for an existing row, INSERT the first time.
+    rows = HoneywordUserState.objects.filter(user=user)
+    # locked_until is assigned first: MySQL evaluates SET left to right.
+    escalate = {
+        "locked_until": Case(
+            *(When(lock_count=count, then=Value(at)) for count, at in enumerate(schedule[:-1])),
+            default=Value(schedule[-1]),
+        ),
+        "lock_count": F("lock_count") + 1,
+        "last_lock_at": now,
+    }
+    if not rows.update(**escalate):
+        try:
+            with transaction.atomic(using=connection.alias):
+                HoneywordUserState.objects.create(
+                    user=user, lock_count=1, last_lock_at=now, locked_until=schedule[0]
+                )
+        except IntegrityError:
+            rows.update(**escalate)
+    _refresh_cache(user.pk, None)
+
+
+def _upsert_lock(connection, user_id, now, schedule) -> tuple[int, bool]:
+    opts = HoneywordUserState._meta
+    qn = connection.ops.quote_name
+    table = qn(opts.db_table)
+
+    def col(name):
+        return qn(opts.get_field(name).column)
+
+    adapt = connection.ops.adapt_datetimefield_value
+    whens = " ".join(f"WHEN {count} THEN %s" for count in range(_MAX_DOUBLINGS))
+    sql = (
+        f"INSERT INTO {table} ({col('user')}, {col('must_reset')}, {col('locked_until')}, "
+        f"{col('lock_count')}, {col('last_lock_at')}) "
+        f"VALUES (%s, %s, %s, 1, %s) "
+        f"ON CONFLICT ({col('user')}) DO UPDATE SET "
+        f"{col('locked_until')} = CASE {table}.{col('lock_count')} {whens} ELSE %s END, "
+        f"{col('lock_count')} = {table}.{col('lock_count')} + 1, "
+        f"{col('last_lock_at')} = EXCLUDED.{col('last_lock_at')} "
+        f"RETURNING {col('lock_count')}, {col('must_reset')}"
+    )
+    params = [user_id, False, adapt(schedule[0]), adapt(now), *(adapt(at) for at in schedule)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()
 
-    # If lock expired, keep count but reset timing basis
-    duration = base_seconds * (2 ** min(state.lock_count, 10))
-    duration = min(duration, max_seconds)
 
-    state.lock_count += 1
-    state.last_lock_at = now
-    state.locked_until = now + timedelta(seconds=duration)
-    state.save(update_fields=["lock_count", "last_lock_at", "locked_until"])
+async def aapply_lock(user, base_seconds: int = 60, max_seconds: int = 3600) -> None:
+    await sync_to_async(apply_lock)(user, base_seconds=base_seconds, max_seconds=max_seconds)
@@ -0,0 +1,211 @@
+"""Cached policy gate: is this user locked or pending a reset?
+
+With POLICY_CACHE enabled, HoneywordsBackend answers the gate from a small
+per-process L1 dict in front of a Django cache (POLICY_CACHE_ALIAS) instead
+of reading HoneywordUserState on every login. Entries are compact:
+
+- 0 for "no restrictions" (also used when the user has no state row)
+- (locked_until as a POSIX timestamp or None, must_reset) otherwise
+
+An entry lives at most POLICY_CACHE_TTL seconds, and a lock entry no longer
+than the lock itself. L1 entries live POLICY_CACHE_L1_TTL seconds, which
+bounds how long another process can serve a superseded entry.
+
+Saving or deleting a HoneywordUserState writes the new entry through on
+commit (see apps.py), which covers apply_lock() and apply_reset(). Code that
+changes state with QuerySet.update() must call invalidate(); the admin
+actions do.
+
+A gate miss fills the cache with cache.add(), never set(): a login that read
+the row before a lock committed must not overwrite the lock's write-through
+entry with its stale "no restrictions".
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .conf import get_setting
+from .policy import apeek_state, peek_state
+
+NO_RESTRICTIONS = 0
+
+
+def enabled() -> bool:
+    return bool(get_setting("POLICY_CACHE"))
+
+
+def _key(user_id) -> str:
+    return f"honeywords:policy:{user_id}"
+
+
+def _cache():
+    return caches[get_setting("POLICY_CACHE_ALIAS")]
+
+
+class _L1:
+    def __init__(self):
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._data.get(user_id)
+            if item is None:
+                return None
+            entry, expires = item
+            if expires <= time.monotonic():
+                del self._data[user_id]
+                return None
+            return entry
+
+    def set(self, user_id, entry, ttl: float) -> None:
+        ttl = min(ttl, float(get_setting("POLICY_CACHE_L1_TTL")))
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[user_id] = (entry, time.monotonic() + ttl)
+            self._data.move_to_end(user_id)
+            while len(self._data) > int(get_setting("POLICY_CACHE_L1_SIZE")):
+                self._data.popitem(last=False)
+
+    def discard(self, user_id) -> None:
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_l1 = _L1()
+
+
+def encode(state) -> int | tuple:
+    """Compact cache entry for a HoneywordUserState (or None)."""
+    if state is None:
+        return NO_RESTRICTIONS
+    locked_until = state.locked_until
+    if locked_until is not None and locked_until <= timezone.now():
+        locked_until = None
+    if locked_until is None and not state.must_reset:
+        return NO_RESTRICTIONS
+    return (None if locked_until is None else locked_until.timestamp(), bool(state.must_reset))
+
+
+def entry_blocks(entry) -> bool:
+    if entry == NO_RESTRICTIONS:
+        return False
+    locked_until, must_reset = entry
+    return must_reset or (locked_until is not None and locked_until > time.time())
+
+
+def _ttl(entry) -> float:
+    ttl = float(get_setting("POLICY_CACHE_TTL"))
+    if entry != NO_RESTRICTIONS:
+        locked_until, must_reset = entry
+        if locked_until is not None and not must_reset:
+            ttl = min(ttl, locked_until - time.time())
+    return ttl
+
+
+def store(user_id, entry) -> None:
+    ttl = _ttl(entry)
+    if ttl <= 0:
+        invalidate(user_id)
+        return
+    _cache().set(_key(user_id), entry, ttl)
+    _l1.set(user_id, entry, ttl)
+
+
+async def astore(user_id, entry) -> None:
+    ttl = _ttl(entry)
+    if ttl <= 0:
+        await ainvalidate(user_id)
+        return
+    await _cache().aset(_key(user_id), entry, ttl)
+    _l1.set(user_id, entry, ttl)
+
+
+def _fill(user_id, entry):
+    """Cache an entry read on a gate miss unless a writer got there first.
+
+    Returns the entry now in the cache (the writer's, if add() lost).
+    """
+    ttl = _ttl(entry)
+    if ttl <= 0:
+        return entry
+    if not _cache().add(_key(user_id), entry, ttl):
+        current = _cache().get(_key(user_id))
+        if current is None:
+            return entry
+        entry, ttl = current, _ttl(current)
+    _l1.set(user_id, entry, ttl)
+    return entry
+
+
+async def _afill(user_id, entry):
+    ttl = _ttl(entry)
+    if ttl <= 0:
+        return entry
+    if not await _cache().aadd(_key(user_id), entry, ttl):
+        current = await _cache().aget(_key(user_id))
+        if current is None:
+            return entry
+        entry, ttl = current, _ttl(current)
+    _l1.set(user_id, entry, ttl)
+    return entry
+
+
+def invalidate(*user_ids) -> None:
+    for user_id in user_ids:
+        _l1.discard(user_id)
+    if user_ids:
+        _cache().delete_many([_key(u) for u in user_ids])
+
+
+async def ainvalidate(*user_ids) -> None:
+    for user_id in user_ids:
+        _l1.discard(user_id)
+    if user_ids:
+        await _cache().adelete_many([_key(u) for u in user_ids])
+
+
+def is_blocked(user) -> bool:
+    """Cached equivalent of policy.is_blocked(policy.peek_state(user))."""
+    entry = _l1.get(user.pk)
+    if entry is None:
+        entry = _cache().get(_key(user.pk))
+        if entry is None:
+            entry = _fill(user.pk, encode(peek_state(user)))
+        else:
+            _l1.set(user.pk, entry, _ttl(entry))
+    return entry_blocks(entry)
+
+
+async def ais_blocked(user) -> bool:
+    entry = _l1.get(user.pk)
+    if entry is None:
+        entry = await _cache().aget(_key(user.pk))
+        if entry is None:
+            entry = await _afill(user.pk, encode(await apeek_state(user)))
+        else:
+            _l1.set(user.pk, entry, _ttl(entry))
+    return entry_blocks(entry)
+
+
+def _on_state_saved(sender, instance, **kwargs):
+    if enabled():
+        user_id, entry = instance.user_id, encode(instance)
+        transaction.on_commit(lambda: store(user_id, entry))
+
+
+def _on_state_deleted(sender, instance, **kwargs):
+    if enabled():
+        user_id = instance.user_id
+        transaction.on_commit(lambda: invalidate(user_id))
@@ -0,0 +1,140 @@
+"""Deferred remarking: move the remark write off the login request.
+
+With REMARK_MODE = "deferred", amnesia_check() decides whether to remark,
+returns "success" at once and hands the set to this module after the
+surrounding transaction commits. A background thread applies the queued
+remarks with the same optimistic write as the inline path.
+
+Requests for a set that is already queued are coalesced into one write. The
+queue holds at most REMARK_QUEUE_SIZE sets; further requests are dropped
+(remarking is probabilistic, so a dropped remark only delays re-sampling).
+Pending remarks are flushed at interpreter exit.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+
+from django.db import connections
+
+from .conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+
+class RemarkQueue:
+    def __init__(self, maxsize: int = 10000, *, autostart: bool = True):
+        self.maxsize = maxsize
+        self.autostart = autostart
+        # aset pk -> (candidate index, candidate password_hash)
+        self._pending: dict[int, tuple[int, str]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._counters = dict.fromkeys(
+            ("submitted", "coalesced", "dropped", "applied", "skipped", "failed"), 0
+        )
+
+    def submit(self, aset_pk: int, index: int, password_hash: str) -> bool:
+        """Queue a remark of set aset_pk that keeps candidate index marked.
+
+        password_hash identifies the candidate that matched, so a remark whose
+        set was re-initialized meanwhile is skipped instead of applied to the
+        new candidates. Returns False if the request was dropped.
+        """
+        with self._lock:
+            if aset_pk in self._pending:
+                self._counters["coalesced"] += 1
+                self._pending[aset_pk] = (index, password_hash)
+                return True
+            if len(self._pending) >= self.maxsize:
+                self._counters["dropped"] += 1
+                return False
+            self._pending[aset_pk] = (index, password_hash)
+            self._counters["submitted"] += 1
+        if self.autostart:
+            self._ensure_worker()
+        self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """Apply every pending remark in the calling thread; return how many ran."""
+        done = 0
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return done
+            for aset_pk, (index, password_hash) in batch.items():
+                self._apply(aset_pk, index, password_hash)
+                done += 1
+
+    def _apply(self, aset_pk: int, index: int, password_hash: str) -> None:
+        from .amnesia_service import DefaultRNG, _load_candidates, _remark
+        from .models import AmnesiaSet
+
+        try:
+            aset = AmnesiaSet.objects.filter(pk=aset_pk).first()
+            cand = None
+            if aset is not None:
+                cand = next((c for c in _load_candidates(aset) if c.index == index), None)
+            if cand is None or cand.password_hash != password_hash or not cand.marked:
+                # Re-initialized, or unmarked by a concurrent remark since login.
+                outcome = "skipped"
+            else:
+                outcome = "applied" if _remark(aset, cand, DefaultRNG()) else "skipped"
+        except Exception:
+            logger.exception("Deferred remark of AmnesiaSet %s failed", aset_pk)
+            outcome = "failed"
+        with self._lock:
+            self._counters[outcome] += 1
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is not None or self._stopping:
+                return
+            self._thread = threading.Thread(target=self._run, name="honeywords-remark", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # Connections are per thread; don't hold one between bursts.
+                connections.close_all()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker and apply whatever is still pending."""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": len(self._pending), **self._counters}
+
+
+_queue: RemarkQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_remark_queue() -> RemarkQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = RemarkQueue(maxsize=int(get_setting("REMARK_QUEUE_SIZE")))
+        return _queue
+
+
+def remark_stats() -> dict:
+    return get_remark_queue().stats()
@@ -0,0 +1,140 @@
+"""Hourly rollups of HoneywordEvent, maintained incrementally.
+
+roll_up() folds events with id above the watermark into HoneywordRollup, one
+primary-key chunk per transaction; each chunk moves the watermark in the
+same transaction, so an interrupted run resumes without double counting.
+Events younger than ROLLUP_LAG_SECONDS are left for the next run so rows
+from transactions still in flight are not skipped.
+
+The watermark is a primary key, and ids are assigned before commit. A run
+skips an event for good if the event's transaction is still open when the
+run folds a higher id from outside the lag window. With the db sink that
+takes a transaction open for longer than ROLLUP_LAG_SECONDS. The buffered
+sink stores each event's log time as created_at, so its rows can be outside
+the window as soon as they commit, and the lag gives no margin against
+slow concurrent writers.
+
+Dashboard helpers read HoneywordRollup only, so their cost follows the
+number of buckets and keys shown, not the raw event volume.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .conf import get_setting
+from .models import HoneywordEvent, HoneywordRollup, HoneywordRollupWatermark
+
+WATERMARK = "hourly"
+
+# dimension -> HoneywordEvent field providing the key
+_KEY_FIELDS = {
+    HoneywordRollup.DIMENSION_IP: "ip_address",
+    HoneywordRollup.DIMENSION_USER: "username",
+}
+
+# rows per bulk_update / bulk_create statement
+_WRITE_BATCH = 500
+
+
+def _fold(events) -> None:
+    """Add the counts of events to HoneywordRollup in a fixed number of statements.
+
+    The groups are summed in Python, the existing rows of the touched hours
+    are read once, and the counts are written with one bulk_update and one
+    bulk_create. The caller holds the watermark row lock, which serializes
+    rollup runs, so no other writer can insert the same rows in between.
+    """
+    events = events.annotate(hour=TruncHour("created_at", tzinfo=dt_timezone.utc)).order_by()
+    deltas: dict[tuple[str, datetime, str, str], int] = {}
+    for row in events.values("hour", "outcome").annotate(n=Count("pk")):
+        deltas[(HoneywordRollup.DIMENSION_ALL, row["hour"], "", row["outcome"])] = row["n"]
+    for dimension, field in _KEY_FIELDS.items():
+        for row in events.values("hour", field, "outcome").annotate(n=Count("pk")):
+            group = (dimension, row["hour"], row[field] or "", row["outcome"])
+            deltas[group] = deltas.get(group, 0) + row["n"]
+    if not deltas:
+        return
+
+    hours = {bucket for _, bucket, _, _ in deltas}
+    changed = []
+    for rollup in HoneywordRollup.objects.filter(bucket__in=hours):
+        n = deltas.pop((rollup.dimension, rollup.bucket, rollup.key, rollup.outcome), 0)
+        if n:
+            rollup.count += n
+            changed.append(rollup)
+    HoneywordRollup.objects.bulk_update(changed, ["count"], batch_size=_WRITE_BATCH)
+    HoneywordRollup.objects.bulk_create(
+        [
+            HoneywordRollup(dimension=dimension, bucket=bucket, key=key, outcome=outcome, count=n)
+            for (dimension, bucket, key, outcome), n in deltas.items()
+        ],
+        batch_size=_WRITE_BATCH,
+    )
+
+
+def roll_up(*, lag_seconds: int | None = None, batch_size: int = 10000) -> tuple[int, int]:
+    """Fold new events into the rollups; return (events folded, watermark)."""
+    if lag_seconds is None:
+        lag_seconds = int(get_setting("ROLLUP_LAG_SECONDS"))
+    cutoff = timezone.now() - timedelta(seconds=lag_seconds)
+    HoneywordRollupWatermark.objects.get_or_create(name=WATERMARK)
+
+    folded = 0
+    while True:
+        with transaction.atomic():
+            mark = HoneywordRollupWatermark.objects.select_for_update().get(name=WATERMARK)
+            chunk = list(
+                HoneywordEvent.objects.filter(pk__gt=mark.last_event_id)
+                .order_by("pk")
+                .values_list("pk", "created_at")[:batch_size]
+            )
+            # Stop at the first event that is still inside the lag window.
+            ready = []
+            for pk, created_at in chunk:
+                if created_at >= cutoff:
+                    break
+                ready.append(pk)
+            if not ready:
+                return folded, mark.last_event_id
+            hi = ready[-1]
+            _fold(HoneywordEvent.objects.filter(pk__gt=mark.last_event_id, pk__lte=hi))
+            mark.last_event_id = hi
+            mark.updated_at = timezone.now()
+            mark.save(update_fields=["last_event_id", "updated_at"])
+            folded += len(ready)
+        if len(ready) < batch_size:
+            return folded, hi
+
+
+def hourly_totals(since: datetime) -> dict[datetime, dict[str, int]]:
+    """{hour: {outcome: count}} for every hour from since that has events."""
+    totals: dict[datetime, dict[str, int]] = {}
+    rows = HoneywordRollup.objects.filter(
+        dimension=HoneywordRollup.DIMENSION_ALL, bucket__gte=since
+    ).values_list("bucket", "outcome", "count")
+    for bucket, outcome, count in rows:
+        totals.setdefault(bucket, {})[outcome] = count
+    return dict(sorted(totals.items()))
+
+
+def top_keys(dimension: str, since: datetime, outcomes, limit: int = 10) -> list[tuple[str, int]]:
+    """The limit keys of dimension with the most events of the given outcomes."""
+    rows = (
+        HoneywordRollup.objects.filter(dimension=dimension, bucket__gte=since, outcome__in=list(outcomes))
+        .values("key")
+        .annotate(total=Sum("count"))
+        .order_by("-total", "key")[:limit]
+    )
+    return [(row["key"], row["total"]) for row in rows]
+
+
+def rollup_watermark() -> tuple[int, datetime | None]:
+    mark = HoneywordRollupWatermark.objects.filter(name=WATERMARK).first()
+    if mark is None:
+        return 0, None
+    return mark.last_event_id, mark.updated_at
@@ -7,6 +7,9 @@ logger = logging.getLogger(__name__)
 # args: user, username, request, event
 honeyword_detected = Signal()
 
+# args: timing (timing.LoginTiming), request; sent after each login when LOGIN_TIMING is on
+login_timed = Signal()
+
 
 def _on_user_password_change(sender, instance, **kwargs):
     """
@@ -0,0 +1,230 @@
+"""Event sinks: where log_event() sends HoneywordEvent records.
+
+EVENT_SINK selects one of:
+
+- "db" (default): one INSERT per attempt, as before.
+- "buffered": events are queued in memory and written with bulk_create by a
+  background thread, in batches of EVENT_BATCH_SIZE or every
+  EVENT_FLUSH_INTERVAL seconds, whichever comes first. At most
+  EVENT_BUFFER_SIZE events wait; further ones are dropped and counted.
+  Honeyword events are always written synchronously, so honeyword_detected
+  receivers get a saved event. The buffer is flushed at interpreter exit.
+- "logging": one JSON line per event on the "django_honeywords.events"
+  logger; nothing is written to the database.
+- "null": events are discarded.
+
+A dotted path to an EventSink subclass is accepted as well.
+
+Every sink receives an unsaved HoneywordEvent. Sinks that don't write to the
+database leave it unsaved (pk is None).
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+from .models import HoneywordEvent
+
+logger = logging.getLogger(__name__)
+event_logger = logging.getLogger("django_honeywords.events")
+
+
+class EventSink:
+    def emit(self, event: HoneywordEvent) -> None:
+        raise NotImplementedError
+
+    async def aemit(self, event: HoneywordEvent) -> None:
+        # Default for sinks whose emit() doesn't block on the database.
+        self.emit(event)
+
+    def flush(self) -> None:
+        pass
+
+
+class DbSink(EventSink):
+    def emit(self, event: HoneywordEvent) -> None:
+        event.save(force_insert=True)
+
+    async def aemit(self, event: HoneywordEvent) -> None:
+        await event.asave(force_insert=True)
+
+
+class NullSink(EventSink):
+    def emit(self, event: HoneywordEvent) -> None:
+        pass
+
+
+class LoggingSink(EventSink):
+    def emit(self, event: HoneywordEvent) -> None:
+        record = {
+            "user_id": event.user_id,
+            "username": event.username,
+            "outcome": event.outcome,
+            "created_at": event.created_at.isoformat(),
+            "ip_address": event.ip_address,
+            "user_agent": event.user_agent,
+        }
+        level = logging.WARNING if event.outcome == HoneywordEvent.OUTCOME_HONEY else logging.INFO
+        event_logger.log(level, json.dumps(record), extra={"honeywords_event": record})
+
+
+class BufferedDbSink(EventSink):
+    def __init__(
+        self,
+        max_buffer: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        *,
+        autostart: bool = True,
+    ):
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.autostart = autostart
+        self._buffer: list[HoneywordEvent] = []
+        self._lock = threading.Lock()
+        # Serializes flushes so batches are written in emit order.
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._counters = dict.fromkeys(("buffered", "written", "direct", "dropped", "failed"), 0)
+
+    def emit(self, event: HoneywordEvent) -> None:
+        if event.outcome == HoneywordEvent.OUTCOME_HONEY:
+            event.save(force_insert=True)
+            with self._lock:
+                self._counters["direct"] += 1
+            return
+        self._enqueue(event)
+
+    async def aemit(self, event: HoneywordEvent) -> None:
+        if event.outcome == HoneywordEvent.OUTCOME_HONEY:
+            await event.asave(force_insert=True)
+            with self._lock:
+                self._counters["direct"] += 1
+            return
+        self._enqueue(event)
+
+    def _enqueue(self, event: HoneywordEvent) -> None:
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._counters["dropped"] += 1
+                return
+            self._buffer.append(event)
+            self._counters["buffered"] += 1
+            full = len(self._buffer) >= self.batch_size
+        if self.autostart:
+            self._ensure_worker()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write every buffered event in the calling thread; return how many."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._buffer[: self.batch_size]
+                    del self._buffer[: self.batch_size]
+                if not batch:
+                    return written
+                try:
+                    HoneywordEvent.objects.bulk_create(batch)
+                except Exception:
+                    logger.exception("Writing %d buffered honeyword events failed", len(batch))
+                    with self._lock:
+                        self._counters["failed"] += len(batch)
+                    continue
+                written += len(batch)
+                with self._lock:
+                    self._counters["written"] += len(batch)
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is not None or self._stopping:
+                return
+            self._thread = threading.Thread(target=self._run, name="honeywords-events", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connections.close_all()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker and write whatever is still buffered."""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": len(self._buffer), **self._counters}
+
+
+SINKS = {
+    "db": DbSink,
+    "buffered": BufferedDbSink,
+    "logging": LoggingSink,
+    "null": NullSink,
+}
+
+_sink: EventSink | None = None
+_sink_key: tuple | None = None
+_sink_lock = threading.Lock()
+
+
+def _build_sink(name: str) -> EventSink:
+    if name == "buffered":
+        return BufferedDbSink(
+            max_buffer=int(get_setting("EVENT_BUFFER_SIZE")),
+            batch_size=int(get_setting("EVENT_BATCH_SIZE")),
+            flush_interval=float(get_setting("EVENT_FLUSH_INTERVAL")),
+        )
+    if name in SINKS:
+        return SINKS[name]()
+    try:
+        cls = import_string(name)
+    except ImportError as e:
+        raise ImproperlyConfigured(f"HONEYWORDS['EVENT_SINK'] = {name!r} is not a known sink: {e}") from e
+    return cls()
+
+
+def get_sink() -> EventSink:
+    """Return the process-wide sink; it is rebuilt if the settings change."""
+    global _sink, _sink_key
+    key = (
+        get_setting("EVENT_SINK"),
+        get_setting("EVENT_BUFFER_SIZE"),
+        get_setting("EVENT_BATCH_SIZE"),
+        get_setting("EVENT_FLUSH_INTERVAL"),
+    )
+    with _sink_lock:
+        if _sink is None or _sink_key != key:
+            old = _sink
+            _sink, _sink_key = _build_sink(key[0]), key
+            if isinstance(old, BufferedDbSink):
+                old.stop()
+        return _sink
+
+
+def flush_events() -> None:
+    """Write any events the current sink is holding."""
+    get_sink().flush()
@@ -0,0 +1,223 @@
+"""Per-login timing and query breakdown (LOGIN_TIMING).
+
+With LOGIN_TIMING enabled, HoneywordsBackend wraps each authenticate() in a
+LoginTiming collector held in a context variable. Code on the login path
+reports into it:
+
+- phase(name): wall time per phase, summed if a phase runs more than once
+  (user_lookup, policy_gate, load_candidates, verify, remark, event,
+  policy_action)
+- kdf_timer(): wraps each password-hash derivation, including those run
+  on the parallel verification pool; counts it and sums its time
+- a query counter on the database connection for the duration of the
+  login: queries and the time spent executing them
+
+When the login finishes, the collector is attached to the request as
+request.honeywords_timing and sent with the login_timed signal. With METRICS
+enabled the same collector feeds the login histograms and verdict counters in
+metrics.py (LOGIN_TIMING only controls the request attribute and signal).
+
+With both disabled, authenticate() skips the collector entirely and phase()
+costs one context-variable lookup.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+from . import metrics
+from .conf import get_setting
+from .signals import login_timed
+
+_current: ContextVar["LoginTiming | None"] = ContextVar("honeywords_login_timing", default=None)
+_NO_PHASE = nullcontext()
+
+
+def enabled() -> bool:
+    """Whether logins are collected at all (for LOGIN_TIMING or METRICS)."""
+    return bool(get_setting("LOGIN_TIMING") or get_setting("METRICS"))
+
+
+def current() -> "LoginTiming | None":
+    return _current.get()
+
+
+class LoginTiming:
+    """What one authenticate() call spent its time on."""
+
+    __slots__ = ("username", "outcome", "phases", "hash_calls", "hash_seconds", "queries",
+                 "query_seconds", "total_seconds", "_started", "_lock")
+
+    def __init__(self, username: str | None):
+        self.username = username
+        self.outcome: str | None = None
+        self.phases: dict[str, float] = {}  # seconds
+        self.hash_calls = 0
+        self.hash_seconds = 0.0  # summed across pool threads, may exceed wall time
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.total_seconds = 0.0
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_hash(self, seconds: float) -> None:
+        with self._lock:
+            self.hash_calls += 1
+            self.hash_seconds += seconds
+
+    def add_query(self, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "username": self.username,
+            "outcome": self.outcome,
+            "total_ms": self.total_seconds * 1000,
+            "phases_ms": {name: seconds * 1000 for name, seconds in self.phases.items()},
+            "hash_calls": self.hash_calls,
+            "hash_ms": self.hash_seconds * 1000,
+            "queries": self.queries,
+            "query_ms": self.query_seconds * 1000,
+        }
+
+    def __repr__(self) -> str:
+        phases = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases.items())
+        return (
+            f"<LoginTiming {self.outcome} total={self.total_seconds * 1000:.1f}ms "
+            f"hashes={self.hash_calls} queries={self.queries} {phases}>"
+        )
+
+
+class _Phase:
+    __slots__ = ("timing", "name", "started")
+
+    def __init__(self, timing: LoginTiming, name: str):
+        self.timing = timing
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timing.add_phase(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def phase(name: str):
+    """Context manager timing one phase of the current login (if collecting)."""
+    timing = _current.get()
+    if timing is None:
+        return _NO_PHASE
+    return _Phase(timing, name)
+
+
+class _KdfTimer:
+    __slots__ = ("timing", "started")
+
+    def __init__(self, timing: LoginTiming | None):
+        self.timing = timing
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        if self.timing is not None:
+            self.timing.add_hash(seconds)
+        if metrics.enabled():
+            metrics.KDF_SECONDS.observe(seconds)
+        return False
+
+
+def kdf_timer():
+    """Context manager around one password-hash derivation.
+
+    Counted on the current login (if collecting) and observed in the KDF
+    histogram when METRICS is on, for logins and enrollment alike.
+    """
+    timing = _current.get()
+    if timing is None and not metrics.enabled():
+        return _NO_PHASE
+    return _KdfTimer(timing)
+
+
+def set_outcome(outcome: str) -> None:
+    timing = _current.get()
+    if timing is not None:
+        timing.outcome = outcome
+
+
+def _count_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(time.perf_counter() - started)
+
+
+def _enter_query_counter():
+    """Install the query counter on this thread's default connection.
+
+    Uses connection.execute_wrapper(), whose exit pops the innermost wrapper,
+    so the counter must be removed before any wrapper installed around the
+    login is.
+    """
+    counter = connection.execute_wrapper(_count_query)
+    counter.__enter__()
+    return counter
+
+
+def _finish(timing: LoginTiming, request) -> bool:
+    """Close the collector; True if it should be published (LOGIN_TIMING)."""
+    timing.total_seconds = time.perf_counter() - timing._started
+    if metrics.enabled():
+        metrics.observe_login(timing)
+    if not get_setting("LOGIN_TIMING"):
+        return False
+    if request is not None:
+        request.honeywords_timing = timing
+    return True
+
+
+@contextmanager
+def collect(request, username, *, sender):
+    """Collect timing for the login in the with block, then publish it."""
+    timing = LoginTiming(username)
+    token = _current.set(timing)
+    try:
+        with connection.execute_wrapper(_count_query):
+            yield timing
+    finally:
+        _current.reset(token)
+        publish = _finish(timing, request)
+    if publish:
+        login_timed.send(sender=sender, timing=timing, request=request)
+
+
+@asynccontextmanager
+async def acollect(request, username, *, sender):
+    timing = LoginTiming(username)
+    token = _current.set(timing)
+    # ORM calls run in the thread-sensitive executor; count queries there.
+    counter = await sync_to_async(_enter_query_counter)()
+    try:
+        yield timing
+    finally:
+        await sync_to_async(counter.__exit__)(None, None, None)
+        _current.reset(token)
+        publish = _finish(timing, request)
+    if publish:
+        await login_timed.asend(sender=sender, timing=timing, request=request)
@@ -0,0 +1,10 @@
+"""Mount with path("honeywords/", include("django_honeywords.urls"))."""
+from django.urls import path
+
+from django_honeywords.views import metrics_view
+
+app_name = "django_honeywords"
+
+urlpatterns = [
+    path("metrics", metrics_view, name="metrics"),
+]
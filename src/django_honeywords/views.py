@@ -0,0 +1,26 @@
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+from django_honeywords import metrics
+from django_honeywords.conf import get_setting
+
+
+@never_cache
+@require_safe
+def metrics_view(request):
+    """Prometheus text exposition of metrics.py (404 unless METRICS is on).
+
+    With METRICS_TOKEN set, scrapes must send "Authorization: Bearer <token>".
+    """
+    if not metrics.enabled():
+        raise Http404("Honeywords metrics are disabled.")
+    token = get_setting("METRICS_TOKEN")
+    if token:
+        scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not constant_time_compare(supplied.strip(), token):
+            response = HttpResponse("Unauthorized\n", status=401, content_type="text/plain")
+            response["WWW-Authenticate"] = "Bearer"
+            return response
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,42 @@
+import os
+import random
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from django_honeywords.models import HoneywordEvent
+
+
+@pytest.fixture
+def large_event_table(db):
+    """Seed HoneywordEvent with a realistic spray-heavy mix and ANALYZE it.
+
+    Size comes from HONEYWORDS_BENCH_EVENTS (default 5000); raise it to
+    check query plans against production-like volumes.
+    """
+    size = int(os.environ.get("HONEYWORDS_BENCH_EVENTS", "5000"))
+    rnd = random.Random(1234)
+    User = get_user_model()
+    users = User.objects.bulk_create(User(username=f"bench{i}") for i in range(50))
+    now = timezone.now()
+    outcomes = [HoneywordEvent.OUTCOME_INVALID] * 95 + [HoneywordEvent.OUTCOME_REAL] * 4 + [HoneywordEvent.OUTCOME_HONEY]
+
+    def rows():
+        for _ in range(size):
+            user = rnd.choice(users) if rnd.random() < 0.2 else None
+            yield HoneywordEvent(
+                user=user,
+                username=user.username if user else f"spray{rnd.randrange(5000)}",
+                outcome=rnd.choice(outcomes),
+                created_at=now - timedelta(seconds=rnd.randrange(30 * 86400)),
+                ip_address=f"198.51.{rnd.randrange(256)}.{rnd.randrange(256)}",
+                user_agent="bench",
+            )
+
+    HoneywordEvent.objects.bulk_create(rows(), batch_size=2000)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return {"size": size, "users": users, "now": now}
@@ -0,0 +1,51 @@
+"""Deterministic generator, RNG and user factory shared by the test modules."""
+from django.contrib.auth import get_user_model
+
+from django_honeywords.amnesia_service import amnesia_initialize
+
+
+WORDS = ["Secret123", "h1", "h2", "h3", "h4"]
+
+
+class FixedGenerator:
+    """Returns the given words as the candidate list (real password included)."""
+
+    def __init__(self, words):
+        self._words = words
+
+    def honeywords(self, real: str, k: int):
+        return list(self._words)
+
+
+class FixedRNG:
+    """Cycles through values for random(); randbelow() always returns 0.
+
+    The default (0.9,) makes Bernoulli draws with p < 0.9 come out False.
+    """
+
+    def __init__(self, values=(0.9,)):
+        self.values = list(values)
+        self.i = 0
+
+    def random(self) -> float:
+        v = self.values[self.i % len(self.values)]
+        self.i += 1
+        return v
+
+    def randbelow(self, n: int) -> int:
+        return 0
+
+
+def make_user(username, words=WORDS, **kwargs):
+    """Create a user whose set holds words, with words[0] as the real password.
+
+    Marks are off (p_mark = p_remark = 0) unless kwargs say otherwise; other
+    kwargs go to amnesia_initialize.
+    """
+    user = get_user_model().objects.create_user(username=username)
+    options = {"p_mark": 0.0, "p_remark": 0.0, **kwargs}
+    amnesia_initialize(
+        user, words[0], k=len(words),
+        generator=FixedGenerator(words), real_index=0, rng=FixedRNG(), **options,
+    )
+    return user
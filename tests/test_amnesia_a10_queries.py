@@ -0,0 +1,61 @@
+"""
+Query-count budget for HoneywordsBackend.authenticate.
+
+The user, its AmnesiaSet and its policy state load in one joined query and
+the candidates in a second one; only the event insert comes on top. Raising
+any of these numbers needs a deliberate change here.
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import authenticate
+from django.utils import timezone
+
+from django_honeywords.models import HoneywordUserState
+from tests.helpers import make_user
+
+
+@pytest.fixture
+def user(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"ON_HONEYWORD": "log"}
+
+    return make_user("budget", ["Secret123"] + [f"h{i}" for i in range(1, 20)])
+
+
+@pytest.mark.django_db
+def test_success_budget(user, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        assert authenticate(username="budget", password="Secret123") is not None
+
+
+@pytest.mark.django_db
+def test_invalid_budget(user, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        assert authenticate(username="budget", password="wrong") is None
+
+
+@pytest.mark.django_db
+def test_breach_budget_with_log_policy(user, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        assert authenticate(username="budget", password="h7") is None
+
+
+@pytest.mark.django_db
+def test_unknown_user_budget(user, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        assert authenticate(username="nobody", password="Secret123") is None
+
+
+@pytest.mark.django_db
+def test_locked_user_budget(user, django_assert_num_queries):
+    HoneywordUserState.objects.create(user=user, locked_until=timezone.now() + timedelta(hours=1))
+    # lookup (with state) + event insert; no candidate load, no hashing
+    with django_assert_num_queries(2):
+        assert authenticate(username="budget", password="Secret123") is None
+
+
+@pytest.mark.django_db
+def test_first_login_does_not_create_state(user):
+    authenticate(username="budget", password="Secret123")
+    assert not HoneywordUserState.objects.filter(user=user).exists()
@@ -0,0 +1,204 @@
+"""
+Tests for the packed (single-row) storage layout:
+  - packed sets keep no credential rows and verify like row sets
+  - remarking rewrites the marks bitmask
+  - conversion command between layouts in both directions; conversions fail stale remarks
+  - admin form edits packed marks; admin saves bump the version without losing remarks
+  - packed_digests() and the pepper + packed check (W007)
+"""
+import base64
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+
+from django_honeywords.admin import AmnesiaSetAdmin
+from django_honeywords.amnesia_service import (
+    Candidate,
+    _remark,
+    amnesia_check,
+    amnesia_initialize,
+    pack_set,
+    packed_digests,
+    unpack_set,
+)
+from django_honeywords.checks import honeywords_deployment_checks
+from django_honeywords.models import AmnesiaCredential, AmnesiaSet
+from tests.helpers import FixedGenerator, FixedRNG, make_user
+
+
+WORDS = ["Secret123", "h1", "h2", "h3", "h4"]
+
+
+def _make_user(username, storage=AmnesiaSet.STORAGE_PACKED, p_remark=0.0):
+    return make_user(
+        username, WORDS, p_remark=p_remark,
+        algorithm_version=AmnesiaSet.ALGORITHM_V2, iterations=1000, storage=storage,
+    )
+
+
+@pytest.mark.django_db
+def test_packed_set_has_single_row():
+    u = _make_user("packed")
+    aset = AmnesiaSet.objects.get(user=u)
+
+    assert aset.storage == "packed"
+    assert len(bytes(aset.packed_hashes)) == 5 * 32
+    assert aset.marks == 0b00001
+    assert not AmnesiaCredential.objects.filter(aset=aset).exists()
+
+
+@pytest.mark.django_db
+def test_packed_digests():
+    u = _make_user("packed_digests")
+    digests = packed_digests(u.amnesia_set)
+    assert len(digests) == 5
+    assert all(len(base64.b64decode(d)) == 32 for d in digests)
+
+    rows = _make_user("rows_digests", storage=AmnesiaSet.STORAGE_ROWS)
+    with pytest.raises(ValueError):
+        packed_digests(rows.amnesia_set)
+
+
+def test_pepper_with_packed_storage_warns(settings):
+    def ids():
+        return [e.id for e in honeywords_deployment_checks(None)]
+
+    settings.HONEYWORDS = {"FINGERPRINT_PEPPER": "pepper", "AMNESIA_STORAGE": "packed"}
+    assert "django_honeywords.W007" in ids()
+    settings.HONEYWORDS = {"FINGERPRINT_PEPPER": "pepper", "AMNESIA_STORAGE": "rows"}
+    assert "django_honeywords.W007" not in ids()
+    settings.HONEYWORDS = {"AMNESIA_STORAGE": "packed"}
+    assert "django_honeywords.W007" not in ids()
+
+
+@pytest.mark.django_db
+def test_packed_verdicts():
+    u = _make_user("packed_verdicts")
+    u = get_user_model().objects.get(pk=u.pk)
+
+    assert amnesia_check(u, "Secret123") == "success"
+    assert amnesia_check(u, "h2") == "breach"
+    assert amnesia_check(u, "totally-wrong") == "invalid"
+
+
+@pytest.mark.django_db
+def test_packed_remark_updates_bitmask():
+    u = _make_user("packed_remark", p_remark=1.0)
+    aset = u.amnesia_set
+    aset.p_mark = 1.0
+    aset.save(update_fields=["p_mark"])
+
+    assert amnesia_check(u, "Secret123", rng=FixedRNG([0.0])) == "success"
+    assert AmnesiaSet.objects.get(pk=aset.pk).marks == 0b11111
+
+
+@pytest.mark.django_db
+def test_packed_requires_v2():
+    User = get_user_model()
+    u = User.objects.create_user(username="packed_v1")
+    with pytest.raises(ValueError, match="requires algorithm_version"):
+        amnesia_initialize(u, "Secret123", k=5, storage=AmnesiaSet.STORAGE_PACKED)
+
+
+@pytest.mark.django_db
+def test_convert_storage_round_trip():
+    rows_user = _make_user("to_pack", storage=AmnesiaSet.STORAGE_ROWS)
+    User = get_user_model()
+    v1_user = User.objects.create_user(username="stays_v1")
+    amnesia_initialize(v1_user, "Secret123", k=5, generator=FixedGenerator(WORDS), real_index=0)
+
+    call_command("amnesia_convert_storage", "--to", "packed", "--batch-size", "1")
+
+    aset = AmnesiaSet.objects.get(user=rows_user)
+    assert aset.storage == "packed"
+    assert aset.marks == 0b00001
+    assert not aset.credentials.exists()
+    assert AmnesiaSet.objects.get(user=v1_user).storage == "rows"
+
+    u = User.objects.get(pk=rows_user.pk)
+    assert amnesia_check(u, "Secret123") == "success"
+    assert amnesia_check(u, "h4") == "breach"
+
+    call_command("amnesia_convert_storage", "--to", "rows")
+
+    aset = AmnesiaSet.objects.get(user=rows_user)
+    assert aset.storage == "rows"
+    assert list(aset.credentials.order_by("index").values_list("marked", flat=True)) == [
+        True, False, False, False, False,
+    ]
+    u = User.objects.get(pk=rows_user.pk)
+    assert amnesia_check(u, "Secret123") == "success"
+    assert amnesia_check(u, "h4") == "breach"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("storage", [AmnesiaSet.STORAGE_ROWS, AmnesiaSet.STORAGE_PACKED])
+def test_conversion_fails_stale_remarks(storage):
+    u = _make_user(f"convert_{storage}", storage=storage)
+    stale = AmnesiaSet.objects.get(user=u)
+    cred_pk = AmnesiaCredential.objects.filter(aset=stale, index=0).values_list("pk", flat=True).first()
+    convert = pack_set if storage == AmnesiaSet.STORAGE_ROWS else unpack_set
+
+    assert convert(AmnesiaSet.objects.get(user=u)) is True
+    assert AmnesiaSet.objects.get(user=u).version == stale.version + 1
+
+    # A remark that read the set before the conversion must not write.
+    _remark(stale, Candidate(cred_pk, 0, "", "", True), FixedRNG([0.0]))
+    aset = AmnesiaSet.objects.get(user=u)
+    assert aset.version == stale.version + 1
+    if aset.storage == AmnesiaSet.STORAGE_PACKED:
+        assert aset.marks == 0b00001
+    else:
+        assert aset.marks == 0
+        assert list(aset.credentials.order_by("index").values_list("marked", flat=True)) == [
+            True, False, False, False, False,
+        ]
+
+
+@pytest.mark.django_db
+def test_admin_form_edits_packed_marks(rf):
+    u = _make_user("packed_admin")
+    aset = AmnesiaSet.objects.get(user=u)
+    model_admin = AmnesiaSetAdmin(model=AmnesiaSet, admin_site=admin.site)
+    request = rf.get("/")
+
+    assert model_admin.get_inlines(request, aset) == []
+    assert "marked_indices" in model_admin.get_fields(request, aset)
+
+    Form = model_admin.get_form(request, aset)
+    form = Form(data={"marked_indices": ["0", "3"]}, instance=aset)
+    assert form.is_valid(), form.errors
+    form.save()
+
+    assert AmnesiaSet.objects.get(pk=aset.pk).marks == 0b01001
+
+
+def _admin_save(aset, data):
+    """Run the admin's save steps for aset as the change view does."""
+    model_admin = AmnesiaSetAdmin(model=AmnesiaSet, admin_site=admin.site)
+    form = model_admin.get_form(None, aset)(data=data, instance=aset)
+    assert form.is_valid(), form.errors
+    obj = form.save(commit=False)
+    model_admin.save_model(None, obj, form, True)
+    model_admin.save_related(None, form, [], True)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("storage", [AmnesiaSet.STORAGE_PACKED, AmnesiaSet.STORAGE_ROWS])
+def test_admin_save_keeps_concurrent_version_bump(storage):
+    u = _make_user(f"admin_race_{storage}", storage=storage)
+    aset = AmnesiaSet.objects.get(user=u)
+    version = aset.version
+
+    # A remark commits after the admin loaded the set.
+    AmnesiaSet.objects.filter(pk=aset.pk).update(version=F("version") + 1)
+    data = {"marked_indices": ["0", "2"]} if storage == AmnesiaSet.STORAGE_PACKED else {}
+    _admin_save(aset, data)
+
+    saved = AmnesiaSet.objects.get(pk=aset.pk)
+    assert saved.version == version + 2
+    if storage == AmnesiaSet.STORAGE_PACKED:
+        assert saved.marks == 0b00101
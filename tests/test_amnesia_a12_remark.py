@@ -0,0 +1,110 @@
+"""
+Tests for optimistic (version-checked) remarking:
+  - a remark bumps AmnesiaSet.version and never takes row locks
+  - a conflicting remark that left our credential marked is retried
+  - a conflicting remark that unmarked our credential yields "breach"
+  - re-initialization invalidates in-flight remarks
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models import F
+
+from django_honeywords.amnesia_service import (
+    Candidate,
+    _remark,
+    amnesia_check,
+    amnesia_initialize,
+)
+from django_honeywords.models import AmnesiaCredential, AmnesiaSet
+from tests.helpers import FixedGenerator, FixedRNG, make_user
+
+
+WORDS = ["Secret123", "h1", "h2", "h3", "h4"]
+
+
+def _make_user(username, **kwargs):
+    u = make_user(username, WORDS, p_mark=1.0, p_remark=1.0, **kwargs)
+    return get_user_model().objects.select_related("amnesia_set").get(pk=u.pk)
+
+
+def _real_candidate(aset):
+    pk = AmnesiaCredential.objects.get(aset=aset, index=0).pk
+    return Candidate(pk, 0, "", "", True)
+
+
+@pytest.mark.django_db
+def test_remark_bumps_version():
+    u = _make_user("opt_bump")
+    before = u.amnesia_set.version
+
+    assert amnesia_check(u, "Secret123", rng=FixedRNG([0.0])) == "success"
+
+    aset = AmnesiaSet.objects.get(pk=u.amnesia_set.pk)
+    assert aset.version == before + 1
+    assert list(aset.credentials.order_by("index").values_list("marked", flat=True)) == [True] * 5
+
+
+@pytest.mark.django_db
+def test_remark_takes_no_row_locks(monkeypatch):
+    u = _make_user("opt_nolock")
+    monkeypatch.setattr(
+        AmnesiaCredential.objects.__class__, "select_for_update",
+        lambda *a, **kw: pytest.fail("remark must not lock rows"),
+    )
+    assert amnesia_check(u, "Secret123", rng=FixedRNG([0.0])) == "success"
+
+
+@pytest.mark.django_db
+def test_conflict_with_credential_still_marked_retries():
+    u = _make_user("opt_retry")
+    aset = u.amnesia_set
+    # Someone else remarked since we read the set (credential 0 stays marked).
+    AmnesiaSet.objects.filter(pk=aset.pk).update(version=F("version") + 1)
+
+    assert _remark(aset, _real_candidate(aset), FixedRNG([0.0])) is True
+    assert AmnesiaSet.objects.get(pk=aset.pk).version == aset.version + 2
+
+
+@pytest.mark.django_db
+def test_conflict_that_unmarked_credential_is_breach():
+    u = _make_user("opt_race")
+    aset = u.amnesia_set
+    AmnesiaCredential.objects.filter(aset=aset, index=0).update(marked=False)
+    AmnesiaSet.objects.filter(pk=aset.pk).update(version=F("version") + 1)
+
+    assert _remark(aset, _real_candidate(aset), FixedRNG([0.0])) is False
+    # Our stale write was not applied.
+    assert AmnesiaCredential.objects.get(aset=aset, index=0).marked is False
+
+
+@pytest.mark.django_db
+def test_packed_remark_is_one_statement(django_assert_num_queries):
+    u = _make_user(
+        "opt_packed",
+        algorithm_version=AmnesiaSet.ALGORITHM_V2, iterations=1000, storage=AmnesiaSet.STORAGE_PACKED,
+    )
+    aset = u.amnesia_set
+    with django_assert_num_queries(1):
+        assert _remark(aset, Candidate(None, 0, "", "", True), FixedRNG([0.0])) is True
+    fresh = AmnesiaSet.objects.get(pk=aset.pk)
+    assert fresh.marks == 0b11111
+    assert fresh.version == aset.version + 1
+
+
+@pytest.mark.django_db
+def test_reinitialize_invalidates_stale_remark():
+    u = _make_user("opt_reinit")
+    stale = u.amnesia_set
+    stale_cred = _real_candidate(stale)
+
+    amnesia_initialize(
+        u, "NewPass2", k=5, p_mark=0.0, p_remark=0.0,
+        generator=FixedGenerator(["NewPass2", "n1", "n2", "n3", "n4"]),
+        real_index=0, rng=FixedRNG([0.9]),
+    )
+
+    # The stale remark must not overwrite the new set's marks.
+    _remark(stale, stale_cred, FixedRNG([0.0]))
+    fresh = get_user_model().objects.get(pk=u.pk)
+    assert amnesia_check(fresh, "NewPass2") == "success"
+    assert amnesia_check(fresh, "n1") == "breach"
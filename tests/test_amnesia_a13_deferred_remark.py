@@ -0,0 +1,124 @@
+"""
+Tests for deferred remarking:
+  - amnesia_check queues the remark after commit instead of writing inline
+  - the queue coalesces per set, drops when full and counts both
+  - stale requests (re-initialized set, unmarked candidate) are skipped
+  - stop() flushes what is still pending
+"""
+import pytest
+from django.contrib.auth import get_user_model
+
+from django_honeywords import remarks
+from django_honeywords.amnesia_service import amnesia_check, amnesia_initialize
+from django_honeywords.models import AmnesiaCredential, AmnesiaSet
+from django_honeywords.remarks import RemarkQueue
+from tests.helpers import FixedGenerator, FixedRNG, make_user
+
+
+WORDS = ["Secret123", "h1", "h2", "h3", "h4"]
+
+
+@pytest.fixture
+def queue(monkeypatch, settings):
+    settings.HONEYWORDS = {"REMARK_MODE": "deferred"}
+    q = RemarkQueue(maxsize=10, autostart=False)
+    monkeypatch.setattr(remarks, "_queue", q)
+    return q
+
+
+def _make_user(username):
+    u = make_user(username, WORDS, p_remark=1.0)
+    # Remarks mark everything from now on.
+    AmnesiaSet.objects.filter(user=u).update(p_mark=1.0)
+    return get_user_model().objects.select_related("amnesia_set").get(pk=u.pk)
+
+
+def _marks(u):
+    return list(AmnesiaCredential.objects.filter(aset__user=u).order_by("index").values_list("marked", flat=True))
+
+
+@pytest.mark.django_db
+def test_deferred_remark_runs_after_commit(queue, django_capture_on_commit_callbacks):
+    u = _make_user("deferred")
+    version = u.amnesia_set.version
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert amnesia_check(u, "Secret123", rng=FixedRNG([0.0])) == "success"
+
+    # Nothing written on the login path.
+    assert _marks(u) == [True, False, False, False, False]
+    assert queue.stats()["pending"] == 1
+
+    assert queue.flush() == 1
+    assert _marks(u) == [True] * 5
+    assert AmnesiaSet.objects.get(user=u).version == version + 1
+    assert queue.stats()["applied"] == 1
+
+
+@pytest.mark.django_db
+def test_remark_not_queued_when_transaction_rolls_back(queue, django_capture_on_commit_callbacks):
+    u = _make_user("rolled_back")
+    with django_capture_on_commit_callbacks(execute=False):
+        amnesia_check(u, "Secret123", rng=FixedRNG([0.0]))
+    assert queue.stats()["pending"] == 0
+
+
+def test_queue_coalesces_and_drops():
+    q = RemarkQueue(maxsize=2, autostart=False)
+    assert q.submit(1, 0, "a") is True
+    assert q.submit(1, 3, "b") is True
+    assert q.submit(2, 0, "c") is True
+    assert q.submit(3, 0, "d") is False
+
+    stats = q.stats()
+    assert stats["pending"] == 2
+    assert stats["submitted"] == 2
+    assert stats["coalesced"] == 1
+    assert stats["dropped"] == 1
+
+
+@pytest.mark.django_db
+def test_stale_requests_are_skipped(queue):
+    u = _make_user("stale")
+    aset = u.amnesia_set
+    real_hash = AmnesiaCredential.objects.get(aset=aset, index=0).password_hash
+
+    # Candidate 0 was unmarked by someone else after the login.
+    AmnesiaCredential.objects.filter(aset=aset, index=0).update(marked=False)
+    queue.submit(aset.pk, 0, real_hash)
+    # A set that no longer exists.
+    queue.submit(aset.pk + 1000, 0, real_hash)
+    queue.flush()
+
+    assert _marks(u) == [False, False, False, False, False]
+    assert queue.stats()["skipped"] == 2
+
+
+@pytest.mark.django_db
+def test_reinitialized_set_is_skipped(queue):
+    u = _make_user("reinit")
+    aset = u.amnesia_set
+    old_hash = AmnesiaCredential.objects.get(aset=aset, index=0).password_hash
+    queue.submit(aset.pk, 0, old_hash)
+
+    amnesia_initialize(
+        u, "NewPass2", k=5, p_mark=0.0, p_remark=0.0,
+        generator=FixedGenerator(["n1", "NewPass2", "n2", "n3", "n4"]),
+        real_index=1, rng=FixedRNG([0.9]),
+    )
+    queue.flush()
+
+    assert _marks(u) == [False, True, False, False, False]
+    assert queue.stats()["skipped"] == 1
+
+
+@pytest.mark.django_db
+def test_stop_flushes_pending(queue):
+    u = _make_user("shutdown")
+    aset = u.amnesia_set
+    queue.submit(aset.pk, 0, AmnesiaCredential.objects.get(aset=aset, index=0).password_hash)
+
+    queue.stop()
+
+    assert queue.stats()["pending"] == 0
+    assert queue.stats()["applied"] == 1
@@ -0,0 +1,103 @@
+"""
+Tests for the native async path:
+  - aamnesia_check matches amnesia_check for every verdict
+  - aauthenticate logs events, fires honeyword_detected and applies policy
+  - locked users and unknown usernames are rejected
+  - aget_user
+"""
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import aauthenticate, get_user_model
+from django.utils import timezone
+
+from django_honeywords.amnesia_service import aamnesia_check
+from django_honeywords.backend import HoneywordsBackend
+from django_honeywords.models import AmnesiaSet, HoneywordEvent, HoneywordUserState
+from django_honeywords.signals import honeyword_detected
+from tests.helpers import make_user
+
+
+@pytest.fixture
+def backend_settings(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"LOG_REAL_SUCCESS": True, "ON_HONEYWORD": "lock"}
+    return settings
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("algorithm", AmnesiaSet.ALGORITHMS)
+def test_aamnesia_check_verdicts(algorithm):
+    u = make_user(f"async_{algorithm}", algorithm_version=algorithm, iterations=1000)
+    User = get_user_model()
+    fresh = User.objects.get(pk=u.pk)  # amnesia_set not cached
+
+    check = async_to_sync(aamnesia_check)
+    assert check(fresh, "Secret123") == "success"
+    assert check(fresh, "h1") == "breach"
+    assert check(fresh, "nope") == "invalid"
+
+
+@pytest.mark.django_db
+def test_aamnesia_check_without_set_is_invalid():
+    User = get_user_model()
+    u = User.objects.create_user(username="async_noset")
+    assert async_to_sync(aamnesia_check)(u, "whatever") == "invalid"
+
+
+@pytest.mark.django_db
+def test_aauthenticate_success_logs_real(backend_settings):
+    make_user("async_ok")
+
+    user = async_to_sync(aauthenticate)(username="async_ok", password="Secret123")
+
+    assert user is not None and user.username == "async_ok"
+    assert HoneywordEvent.objects.filter(username="async_ok", outcome=HoneywordEvent.OUTCOME_REAL).count() == 1
+
+
+@pytest.mark.django_db
+def test_aauthenticate_breach_signals_and_locks(backend_settings):
+    u = make_user("async_breach")
+    received = []
+
+    def handler(sender, **kwargs):
+        received.append(kwargs)
+
+    honeyword_detected.connect(handler)
+    try:
+        assert async_to_sync(aauthenticate)(username="async_breach", password="h2") is None
+    finally:
+        honeyword_detected.disconnect(handler)
+
+    assert len(received) == 1
+    assert received[0]["event"].outcome == HoneywordEvent.OUTCOME_HONEY
+    state = HoneywordUserState.objects.get(user=u)
+    assert state.lock_count == 1
+    assert state.locked_until > timezone.now()
+
+    # Locked now: even the real password is refused.
+    assert async_to_sync(aauthenticate)(username="async_breach", password="Secret123") is None
+
+
+@pytest.mark.django_db
+def test_aauthenticate_respects_existing_lock(backend_settings):
+    u = make_user("async_locked")
+    HoneywordUserState.objects.create(user=u, locked_until=timezone.now() + timedelta(minutes=5))
+
+    assert async_to_sync(aauthenticate)(username="async_locked", password="Secret123") is None
+
+
+@pytest.mark.django_db
+def test_aauthenticate_unknown_user_logs_invalid(backend_settings):
+    assert async_to_sync(aauthenticate)(username="ghost", password="x") is None
+    assert HoneywordEvent.objects.filter(username="ghost", outcome=HoneywordEvent.OUTCOME_INVALID).exists()
+
+
+@pytest.mark.django_db
+def test_aget_user():
+    u = make_user("async_get")
+    backend = HoneywordsBackend()
+
+    assert async_to_sync(backend.aget_user)(u.pk).pk == u.pk
+    assert async_to_sync(backend.aget_user)(u.pk + 1000) is None
@@ -0,0 +1,126 @@
+"""
+Tests for event sinks:
+  - EVENT_SINK selects the sink; unknown names are rejected
+  - buffered sink batches invalid events and writes honey events at once
+  - buffered sink bound, flush and counters
+  - logging / null sinks write nothing but still return an event
+"""
+import json
+import logging
+
+import pytest
+from django.contrib.auth import authenticate
+from django.core.exceptions import ImproperlyConfigured
+
+from django_honeywords import sinks
+from django_honeywords.events import log_event
+from django_honeywords.models import HoneywordEvent
+from django_honeywords.signals import honeyword_detected
+from tests.helpers import make_user
+
+
+WORDS = ["Secret123", "h1", "h2", "h3", "h4"]
+
+
+@pytest.fixture
+def buffered(monkeypatch):
+    sink = sinks.BufferedDbSink(max_buffer=5, batch_size=2, autostart=False)
+    monkeypatch.setattr(sinks, "get_sink", lambda: sink)
+    monkeypatch.setattr("django_honeywords.events.get_sink", lambda: sink)
+    return sink
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "name, cls",
+    [("db", sinks.DbSink), ("buffered", sinks.BufferedDbSink), ("logging", sinks.LoggingSink),
+     ("null", sinks.NullSink), ("django_honeywords.sinks.NullSink", sinks.NullSink)],
+)
+def test_sink_selected_by_setting(settings, name, cls):
+    settings.HONEYWORDS = {"EVENT_SINK": name}
+    sink = sinks.get_sink()
+    assert type(sink) is cls
+    assert sinks.get_sink() is sink
+
+
+def test_unknown_sink_rejected(settings):
+    settings.HONEYWORDS = {"EVENT_SINK": "nope.Sink"}
+    with pytest.raises(ImproperlyConfigured, match="EVENT_SINK"):
+        sinks.get_sink()
+
+
+@pytest.mark.django_db
+def test_db_sink_is_default():
+    event = log_event(user=None, username="x", outcome=HoneywordEvent.OUTCOME_INVALID, request=None)
+    assert event.pk is not None
+    assert HoneywordEvent.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_buffered_sink_batches(buffered, django_assert_num_queries):
+    for i in range(3):
+        event = log_event(user=None, username=f"u{i}", outcome=HoneywordEvent.OUTCOME_INVALID, request=None)
+        assert event.pk is None
+    assert HoneywordEvent.objects.count() == 0
+
+    # Two batches of batch_size=2.
+    with django_assert_num_queries(2):
+        assert buffered.flush() == 3
+
+    assert sorted(HoneywordEvent.objects.values_list("username", flat=True)) == ["u0", "u1", "u2"]
+    assert buffered.stats()["written"] == 3
+
+
+@pytest.mark.django_db
+def test_buffered_sink_drops_when_full(buffered):
+    for i in range(7):
+        log_event(user=None, username=f"u{i}", outcome=HoneywordEvent.OUTCOME_INVALID, request=None)
+
+    stats = buffered.stats()
+    assert stats["pending"] == 5
+    assert stats["dropped"] == 2
+    buffered.stop()
+    assert HoneywordEvent.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_buffered_sink_writes_honey_synchronously(settings, buffered):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    make_user("buffer_breach", WORDS)
+    received = []
+
+    def handler(sender, event, **kwargs):
+        received.append(event)
+
+    honeyword_detected.connect(handler)
+    try:
+        assert authenticate(username="buffer_breach", password="h1") is None
+        assert authenticate(username="buffer_breach", password="wrong") is None
+    finally:
+        honeyword_detected.disconnect(handler)
+
+    assert received[0].pk is not None
+    assert HoneywordEvent.objects.get().outcome == HoneywordEvent.OUTCOME_HONEY
+    assert buffered.stats()["pending"] == 1
+
+
+@pytest.mark.django_db
+def test_logging_sink_writes_json(settings, caplog):
+    settings.HONEYWORDS = {"EVENT_SINK": "logging"}
+
+    with caplog.at_level(logging.INFO, logger="django_honeywords.events"):
+        event = log_event(user=None, username="carol", outcome=HoneywordEvent.OUTCOME_INVALID, request=None)
+
+    assert event.pk is None
+    assert HoneywordEvent.objects.count() == 0
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["username"] == "carol"
+    assert record["outcome"] == "invalid"
+
+
+@pytest.mark.django_db
+def test_null_sink_discards(settings):
+    settings.HONEYWORDS = {"EVENT_SINK": "null"}
+    event = log_event(user=None, username="dave", outcome=HoneywordEvent.OUTCOME_HONEY, request=None)
+    assert event.outcome == HoneywordEvent.OUTCOME_HONEY
+    assert HoneywordEvent.objects.count() == 0
@@ -0,0 +1,97 @@
+"""
+Tests for write-time aggregation of invalid attempts:
+  - attempts fold into one counter row per (username, ip, bucket)
+  - new bucket / new address start new rows
+  - honey and real outcomes are still recorded individually
+  - disabled by default
+  - naive times (USE_TZ=False) bucket in the default time zone
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.contrib.auth import authenticate
+
+from django_honeywords.aggregation import bucket_start, increment_invalid
+from django_honeywords.models import HoneywordEvent, HoneywordInvalidCounter
+from tests.helpers import make_user
+
+
+WORDS = ["Secret123", "h1", "h2", "h3", "h4"]
+
+
+@pytest.fixture
+def aggregate(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"AGGREGATE_INVALID": True, "AGGREGATE_BUCKET_SECONDS": 60, "LOG_REAL_SUCCESS": True}
+    return settings
+
+
+def test_bucket_start():
+    at = datetime(2024, 5, 1, 12, 34, 56, tzinfo=dt_timezone.utc)
+    assert bucket_start(at, 60) == datetime(2024, 5, 1, 12, 34, tzinfo=dt_timezone.utc)
+    assert bucket_start(at, 3600) == datetime(2024, 5, 1, 12, tzinfo=dt_timezone.utc)
+    with pytest.raises(ValueError):
+        bucket_start(at, 0)
+
+
+@pytest.mark.django_db
+def test_spray_folds_into_counters(aggregate, rf):
+    request = rf.post("/login", REMOTE_ADDR="203.0.113.9", HTTP_USER_AGENT="stuffer/1.0")
+
+    for _ in range(25):
+        assert authenticate(request, username="ghost", password="x") is None
+    authenticate(rf.post("/login", REMOTE_ADDR="203.0.113.10"), username="ghost", password="x")
+
+    assert HoneywordEvent.objects.count() == 0
+    rows = {c.ip_address: c.count for c in HoneywordInvalidCounter.objects.filter(username="ghost")}
+    assert rows == {"203.0.113.9": 25, "203.0.113.10": 1}
+
+
+@pytest.mark.django_db
+def test_new_bucket_starts_new_row(aggregate):
+    at = datetime(2024, 5, 1, 12, 0, 30, tzinfo=dt_timezone.utc)
+    increment_invalid(username="eve", ip_address=None, at=at)
+    increment_invalid(username="eve", ip_address=None, at=at + timedelta(seconds=10))
+    increment_invalid(username="eve", ip_address=None, at=at + timedelta(seconds=60))
+
+    counts = list(HoneywordInvalidCounter.objects.order_by("bucket").values_list("count", "ip_address"))
+    assert counts == [(2, ""), (1, "")]
+    assert HoneywordInvalidCounter.objects.order_by("bucket").first().last_seen == at + timedelta(seconds=10)
+
+
+@pytest.mark.django_db
+def test_honey_and_real_still_individual(aggregate):
+    make_user("agg_user", WORDS)
+
+    assert authenticate(username="agg_user", password="Secret123") is not None
+    assert authenticate(username="agg_user", password="wrong") is None
+    assert authenticate(username="agg_user", password="h1") is None
+
+    outcomes = sorted(HoneywordEvent.objects.values_list("outcome", flat=True))
+    assert outcomes == [HoneywordEvent.OUTCOME_HONEY, HoneywordEvent.OUTCOME_REAL]
+    assert HoneywordInvalidCounter.objects.get(username="agg_user").count == 1
+
+
+@pytest.mark.django_db
+def test_disabled_by_default(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    authenticate(username="ghost", password="x")
+
+    assert HoneywordEvent.objects.filter(outcome=HoneywordEvent.OUTCOME_INVALID).count() == 1
+    assert not HoneywordInvalidCounter.objects.exists()
+
+
+@pytest.mark.django_db
+def test_invalid_login_with_naive_datetimes(aggregate):
+    aggregate.USE_TZ = False
+    aggregate.TIME_ZONE = "Asia/Kolkata"  # UTC+05:30, so UTC hours start at :30 local
+    aggregate.HONEYWORDS = {**aggregate.HONEYWORDS, "AGGREGATE_BUCKET_SECONDS": 3600}
+
+    assert authenticate(username="ghost", password="x") is None
+    assert authenticate(username="ghost", password="y") is None
+
+    counter = HoneywordInvalidCounter.objects.get(username="ghost")
+    assert counter.count == 2
+    assert counter.bucket.tzinfo is None
+    assert counter.bucket.minute == 30 and counter.bucket.second == 0
+    assert counter.bucket <= counter.last_seen < counter.bucket + timedelta(hours=1)
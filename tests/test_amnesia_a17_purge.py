@@ -0,0 +1,145 @@
+"""
+Tests for event retention:
+  - honeywords_purge_events deletes only expired rows, in chunks
+  - --archive writes a readable archive before deleting
+  - ArchiveReader scan filters and round-trips every field
+  - naive datetimes (USE_TZ=False) archive as local time in TIME_ZONE
+  - dry run / missing retention window
+"""
+from datetime import timedelta, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from django_honeywords.archive import ArchiveError, ArchiveReader, ArchiveWriter
+from django_honeywords.models import HoneywordEvent
+
+
+def _seed(days_ago, n, **fields):
+    at = timezone.now() - timedelta(days=days_ago)
+    HoneywordEvent.objects.bulk_create(
+        HoneywordEvent(created_at=at, outcome=fields.get("outcome", HoneywordEvent.OUTCOME_INVALID),
+                       username=fields.get("username", "spray"), ip_address=fields.get("ip_address"),
+                       user_agent=fields.get("user_agent", "bot/1.0"), user=fields.get("user"))
+        for _ in range(n)
+    )
+
+
+@pytest.mark.django_db
+def test_purge_deletes_expired_in_chunks(django_assert_max_num_queries):
+    _seed(40, 7)
+    _seed(1, 3)
+
+    out = StringIO()
+    # 4 chunks of 2 (+ empty probe), one SELECT and one DELETE each.
+    with django_assert_max_num_queries(12):
+        call_command("honeywords_purge_events", "--days", "30", "--batch-size", "2", stdout=out)
+
+    assert "Purged 7 event(s)" in out.getvalue()
+    assert HoneywordEvent.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_purge_uses_retention_setting(settings):
+    settings.HONEYWORDS = {"EVENT_RETENTION_DAYS": 10}
+    _seed(11, 2)
+    _seed(9, 1)
+
+    call_command("honeywords_purge_events", stdout=StringIO())
+    assert HoneywordEvent.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_purge_requires_window():
+    with pytest.raises(CommandError, match="EVENT_RETENTION_DAYS"):
+        call_command("honeywords_purge_events")
+
+
+@pytest.mark.django_db
+def test_dry_run_deletes_nothing():
+    _seed(40, 2)
+    out = StringIO()
+    call_command("honeywords_purge_events", "--days", "30", "--dry-run", stdout=out)
+    assert "2 event(s)" in out.getvalue()
+    assert HoneywordEvent.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_archive_then_purge(tmp_path):
+    User = get_user_model()
+    u = User.objects.create_user(username="victim")
+    _seed(40, 5, ip_address="203.0.113.9")
+    _seed(35, 1, outcome=HoneywordEvent.OUTCOME_HONEY, username="victim", user=u,
+          ip_address="2001:db8::1", user_agent="Mozilla/5.0 ✓")
+    _seed(1, 2)
+    expected = {e.pk: e for e in HoneywordEvent.objects.filter(created_at__lt=timezone.now() - timedelta(days=30))}
+
+    path = tmp_path / "events.hwa"
+    call_command("honeywords_purge_events", "--days", "30", "--archive", str(path),
+                 "--batch-size", "4", stdout=StringIO())
+
+    assert HoneywordEvent.objects.count() == 2
+    assert not (tmp_path / "events.hwa.partial").exists()
+
+    with ArchiveReader(str(path)) as reader:
+        assert len(reader) == 6
+        archived = {e.id: e for e in reader}
+        assert archived.keys() == expected.keys()
+        for pk, event in expected.items():
+            row = archived[pk]
+            assert row.created_at == event.created_at
+            assert row.user_id == event.user_id
+            assert (row.username, row.outcome, row.ip_address, row.user_agent) == (
+                event.username, event.outcome, event.ip_address, event.user_agent
+            )
+
+        honey = list(reader.scan(outcome=HoneywordEvent.OUTCOME_HONEY))
+        assert [e.username for e in honey] == ["victim"]
+        assert honey[0].user_agent == "Mozilla/5.0 ✓"
+        assert list(reader.scan(outcome=HoneywordEvent.OUTCOME_THROTTLED)) == []
+        since = timezone.now() - timedelta(days=36)
+        assert len(list(reader.scan(since=since))) == 1
+        assert len(list(reader.scan(username="spray", until=since))) == 5
+
+
+@pytest.mark.django_db
+def test_archive_with_naive_datetimes(settings, tmp_path):
+    settings.USE_TZ = False
+    settings.TIME_ZONE = "Asia/Kolkata"  # UTC+05:30
+    _seed(40, 2)
+    _seed(1, 1)
+    stored = sorted(HoneywordEvent.objects.values_list("created_at", flat=True))[:2]
+    assert all(timezone.is_naive(at) for at in stored)
+
+    path = tmp_path / "naive.hwa"
+    call_command("honeywords_purge_events", "--days", "30", "--archive", str(path), stdout=StringIO())
+
+    assert HoneywordEvent.objects.count() == 1
+    with ArchiveReader(str(path)) as reader:
+        archived = sorted(e.created_at for e in reader)
+        assert archived == [timezone.make_aware(at, timezone.get_default_timezone()) for at in stored]
+        assert archived[0].utcoffset() == timedelta(0)
+        assert archived[0] == stored[0].replace(tzinfo=dt_timezone.utc) - timedelta(hours=5, minutes=30)
+        cutoff = timezone.make_aware(timezone.now() - timedelta(days=30))
+        assert len(list(reader.scan(until=cutoff))) == 2
+        with pytest.raises(ValueError, match="naive"):
+            list(reader.scan(until=timezone.now()))
+
+
+def test_empty_archive_round_trip(tmp_path):
+    path = str(tmp_path / "empty.hwa")
+    with ArchiveWriter(path):
+        pass
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 0
+        assert list(reader) == []
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "junk.bin"
+    path.write_bytes(b"x" * 100)
+    with pytest.raises(ArchiveError):
+        ArchiveReader(str(path))
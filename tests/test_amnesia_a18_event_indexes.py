@@ -0,0 +1,55 @@
+"""
+Query plans for the HoneywordEvent access paths (on the seeded table):
+  - admin changelist, unfiltered and filtered by outcome
+  - recent events for a user / username / address
+  - retention cutoff
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib import admin
+from django.db import connection
+
+from django_honeywords.models import HoneywordEvent
+
+pytestmark = pytest.mark.skipif(connection.vendor != "sqlite", reason="plans asserted for SQLite")
+
+
+def _plan(qs) -> str:
+    return qs.explain()
+
+
+def _uses(qs, index: str) -> bool:
+    return f"INDEX {index}" in _plan(qs)
+
+
+@pytest.mark.django_db
+def test_changelist_uses_indexes(large_event_table, rf, admin_user):
+    model_admin = admin.site._registry[HoneywordEvent]
+
+    request = rf.get("/admin/django_honeywords/honeywordevent/")
+    request.user = admin_user
+    cl = model_admin.get_changelist_instance(request)
+    assert _uses(cl.queryset[:100], "hw_event_created_idx")
+
+    request = rf.get("/admin/django_honeywords/honeywordevent/", {"outcome__exact": "honey"})
+    request.user = admin_user
+    cl = model_admin.get_changelist_instance(request)
+    assert _uses(cl.queryset[:100], "hw_event_outcome_created_idx")
+
+
+@pytest.mark.django_db
+def test_lookups_use_indexes(large_event_table):
+    now = large_event_table["now"]
+    user = large_event_table["users"][0]
+    recent = HoneywordEvent.objects.order_by("-created_at")
+    since = now - timedelta(days=1)
+
+    assert _uses(recent.filter(user=user)[:50], "hw_event_user_created_idx")
+    assert _uses(recent.filter(username="spray42")[:50], "hw_event_username_created_idx")
+    assert _uses(recent.filter(ip_address="198.51.100.7")[:50], "hw_event_ip_created_idx")
+    assert _uses(
+        HoneywordEvent.objects.filter(outcome=HoneywordEvent.OUTCOME_HONEY, created_at__gte=since),
+        "hw_event_outcome_created_idx",
+    )
+    assert _uses(HoneywordEvent.objects.filter(created_at__lt=now - timedelta(days=29)), "hw_event_created_idx")
@@ -0,0 +1,106 @@
+"""
+Tests for the HoneywordEvent changelist on large tables:
+  - last-24h window by default, wider windows on request
+  - counts capped at ADMIN_COUNT_LIMIT, no full-table count
+  - prefix / exact / contains search modes
+  - the username pattern-ops index is created on PostgreSQL only
+"""
+import importlib
+from datetime import timedelta
+
+import pytest
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.utils import timezone
+
+from django_honeywords.models import HoneywordEvent
+
+URL = "/admin/django_honeywords/honeywordevent/"
+
+
+def _seed(hours_ago, n, username="spray", ip_address="203.0.113.9"):
+    at = timezone.now() - timedelta(hours=hours_ago)
+    HoneywordEvent.objects.bulk_create(
+        HoneywordEvent(created_at=at, outcome=HoneywordEvent.OUTCOME_INVALID,
+                       username=username, ip_address=ip_address)
+        for _ in range(n)
+    )
+
+
+@pytest.mark.django_db
+def test_default_window_is_last_24h(admin_client):
+    _seed(1, 3)
+    _seed(48, 4)
+
+    response = admin_client.get(URL)
+    assert response.status_code == 200
+    assert response.context["cl"].result_count == 3
+
+    response = admin_client.get(URL, {"window": "7d"})
+    assert response.context["cl"].result_count == 7
+    response = admin_client.get(URL, {"window": "all"})
+    assert response.context["cl"].result_count == 7
+
+
+@pytest.mark.django_db
+def test_count_is_capped(admin_client, settings):
+    settings.HONEYWORDS = {"ADMIN_COUNT_LIMIT": 5}
+    _seed(1, 12)
+
+    response = admin_client.get(URL)
+    cl = response.context["cl"]
+    assert cl.result_count == 5
+    assert cl.show_full_result_count is False
+
+
+@pytest.mark.django_db
+def test_changelist_query_count_is_bounded(admin_client, django_assert_max_num_queries):
+    _seed(1, 50)
+    # session + user + count + page, independent of table size
+    with django_assert_max_num_queries(6):
+        admin_client.get(URL)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "mode, term, expected",
+    [
+        ("prefix", "ali", 2),
+        ("prefix", "203.0.113.9", 1),
+        ("exact", "alice", 1),
+        ("exact", "ali", 0),
+        ("contains", "lic", 2),
+    ],
+)
+def test_search_modes(admin_client, settings, mode, term, expected):
+    settings.HONEYWORDS = {"ADMIN_SEARCH_MODE": mode}
+    _seed(1, 1, username="alice", ip_address="198.51.100.1")
+    _seed(1, 1, username="alicia", ip_address="198.51.100.2")
+    _seed(1, 1, username="bob", ip_address="203.0.113.9")
+
+    response = admin_client.get(URL, {"q": term})
+    assert response.context["cl"].result_count == expected
+
+
+@pytest.mark.django_db
+def test_unknown_search_mode_rejected(admin_client, settings):
+    settings.HONEYWORDS = {"ADMIN_SEARCH_MODE": "fuzzy"}
+    with pytest.raises(ImproperlyConfigured, match="ADMIN_SEARCH_MODE"):
+        admin_client.get(URL, {"q": "x"})
+
+
+@pytest.mark.parametrize("vendor", ["postgresql", "sqlite"])
+def test_username_like_index_migration(monkeypatch, vendor):
+    migration = importlib.import_module(
+        "django_honeywords.migrations.0010_honeywordevent_username_like_index"
+    )
+    monkeypatch.setattr(connection, "vendor", vendor)
+    editor = connection.schema_editor(collect_sql=True)  # collects SQL, runs nothing
+    migration.create_like_index(apps, editor)
+    sql = " ".join(editor.collected_sql)
+    if vendor == "postgresql":
+        assert '"hw_event_username_like_idx"' in sql
+        assert '("username" varchar_pattern_ops)' in sql
+    else:
+        assert sql == ""
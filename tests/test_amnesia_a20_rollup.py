@@ -0,0 +1,132 @@
+"""
+Tests for hourly rollups:
+  - honeywords_rollup folds events per hour / address / username
+  - reruns only process events past the watermark
+  - events inside the lag window wait for the next run
+  - a chunk with many keys folds in a bounded number of statements
+  - the dashboard reads rollups only
+"""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from django_honeywords.models import HoneywordEvent, HoneywordRollup, HoneywordRollupWatermark
+from django_honeywords.rollup import roll_up
+
+HONEY = HoneywordEvent.OUTCOME_HONEY
+INVALID = HoneywordEvent.OUTCOME_INVALID
+
+
+def _hour(hours_ago):
+    return timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours_ago)
+
+
+def _seed(at, n, outcome=INVALID, username="spray", ip_address="203.0.113.9"):
+    HoneywordEvent.objects.bulk_create(
+        HoneywordEvent(created_at=at, outcome=outcome, username=username, ip_address=ip_address)
+        for _ in range(n)
+    )
+
+
+def _count(dimension, key, outcome, bucket):
+    row = HoneywordRollup.objects.filter(dimension=dimension, key=key, outcome=outcome, bucket=bucket).first()
+    return row.count if row else 0
+
+
+@pytest.mark.django_db
+def test_rollup_folds_dimensions():
+    h2, h3 = _hour(2), _hour(3)
+    _seed(h3 + timedelta(minutes=5), 4)
+    _seed(h3 + timedelta(minutes=50), 1, outcome=HONEY, username="alice", ip_address=None)
+    _seed(h2 + timedelta(minutes=1), 2, username="bob", ip_address="198.51.100.1")
+
+    out = StringIO()
+    call_command("honeywords_rollup", "--batch-size", "3", stdout=out)
+    assert "Rolled up 7 event(s)" in out.getvalue()
+
+    assert _count("all", "", INVALID, h3) == 4
+    assert _count("all", "", HONEY, h3) == 1
+    assert _count("all", "", INVALID, h2) == 2
+    assert _count("ip", "203.0.113.9", INVALID, h3) == 4
+    assert _count("ip", "", HONEY, h3) == 1
+    assert _count("user", "bob", INVALID, h2) == 2
+    assert HoneywordRollupWatermark.objects.get().last_event_id == HoneywordEvent.objects.order_by("-pk").first().pk
+
+
+@pytest.mark.django_db
+def test_rerun_is_incremental():
+    h = _hour(2)
+    _seed(h, 3)
+    assert roll_up(lag_seconds=0)[0] == 3
+    assert roll_up(lag_seconds=0)[0] == 0
+
+    _seed(h + timedelta(minutes=10), 2)
+    assert roll_up(lag_seconds=0)[0] == 2
+    assert _count("all", "", INVALID, h) == 5
+
+
+@pytest.mark.django_db
+def test_fold_statements_do_not_grow_with_keys():
+    h = _hour(2)
+    _seed(h, 1, username="u0", ip_address="192.0.2.0")
+    assert roll_up(lag_seconds=0)[0] == 1
+
+    HoneywordEvent.objects.bulk_create(
+        HoneywordEvent(created_at=h, outcome=INVALID, username=f"u{i}", ip_address=f"192.0.2.{i % 256}")
+        for i in range(600)
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        assert roll_up(lag_seconds=0)[0] == 600
+    assert len(ctx.captured_queries) < 20
+
+    assert _count("all", "", INVALID, h) == 601
+    assert _count("user", "u0", INVALID, h) == 2
+    assert _count("user", "u599", INVALID, h) == 1
+    assert _count("ip", "192.0.2.0", INVALID, h) == 4
+    assert _count("ip", "192.0.2.255", INVALID, h) == 2
+
+
+@pytest.mark.django_db
+def test_lag_window_defers_recent_events():
+    _seed(timezone.now() - timedelta(hours=1), 2)
+    _seed(timezone.now(), 1)
+
+    folded, _ = roll_up(lag_seconds=300)
+    assert folded == 2
+    assert roll_up(lag_seconds=0)[0] == 1
+
+
+@pytest.mark.django_db
+def test_dashboard_reads_rollups_only(admin_client):
+    _seed(_hour(1), 5)
+    _seed(_hour(1), 1, outcome=HONEY, username="alice")
+    roll_up(lag_seconds=0)
+    HoneywordEvent.objects.all().delete()
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = admin_client.get("/admin/django_honeywords/honeywordrollup/dashboard/")
+
+    assert response.status_code == 200
+    assert not any("honeywordevent" in q["sql"].lower() for q in ctx.captured_queries)
+    content = response.content.decode()
+    assert "203.0.113.9" in content
+    assert "alice" in content
+    assert response.context["rows"][0]["total"] == 6
+
+
+@pytest.mark.django_db
+def test_dashboard_requires_staff(client):
+    response = client.get("/admin/django_honeywords/honeywordrollup/dashboard/")
+    assert response.status_code == 302
+
+
+@pytest.mark.django_db
+def test_changelist_links_dashboard(admin_client):
+    response = admin_client.get("/admin/django_honeywords/honeywordrollup/")
+    assert response.status_code == 200
+    assert "/admin/django_honeywords/honeywordrollup/dashboard/" in response.content.decode()
@@ -0,0 +1,154 @@
+"""
+Tests for the cached policy gate (POLICY_CACHE):
+  - logins with a warm cache don't read HoneywordUserState
+  - negative entries for users without restrictions
+  - apply_lock / apply_reset write through; lock entries expire with the lock
+  - a gate miss never overwrites a lock written through meanwhile
+  - admin clear_lock / clear_reset invalidate
+"""
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import authenticate, get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from django_honeywords import policy_cache
+from django_honeywords.models import HoneywordUserState
+from django_honeywords.policy import apply_lock, apply_reset
+from tests.helpers import make_user
+
+
+@pytest.fixture(autouse=True)
+def cached_gate(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"POLICY_CACHE": True, "ON_HONEYWORD": "lock"}
+    cache.clear()
+    policy_cache._l1.clear()
+    yield
+    cache.clear()
+    policy_cache._l1.clear()
+
+
+def _state_queries(fn):
+    with CaptureQueriesContext(connection) as ctx:
+        result = fn()
+    table = HoneywordUserState._meta.db_table
+    return result, [q["sql"] for q in ctx.captured_queries if table in q["sql"]]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_cache_skips_state_reads():
+    u = make_user("cached")
+
+    user, queries = _state_queries(lambda: authenticate(username="cached", password="Secret123"))
+    assert user is not None
+    assert len(queries) == 1  # cold: one read, then a negative entry
+    assert cache.get(policy_cache._key(u.pk)) == policy_cache.NO_RESTRICTIONS
+
+    policy_cache._l1.clear()  # shared tier only
+    user, queries = _state_queries(lambda: authenticate(username="cached", password="Secret123"))
+    assert user is not None
+    assert queries == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_breach_lock_writes_through():
+    u = make_user("locked")
+    assert authenticate(username="locked", password="Secret123") is not None
+
+    assert authenticate(username="locked", password="h1") is None
+    locked_until, must_reset = cache.get(policy_cache._key(u.pk))
+    assert locked_until > timezone.now().timestamp()
+    assert must_reset is False
+
+    user, queries = _state_queries(lambda: authenticate(username="locked", password="Secret123"))
+    assert user is None
+    assert not any(q.lstrip().upper().startswith("SELECT") for q in queries)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reset_writes_through():
+    u = make_user("reset")
+    assert authenticate(username="reset", password="Secret123") is not None
+
+    apply_reset(u)
+    assert cache.get(policy_cache._key(u.pk)) == (None, True)
+    assert authenticate(username="reset", password="Secret123") is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_gate_fill_does_not_overwrite_concurrent_lock(monkeypatch):
+    u = make_user("racing")
+
+    # The gate reads "no row", then a breach elsewhere locks the user and
+    # writes its entry through before the gate fills the cache.
+    def stale_read(user):
+        apply_lock(u)
+        return None
+
+    monkeypatch.setattr(policy_cache, "peek_state", stale_read)
+    assert policy_cache.is_blocked(u) is True
+    locked_until, must_reset = cache.get(policy_cache._key(u.pk))
+    assert locked_until > timezone.now().timestamp()
+
+    policy_cache._l1.clear()
+    assert authenticate(username="racing", password="Secret123") is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_gate_fill_does_not_overwrite_concurrent_lock(monkeypatch):
+    u = make_user("aracing")
+
+    async def stale_read(user):
+        await sync_to_async(apply_lock)(u)
+        return None
+
+    monkeypatch.setattr(policy_cache, "apeek_state", stale_read)
+    assert async_to_sync(policy_cache.ais_blocked)(u) is True
+    assert cache.get(policy_cache._key(u.pk)) != policy_cache.NO_RESTRICTIONS
+
+
+def test_lock_entry_ttl_bounded_by_lock():
+    soon = (timezone.now() + timedelta(seconds=30)).timestamp()
+    assert 0 < policy_cache._ttl((soon, False)) <= 30
+    assert policy_cache._ttl((soon, True)) == 300
+    assert policy_cache._ttl(policy_cache.NO_RESTRICTIONS) == 300
+
+    state = HoneywordUserState(locked_until=timezone.now() - timedelta(seconds=1))
+    assert policy_cache.encode(state) == policy_cache.NO_RESTRICTIONS
+    assert policy_cache.encode(None) == policy_cache.NO_RESTRICTIONS
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("action", ["clear_lock", "clear_reset"])
+def test_admin_actions_invalidate(client, action):
+    User = get_user_model()
+    admin_user = User.objects.create_superuser("root", "root@example.com", "pw")
+    u = make_user("victim")
+    if action == "clear_lock":
+        apply_lock(u)
+    else:
+        apply_reset(u)
+    assert authenticate(username="victim", password="Secret123") is None
+
+    client.force_login(admin_user)
+    state = HoneywordUserState.objects.get(user=u)
+    response = client.post(
+        "/admin/django_honeywords/honeyworduserstate/",
+        {"action": action, "_selected_action": [state.pk]},
+    )
+    assert response.status_code == 302
+    assert cache.get(policy_cache._key(u.pk)) is None
+    assert authenticate(username="victim", password="Secret123") is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_disabled_by_default(settings):
+    settings.HONEYWORDS = {}
+    u = make_user("uncached")
+    assert authenticate(username="uncached", password="Secret123") is not None
+    assert cache.get(policy_cache._key(u.pk)) is None
@@ -0,0 +1,62 @@
+"""
+Tests for lazily created HoneywordUserState rows:
+  - logins and reads never create rows
+  - apply_lock / apply_reset create the row on first use
+  - honeywords_prune_state deletes only default rows
+"""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from django_honeywords.models import HoneywordUserState
+from django_honeywords.policy import apply_lock, apply_reset, get_state, is_locked
+
+
+def _users(*names):
+    User = get_user_model()
+    return [User.objects.create_user(username=n) for n in names]
+
+
+@pytest.mark.django_db
+def test_reads_do_not_create_rows():
+    (u,) = _users("reader")
+
+    state = get_state(u)
+    assert state.pk is None
+    assert state.must_reset is False
+    assert is_locked(u) is False
+    assert not HoneywordUserState.objects.exists()
+
+
+@pytest.mark.django_db
+def test_apply_creates_row_on_first_use():
+    a, b = _users("locked", "reset")
+
+    apply_lock(a)
+    apply_reset(b)
+
+    assert HoneywordUserState.objects.get(user=a).lock_count == 1
+    assert HoneywordUserState.objects.get(user=b).must_reset is True
+
+
+@pytest.mark.django_db
+def test_prune_deletes_only_default_rows():
+    users = _users(*[f"u{i}" for i in range(5)])
+    HoneywordUserState.objects.bulk_create(HoneywordUserState(user=u) for u in users[:3])
+    HoneywordUserState.objects.create(user=users[3], must_reset=True)
+    HoneywordUserState.objects.create(
+        user=users[4], lock_count=2, last_lock_at=timezone.now() - timedelta(days=1)
+    )
+
+    out = StringIO()
+    call_command("honeywords_prune_state", "--dry-run", stdout=out)
+    assert "3 default state row(s)" in out.getvalue()
+    assert HoneywordUserState.objects.count() == 5
+
+    call_command("honeywords_prune_state", "--batch-size", "2", stdout=out)
+    assert "Deleted 3" in out.getvalue()
+    assert set(HoneywordUserState.objects.values_list("user__username", flat=True)) == {"u3", "u4"}
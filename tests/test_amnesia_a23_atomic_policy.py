@@ -0,0 +1,125 @@
+"""
+Tests for single-statement apply_lock / apply_reset:
+  - one query per call, with or without an existing row
+  - escalation and cap match min(base * 2**lock_count, max)
+  - existing must_reset / lock history are preserved
+  - update-then-insert fallback for backends without upsert (lock and reset)
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from django_honeywords import policy
+from django_honeywords.models import HoneywordUserState
+from django_honeywords.policy import apply_lock, apply_reset
+
+
+def _user(name):
+    return get_user_model().objects.create_user(username=name)
+
+
+def _lock_seconds(state):
+    return (state.locked_until - state.last_lock_at).total_seconds()
+
+
+@pytest.mark.django_db
+def test_lock_is_one_query(django_assert_num_queries):
+    u = _user("one_query")
+    with django_assert_num_queries(1):
+        apply_lock(u)
+    with django_assert_num_queries(1):
+        apply_lock(u)
+    assert HoneywordUserState.objects.get(user=u).lock_count == 2
+
+
+@pytest.mark.django_db
+def test_reset_is_one_query(django_assert_num_queries):
+    u = _user("reset_once")
+    with django_assert_num_queries(1):
+        apply_reset(u)
+    with django_assert_num_queries(1):
+        apply_reset(u)
+    assert HoneywordUserState.objects.get(user=u).must_reset is True
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("upsert", [True, False])
+def test_escalation_and_cap(monkeypatch, upsert):
+    if not upsert:
+        monkeypatch.setattr(policy, "_supports_upsert", lambda connection: False)
+    u = _user(f"escalate_{upsert}")
+
+    durations = []
+    for _ in range(14):
+        apply_lock(u, base_seconds=1, max_seconds=600)
+        durations.append(_lock_seconds(HoneywordUserState.objects.get(user=u)))
+
+    assert durations == [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 600, 600, 600, 600]
+    assert HoneywordUserState.objects.get(user=u).lock_count == 14
+
+
+@pytest.mark.django_db
+def test_reset_without_upsert(monkeypatch):
+    monkeypatch.setattr(policy, "_supports_upsert", lambda connection: False)
+    created = _user("reset_fallback")
+    apply_reset(created)
+    assert HoneywordUserState.objects.get(user=created).must_reset is True
+
+    existing = _user("reset_existing")
+    HoneywordUserState.objects.create(user=existing, lock_count=2)
+    apply_reset(existing)
+    state = HoneywordUserState.objects.get(user=existing)
+    assert state.must_reset is True
+    assert state.lock_count == 2
+
+
+@pytest.mark.django_db
+def test_reset_without_upsert_loses_insert_race(monkeypatch):
+    monkeypatch.setattr(policy, "_supports_upsert", lambda connection: False)
+    u = _user("reset_race")
+    original = QuerySet.update
+    calls = []
+
+    # Another request creates the row between our UPDATE and INSERT.
+    def racing_update(self, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            HoneywordUserState.objects.create(user=u)
+            return 0
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(QuerySet, "update", racing_update)
+    apply_reset(u)
+    assert len(calls) == 2
+    assert HoneywordUserState.objects.get(user=u).must_reset is True
+
+
+@pytest.mark.django_db
+def test_lock_keeps_reset_and_reset_keeps_lock():
+    u = _user("both")
+    apply_reset(u)
+    apply_lock(u, base_seconds=60)
+    state = HoneywordUserState.objects.get(user=u)
+    assert state.must_reset is True
+    assert state.lock_count == 1
+
+    apply_reset(u)
+    state = HoneywordUserState.objects.get(user=u)
+    assert state.lock_count == 1
+    assert state.locked_until > timezone.now()
+
+
+@pytest.mark.django_db
+def test_lock_count_history_survives_expiry():
+    u = _user("history")
+    HoneywordUserState.objects.create(
+        user=u, lock_count=3, last_lock_at=timezone.now() - timedelta(days=1),
+        locked_until=timezone.now() - timedelta(hours=23),
+    )
+    apply_lock(u, base_seconds=10, max_seconds=3600)
+    state = HoneywordUserState.objects.get(user=u)
+    assert state.lock_count == 4
+    assert _lock_seconds(state) == 80
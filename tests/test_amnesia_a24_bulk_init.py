@@ -0,0 +1,137 @@
+"""
+Tests for amnesia_bulk_init:
+  - JSONL / CSV / stdin input, batched storage, unusable passwords
+  - unknown users and malformed records are counted, not fatal
+  - checkpoints let a run resume without redoing stored batches
+  - re-enrollment replaces existing sets
+"""
+import io
+import json
+
+import pytest
+from django.contrib.auth import authenticate, get_user_model
+from django.core.management import call_command
+
+from django_honeywords import enrollment
+from django_honeywords.models import AmnesiaCredential, AmnesiaSet
+
+
+@pytest.fixture
+def bulk_settings(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"AMNESIA_K": 5, "AMNESIA_P_MARK": 0.0, "AMNESIA_P_REMARK": 0.0}
+    return settings
+
+
+def _users(n):
+    User = get_user_model()
+    return [User.objects.create_user(username=f"user{i}") for i in range(n)]
+
+
+def _jsonl(tmp_path, records, name="users.jsonl"):
+    path = tmp_path / name
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    return str(path)
+
+
+def _run(*args, **kwargs):
+    out = io.StringIO()
+    call_command("amnesia_bulk_init", *args, "--workers", "0", stdout=out, stderr=io.StringIO(), **kwargs)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_jsonl_enrollment(bulk_settings, tmp_path, django_assert_max_num_queries):
+    _users(5)
+    path = _jsonl(tmp_path, [{"username": f"user{i}", "password": f"Pass-{i}x"} for i in range(5)])
+
+    # 2 batches: user lookup, delete, set insert, credential insert, password update (+ savepoints)
+    with django_assert_max_num_queries(2 * 8):
+        out = _run(path, "--batch-size", "3")
+
+    assert "Stored 5 set(s)" in out
+    assert AmnesiaSet.objects.count() == 5
+    assert AmnesiaCredential.objects.count() == 25
+    User = get_user_model()
+    assert not any(u.has_usable_password() for u in User.objects.all())
+    assert authenticate(username="user3", password="Pass-3x") is not None
+    assert authenticate(username="user3", password="Pass-4x") is None
+
+
+@pytest.mark.django_db
+def test_csv_and_packed(bulk_settings, tmp_path):
+    bulk_settings.HONEYWORDS = {**bulk_settings.HONEYWORDS, "AMNESIA_V2_ITERATIONS": 1000}
+    _users(2)
+    path = tmp_path / "users.csv"
+    path.write_text("username,password\nuser0,Alpha-11\nuser1,Bravo-22\n")
+
+    _run(str(path), "--algorithm", "amnesia_v2", "--storage", "packed")
+
+    assert AmnesiaSet.objects.filter(storage="packed").count() == 2
+    assert AmnesiaCredential.objects.count() == 0
+    assert authenticate(username="user1", password="Bravo-22") is not None
+
+
+@pytest.mark.django_db
+def test_stdin(bulk_settings, monkeypatch):
+    _users(1)
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"username": "user0", "password": "Stdin-123"}\n'))
+    _run("-")
+    assert authenticate(username="user0", password="Stdin-123") is not None
+
+
+@pytest.mark.django_db
+def test_bad_records_and_unknown_users(bulk_settings, tmp_path):
+    _users(1)
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        '{"username": "user0", "password": "Good-123"}\n'
+        "not json\n"
+        '{"username": "user9", "password": "Ghost-123"}\n'
+        '{"username": "user0"}\n'
+    )
+    out = _run(str(path))
+    assert "Stored 1 set(s); 1 unknown user(s), 2 invalid record(s)" in out
+
+
+@pytest.mark.django_db
+def test_checkpoint_resume(bulk_settings, tmp_path, monkeypatch):
+    _users(6)
+    path = _jsonl(tmp_path, [{"username": f"user{i}", "password": f"Pass-{i}x"} for i in range(6)])
+    checkpoint = str(tmp_path / "ckpt.json")
+
+    real_store = enrollment.store_batch
+    calls = []
+
+    def failing_store(prepared, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+        return real_store(prepared, **kwargs)
+
+    monkeypatch.setattr("django_honeywords.management.commands.amnesia_bulk_init.store_batch", failing_store)
+    with pytest.raises(RuntimeError):
+        _run(path, "--batch-size", "2", "--checkpoint", checkpoint)
+    assert enrollment.read_checkpoint(checkpoint)["records"] == 2
+    assert AmnesiaSet.objects.count() == 2
+
+    monkeypatch.setattr("django_honeywords.management.commands.amnesia_bulk_init.store_batch", real_store)
+    first_pks = set(AmnesiaSet.objects.values_list("pk", flat=True))
+    out = _run(path, "--batch-size", "2", "--checkpoint", checkpoint, "--resume")
+
+    assert "Resuming after record 2" in out
+    assert "Stored 6 set(s)" in out
+    assert AmnesiaSet.objects.count() == 6
+    assert first_pks <= set(AmnesiaSet.objects.values_list("pk", flat=True))
+
+
+@pytest.mark.django_db
+def test_reenrollment_replaces_sets(bulk_settings, tmp_path):
+    _users(1)
+    _run(_jsonl(tmp_path, [{"username": "user0", "password": "Old-1234"}], "a.jsonl"))
+    _run(_jsonl(tmp_path, [{"username": "user0", "password": "New-1234"}], "b.jsonl"))
+
+    assert AmnesiaSet.objects.count() == 1
+    assert AmnesiaCredential.objects.count() == 5
+    assert authenticate(username="user0", password="Old-1234") is None
+    assert authenticate(username="user0", password="New-1234") is not None
@@ -0,0 +1,138 @@
+"""
+Tests for hasher calibration (honeywords_calibrate, check W006):
+  - login / enrollment estimates scale with k and parallel lanes
+  - work-factor scaling per hasher family, and the largest k for a budget
+  - the command reports costs and recommendations
+  - W006 only when LOGIN_COST_BUDGET_MS is set and exceeded, and only with --deploy
+"""
+import io
+
+import pytest
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.checks import run_checks
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from django_honeywords import calibration
+from django_honeywords.calibration import Measurement, estimate, recommend, scale_params
+from django_honeywords.checks import honeywords_login_cost_check
+
+
+class SmallPBKDF2(PBKDF2PasswordHasher):
+    iterations = 2000
+
+
+def _ids(errors):
+    return {e.id for e in errors}
+
+
+def test_v1_estimate_counts_every_candidate(settings):
+    settings.HONEYWORDS = {}
+    est = estimate(Measurement("pbkdf2_sha256", {"iterations": 1000}, 10.0), k=20, algorithm_version="amnesia_v1")
+    assert est.login_worst_ms == 200.0
+    assert est.login_average_ms == 110.0
+    assert est.enroll_ms == 200.0
+
+
+def test_parallel_lanes_divide_latency(settings, monkeypatch):
+    monkeypatch.setattr(calibration.os, "cpu_count", lambda: 8)
+    settings.HONEYWORDS = {
+        "PARALLEL_VERIFY": True, "PARALLEL_VERIFY_MAX_WORKERS": 4,
+        "PARALLEL_INIT": True, "PARALLEL_INIT_MAX_WORKERS": 2,
+    }
+    est = estimate(Measurement("pbkdf2_sha256", {}, 10.0), k=20, algorithm_version="amnesia_v1")
+    assert (est.verify_lanes, est.init_lanes) == (4, 2)
+    assert est.login_worst_ms == 50.0
+    assert est.enroll_ms == 100.0
+
+
+def test_v2_login_is_one_derivation(settings):
+    settings.HONEYWORDS = {}
+    est = estimate(Measurement("amnesia_v2", {"iterations": 1000}, 10.0), k=20, algorithm_version="amnesia_v2")
+    assert est.login_worst_ms == est.login_average_ms == 10.0
+    assert est.enroll_ms == 200.0
+
+
+@pytest.mark.parametrize(
+    "params, factor, expected",
+    [
+        ({"iterations": 1_000_000}, 0.25, {"iterations": 250_000}),
+        ({"iterations": 600}, 0.5, {"iterations": 300}),
+        ({"time_cost": 4, "memory_cost": 65536}, 0.5, {"time_cost": 2, "memory_cost": 65536}),
+        ({"time_cost": 2, "memory_cost": 102400}, 0.25, {"time_cost": 1, "memory_cost": 51200}),
+        ({"rounds": 12}, 0.25, {"rounds": 10}),
+        ({"work_factor": 16384}, 0.3, {"work_factor": 4096}),
+        ({}, 0.5, None),
+    ],
+)
+def test_scale_params(params, factor, expected):
+    assert scale_params(params, factor) == expected
+
+
+def test_recommend_k_and_params(settings):
+    settings.HONEYWORDS = {}
+    m = Measurement("pbkdf2_sha256", {"iterations": 100_000}, 20.0)
+    est = estimate(m, k=20, algorithm_version="amnesia_v1")  # 400 ms worst case
+    rec = recommend(m, est, 100.0)
+    assert rec.params == {"iterations": 25_000}
+    assert rec.k == 5
+
+
+def test_measure_scales_iterations():
+    hasher = SmallPBKDF2()
+    m = calibration.measure("amnesia_v1", hasher=hasher, samples=1, max_iterations=1000)
+    assert m.algorithm == "pbkdf2_sha256"
+    assert m.params == {"iterations": 2000}
+    assert m.hash_ms > 0
+
+
+def test_command_reports_and_recommends(settings):
+    settings.HONEYWORDS = {"AMNESIA_V2_ITERATIONS": 1000}
+    out = io.StringIO()
+    call_command("honeywords_calibrate", "--algorithm", "amnesia_v2", "--k", "10",
+                 "--budget-ms", "0.0001", "--samples", "1", stdout=out)
+    text = out.getvalue()
+    assert "Hasher: amnesia_v2 (iterations=1000)" in text
+    assert "amnesia_v2, k=10" in text
+    assert "Over the" in text
+    assert "keep k=10: iterations=" in text
+
+
+def test_command_without_work_factor(settings):
+    settings.HONEYWORDS = {}
+    out = io.StringIO()
+    call_command("honeywords_calibrate", "--algorithm", "amnesia_v1", "--budget-ms", "1000",
+                 "--samples", "1", stdout=out)
+    text = out.getvalue()
+    assert "md5 has no work factor to tune" in text
+    assert "keep the hasher: k <=" in text
+
+
+def test_command_rejects_bad_k():
+    with pytest.raises(CommandError, match="--k"):
+        call_command("honeywords_calibrate", "--k", "1", stdout=io.StringIO())
+
+
+def test_w006_only_when_budget_exceeded(settings, monkeypatch):
+    settings.HONEYWORDS = {}
+    assert "django_honeywords.W006" not in _ids(honeywords_login_cost_check(None))
+
+    settings.HONEYWORDS = {"LOGIN_COST_BUDGET_MS": 100, "AMNESIA_K": 20}
+    monkeypatch.setattr(
+        calibration, "measure",
+        lambda algorithm_version, **kw: Measurement("pbkdf2_sha256", {"iterations": 1000}, 10.0),
+    )
+    assert "django_honeywords.W006" in _ids(honeywords_login_cost_check(None))
+
+    settings.HONEYWORDS = {"LOGIN_COST_BUDGET_MS": 500, "AMNESIA_K": 20}
+    assert "django_honeywords.W006" not in _ids(honeywords_login_cost_check(None))
+
+
+def test_w006_is_deploy_only(settings, monkeypatch):
+    settings.HONEYWORDS = {"LOGIN_COST_BUDGET_MS": 1}
+    measured = []
+    monkeypatch.setattr(calibration, "measure", lambda *a, **kw: measured.append(1) or Measurement("md5", {}, 10.0))
+
+    assert "django_honeywords.W006" not in _ids(run_checks())
+    assert measured == []
+    assert "django_honeywords.W006" in _ids(run_checks(include_deployment_checks=True))
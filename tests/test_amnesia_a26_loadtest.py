@@ -0,0 +1,133 @@
+"""
+Tests for the honeywords_loadtest command:
+  - login mix parsing and job generation
+  - nearest-rank percentiles
+  - seeded users authenticate with real passwords and are removed afterwards
+  - existing users matching --prefix stop the run (unless --yes) and are never touched
+"""
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from django_honeywords import loadgen
+from django_honeywords.models import AmnesiaSet, HoneywordEvent, HoneywordInvalidCounter
+from tests.helpers import make_user
+
+
+@pytest.fixture
+def load_settings(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"AMNESIA_P_MARK": 0.0, "AMNESIA_P_REMARK": 0.0}
+    return settings
+
+
+def test_parse_mix():
+    assert loadgen.parse_mix("real=80, honey=5,invalid=15") == {"real": 80.0, "honey": 5.0, "invalid": 15.0}
+    for bad in ("real", "admin=1", "real=x", "real=-1", "real=0"):
+        with pytest.raises(ValueError):
+            loadgen.parse_mix(bad)
+
+
+def test_percentile_nearest_rank():
+    ordered = [float(i) for i in range(1, 101)]
+    assert loadgen.percentile(ordered, 50) == 50.0
+    assert loadgen.percentile(ordered, 99) == 99.0
+    assert loadgen.percentile([3.0], 95) == 3.0
+    assert loadgen.percentile([], 50) == 0.0
+
+
+def test_build_jobs_follows_mix():
+    jobs = loadgen.build_jobs(300, users=10, k=5, prefix="p-", token="t", mix={"real": 1, "honey": 1}, seed=1)
+    kinds = {kind for kind, _, _ in jobs}
+    assert kinds == {"real", "honey"}
+    for kind, username, password in jobs:
+        i = int(username[2:])
+        if kind == "real":
+            assert password == f"t-{i}"
+        else:
+            assert password.startswith(f"t-{i}~")
+            assert 1 <= int(password.rsplit("~", 1)[1]) < 5
+
+
+@pytest.mark.django_db(transaction=True)
+def test_command_runs_mix_and_cleans_up(load_settings):
+    out = io.StringIO()
+    call_command(
+        "honeywords_loadtest", "--users", "5", "--requests", "40", "--concurrency", "2",
+        "--k", "4", "--mix", "real=3,honey=1,invalid=1", "--seed-workers", "0",
+        "--random-seed", "7", "--json", stdout=out,
+    )
+    report = json.loads(out.getvalue())
+    assert report["logins"] == 40
+    assert report["errors"] == {}
+    assert report["outcomes"]["real"]["rejected"] == 0
+    assert report["outcomes"]["invalid"]["accepted"] == 0
+    assert report["queries_per_login"] > 0
+    assert set(report["latency_ms"]) == {"p50", "p95", "p99", "max"}
+
+    User = get_user_model()
+    assert not User.objects.filter(username__startswith="honeywords-load-").exists()
+    assert not AmnesiaSet.objects.exists()
+    assert not HoneywordEvent.objects.filter(username__startswith="honeywords-load-").exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_keep_users(load_settings):
+    call_command(
+        "honeywords_loadtest", "--users", "3", "--requests", "3", "--concurrency", "1",
+        "--k", "3", "--seed-workers", "0", "--prefix", "lt-", "--keep-users", stdout=io.StringIO(),
+    )
+    seeded = get_user_model().objects.filter(username__startswith="lt-")
+    assert AmnesiaSet.objects.filter(user__in=seeded).count() == 3
+    assert not seeded.get(username__endswith="-0").has_usable_password()
+
+
+def test_rejects_bad_mix():
+    with pytest.raises(CommandError, match="--mix"):
+        call_command("honeywords_loadtest", "--mix", "real=0")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_existing_users_matching_prefix(load_settings):
+    alice = make_user("alice")
+    HoneywordEvent.objects.create(user=alice, username="alice", outcome=HoneywordEvent.OUTCOME_INVALID)
+    HoneywordInvalidCounter.objects.create(username="alice", ip_address="", bucket=alice.date_joined, count=1,
+                                           last_seen=alice.date_joined)
+    args = ["honeywords_loadtest", "--users", "3", "--requests", "6", "--concurrency", "1",
+            "--k", "3", "--seed-workers", "0", "--mix", "invalid=1", "--prefix", "a"]
+
+    with pytest.raises(CommandError, match="1 existing user"):
+        call_command(*args, stdout=io.StringIO())
+    assert get_user_model().objects.count() == 1
+
+    out = io.StringIO()
+    call_command(*args, "--yes", "--json", stdout=out)
+    report = json.loads(out.getvalue())
+    assert report["prefix"].startswith("a") and report["prefix"] != "a"
+
+    assert list(get_user_model().objects.values_list("username", flat=True)) == ["alice"]
+    assert AmnesiaSet.objects.filter(user=alice).exists()
+    assert list(HoneywordEvent.objects.values_list("username", flat=True)) == ["alice"]
+    assert list(HoneywordInvalidCounter.objects.values_list("username", flat=True)) == ["alice"]
+
+
+@pytest.mark.django_db
+def test_failed_seed_removes_its_users(load_settings, monkeypatch):
+    make_user("p-keep")
+    calls = []
+
+    def failing_store(prepared, **kwargs):
+        calls.append(prepared)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return real_store(prepared, **kwargs)
+
+    real_store = loadgen.store_batch
+    monkeypatch.setattr(loadgen, "store_batch", failing_store)
+    with pytest.raises(RuntimeError, match="disk full"):
+        loadgen.seed_users(4, prefix="p-", options={"k": 3}, batch_size=2)
+    assert list(get_user_model().objects.values_list("username", flat=True)) == ["p-keep"]
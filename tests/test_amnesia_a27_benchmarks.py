@@ -0,0 +1,68 @@
+"""
+Tests for the benchmark suite (benchmarks/suite.py):
+  - baseline comparison flags query increases, slowdowns past the tolerance
+    and configuration mismatches, and ignores noise below min_delta_ms
+  - the cases run against the test database and report query counts
+"""
+import pytest
+
+from benchmarks import suite
+
+CONFIG = {"hasher": "pbkdf2", "iterations": 1000, "k": 20}
+
+
+def _results(**cases):
+    return {
+        "config": dict(CONFIG),
+        "results": {name: {"median_ms": ms, "queries": q} for name, (ms, q) in cases.items()},
+    }
+
+
+def _compare(now, then, **kw):
+    kw.setdefault("tolerance", 0.3)
+    kw.setdefault("min_delta_ms", 0.1)
+    return suite.compare(now, then, **kw)
+
+
+def test_no_regressions():
+    baseline = _results(a=(10.0, 2), b=(1.0, 0))
+    assert _compare(_results(a=(12.0, 2), b=(0.5, 0), new=(99.0, 9)), baseline) == []
+
+
+def test_query_increase_is_a_regression():
+    problems = _compare(_results(a=(10.0, 3)), _results(a=(10.0, 2)), queries_only=True)
+    assert [(name, kind) for name, kind, _ in problems] == [("a", "queries")]
+
+
+def test_slowdown_past_tolerance():
+    problems = _compare(_results(a=(14.0, 2)), _results(a=(10.0, 2)))
+    assert [(name, kind) for name, kind, _ in problems] == [("a", "latency")]
+    assert "+40%" in problems[0][2]
+    assert _compare(_results(a=(14.0, 2)), _results(a=(10.0, 2)), queries_only=True) == []
+
+
+def test_small_absolute_slowdowns_ignored():
+    assert _compare(_results(a=(0.15, 0)), _results(a=(0.1, 0))) == []
+
+
+def test_config_mismatch():
+    now = _results(a=(10.0, 2))
+    now["config"]["k"] = 50
+    problems = _compare(now, _results(a=(10.0, 2)))
+    assert [kind for _, kind, _ in problems] == ["config"]
+
+
+@pytest.mark.django_db
+def test_cases_run(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"AMNESIA_V2_ITERATIONS": 1000}
+    names = {"check[amnesia_v2-invalid]", "check[amnesia_v1-success_remark]", "backend[real]", "log_event",
+             "generator[k=20,len=8]"}
+    cases = [c for c in suite.CASES if c.name in names]
+    assert len(cases) == len(names)
+
+    results = suite.run_cases(cases, suite.Context(k=4, iterations=1000), repeat=2, rounds=1)
+    assert results["check[amnesia_v2-invalid]"]["queries"] == 1
+    assert results["log_event"]["queries"] == 1
+    assert results["generator[k=20,len=8]"]["queries"] == 0
+    assert results["backend[real]"]["samples"] == 2
@@ -0,0 +1,168 @@
+"""
+Tests for the per-login timing collector (LOGIN_TIMING):
+  - phases, hash calls and query counts for each verdict
+  - attached to the request and sent with login_timed
+  - hash calls on the parallel verification pool are counted
+  - the async path reports the same breakdown
+  - the query counter is scoped to the login and nests in caller wrappers
+  - nothing is collected when disabled
+"""
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import aauthenticate, authenticate
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from django_honeywords import timing
+from django_honeywords.signals import login_timed
+from tests.helpers import make_user
+
+
+WORDS = ["Secret123", "h1", "h2", "h3", "h4"]
+
+
+@pytest.fixture
+def timed(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"LOGIN_TIMING": True, "ON_HONEYWORD": "lock"}
+    return settings
+
+
+@pytest.fixture
+def received():
+    timings = []
+
+    def receiver(sender, timing, request, **kwargs):
+        timings.append((timing, request))
+
+    login_timed.connect(receiver)
+    yield timings
+    login_timed.disconnect(receiver)
+
+
+def _request():
+    return RequestFactory().post("/login/")
+
+
+@pytest.mark.django_db
+def test_success_breakdown(timed, received):
+    make_user("alice")
+    request = _request()
+    with CaptureQueriesContext(connection) as ctx:
+        user = authenticate(request, username="alice", password="Secret123")
+    assert user is not None
+
+    t = request.honeywords_timing
+    assert received == [(t, request)]
+    assert t.username == "alice"
+    assert t.outcome == "success"
+    assert t.hash_calls == 1  # real password is the first candidate
+    assert t.queries == len(ctx.captured_queries)
+    assert {"user_lookup", "policy_gate", "load_candidates", "verify"} <= set(t.phases)
+    assert "remark" not in t.phases
+    assert sum(t.phases.values()) <= t.total_seconds
+    assert t.as_dict()["phases_ms"]["verify"] == t.phases["verify"] * 1000
+
+
+@pytest.mark.django_db
+def test_invalid_hashes_every_candidate(timed):
+    make_user("bob")
+    request = _request()
+    assert authenticate(request, username="bob", password="nope") is None
+    t = request.honeywords_timing
+    assert t.outcome == "invalid"
+    assert t.hash_calls == len(WORDS)
+    assert "event" in t.phases
+
+
+@pytest.mark.django_db
+def test_breach_times_policy_action(timed):
+    make_user("carol")
+    request = _request()
+    assert authenticate(request, username="carol", password="h2") is None
+    t = request.honeywords_timing
+    assert t.outcome == "breach"
+    assert {"event", "policy_action"} <= set(t.phases)
+
+    request = _request()
+    assert authenticate(request, username="carol", password="Secret123") is None
+    assert request.honeywords_timing.outcome == "blocked"
+    assert request.honeywords_timing.hash_calls == 0
+
+
+@pytest.mark.django_db
+def test_unknown_user(timed, received):
+    assert authenticate(None, username="nobody", password="x") is None
+    [(t, request)] = received
+    assert request is None
+    assert t.outcome == "unknown_user"
+    assert t.queries >= 1
+
+
+@pytest.mark.django_db
+def test_parallel_hashes_counted(timed):
+    timed.HONEYWORDS = {"LOGIN_TIMING": True, "PARALLEL_VERIFY": True, "PARALLEL_VERIFY_MAX_WORKERS": 3}
+    make_user("dave")
+    request = _request()
+    assert authenticate(request, username="dave", password="nope") is None
+    assert request.honeywords_timing.hash_calls == len(WORDS)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_breakdown(timed):
+    make_user("erin")
+    request = _request()
+    user = async_to_sync(aauthenticate)(request, username="erin", password="nope")
+    assert user is None
+    t = request.honeywords_timing
+    assert t.outcome == "invalid"
+    assert t.hash_calls == len(WORDS)
+    assert t.queries >= 2
+    assert {"user_lookup", "policy_gate", "load_candidates", "verify", "event"} <= set(t.phases)
+
+
+@pytest.mark.django_db
+def test_counter_nests_inside_caller_wrappers(timed):
+    make_user("gina")
+    seen = []
+
+    def outer(execute, sql, params, many, context):
+        seen.append(sql)
+        return execute(sql, params, many, context)
+
+    before = list(connection.execute_wrappers)
+    with connection.execute_wrapper(outer):
+        request = _request()
+        assert authenticate(request, username="gina", password="Secret123") is not None
+        assert connection.execute_wrappers == before + [outer]
+    assert connection.execute_wrappers == before
+    assert timing._count_query not in before
+    assert request.honeywords_timing.queries == len(seen)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_counter_removed_after_login(timed):
+    make_user("hank")
+
+    async def login_and_wrappers():
+        request = _request()
+        await aauthenticate(request, username="hank", password="nope")
+        return request, await sync_to_async(lambda: list(connection.execute_wrappers))()
+
+    request, wrappers = async_to_sync(login_and_wrappers)()
+    assert request.honeywords_timing.queries >= 2
+    assert timing._count_query not in wrappers
+
+
+@pytest.mark.django_db
+def test_disabled_collects_nothing(settings, received):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {}
+    make_user("frank")
+    request = _request()
+    assert authenticate(request, username="frank", password="Secret123") is not None
+    assert not hasattr(request, "honeywords_timing")
+    assert received == []
+    assert timing.current() is None
+    assert timing.phase("verify") is timing._NO_PHASE
@@ -0,0 +1,174 @@
+"""
+Tests for the metrics registry and exposition view (METRICS):
+  - counters and histograms render in Prometheus text format
+  - increments from many threads are not lost
+  - METRICS_DIR stores are summed across processes (including a forked one)
+  - logins feed verdict, policy action, KDF and latency metrics
+  - the view is 404 when disabled and honours METRICS_TOKEN
+"""
+import multiprocessing
+import os
+import re
+import threading
+
+import pytest
+from django.contrib.auth import authenticate
+from django.urls import reverse
+
+from django_honeywords import metrics
+from tests.helpers import make_user
+
+
+WORDS = ["Secret123", "h1", "h2", "h3"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def enabled(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"METRICS": True, "ON_HONEYWORD": "lock"}
+    return settings
+
+
+def _samples(text):
+    """{sample: value} from exposition text."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            out[key] = float(value)
+    return out
+
+
+def test_render_counters_and_histograms(enabled):
+    metrics.LOGIN_VERDICTS.inc("success")
+    metrics.LOGIN_VERDICTS.inc("success")
+    metrics.KDF_SECONDS.observe(0.003)
+    metrics.KDF_SECONDS.observe(0.2)
+    metrics.KDF_SECONDS.observe(99)
+
+    text = metrics.render()
+    assert "# TYPE honeywords_login_verdicts_total counter" in text
+    assert "# TYPE honeywords_kdf_seconds histogram" in text
+    s = _samples(text)
+    assert s['honeywords_login_verdicts_total{verdict="success"}'] == 2
+    assert s['honeywords_login_verdicts_total{verdict="breach"}'] == 0  # known verdicts always exposed
+    assert s['honeywords_kdf_seconds_bucket{le="0.0025"}'] == 0
+    assert s['honeywords_kdf_seconds_bucket{le="0.005"}'] == 1
+    assert s['honeywords_kdf_seconds_bucket{le="0.25"}'] == 2
+    assert s['honeywords_kdf_seconds_bucket{le="2.5"}'] == 2
+    assert s['honeywords_kdf_seconds_bucket{le="+Inf"}'] == 3
+    assert s["honeywords_kdf_seconds_count"] == 3
+    assert s["honeywords_kdf_seconds_sum"] == pytest.approx(99.203)
+
+
+def test_concurrent_increments(enabled):
+    def work():
+        for _ in range(1000):
+            metrics.POLICY_ACTIONS.inc("lock")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert _samples(metrics.render())['honeywords_policy_actions_total{action="lock"}'] == 8000
+
+
+def _child_observe(directory):
+    from django.conf import settings
+
+    settings.HONEYWORDS = {"METRICS": True, "METRICS_DIR": directory}
+    metrics.LOGIN_VERDICTS.inc("breach")
+    metrics.LOGIN_SECONDS.observe(0.02)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_file_store_sums_processes(enabled, tmp_path):
+    enabled.HONEYWORDS = {"METRICS": True, "METRICS_DIR": str(tmp_path)}
+    metrics.LOGIN_VERDICTS.inc("breach")
+    metrics.LOGIN_SECONDS.observe(0.02)
+
+    # The forked child inherits this process's store and must open its own file.
+    proc = multiprocessing.get_context("fork").Process(target=_child_observe, args=(str(tmp_path),))
+    proc.start()
+    proc.join()
+    assert proc.exitcode == 0
+    assert len(list(tmp_path.glob("honeywords-*.metrics"))) == 2
+
+    s = _samples(metrics.render())
+    assert s['honeywords_login_verdicts_total{verdict="breach"}'] == 2
+    assert s['honeywords_login_seconds_bucket{le="0.025"}'] == 2
+    assert s["honeywords_login_seconds_count"] == 2
+
+
+def test_file_store_grows_and_reopens(enabled, tmp_path):
+    enabled.HONEYWORDS = {"METRICS": True, "METRICS_DIR": str(tmp_path)}
+    for i in range(3000):  # enough keys to outgrow the initial mapping
+        metrics.POLICY_ACTIONS.inc(f"action-{i}")
+    metrics.POLICY_ACTIONS.inc("action-7", 2)
+
+    metrics.reset()  # same pid: reopens the existing file and keeps counting
+    metrics.POLICY_ACTIONS.inc("action-7")
+    s = _samples(metrics.render())
+    assert s['honeywords_policy_actions_total{action="action-7"}'] == 4
+    assert s['honeywords_policy_actions_total{action="action-2999"}'] == 1
+
+
+@pytest.mark.django_db
+def test_logins_feed_metrics(enabled):
+    make_user("alice", WORDS)
+    assert authenticate(None, username="alice", password="Secret123") is not None
+    assert authenticate(None, username="alice", password="nope") is None
+    assert authenticate(None, username="alice", password="h2") is None  # breach -> lock
+    assert authenticate(None, username="alice", password="Secret123") is None  # blocked
+    assert authenticate(None, username="nobody", password="x") is None
+
+    s = _samples(metrics.render())
+    verdicts = {v: s[f'honeywords_login_verdicts_total{{verdict="{v}"}}']
+                for v in ("success", "invalid", "breach", "blocked", "unknown_user")}
+    assert verdicts == {"success": 1, "invalid": 1, "breach": 1, "blocked": 1, "unknown_user": 1}
+    assert s['honeywords_policy_actions_total{action="lock"}'] == 1
+    assert s["honeywords_login_seconds_count"] == 5
+    assert s["honeywords_login_db_seconds_count"] == 5
+    # 4 enrollment hashes, then 1 + 4 + 3 on the three checked logins
+    assert s["honeywords_kdf_seconds_count"] == 12
+
+
+@pytest.mark.django_db
+def test_disabled_records_nothing(settings):
+    settings.HONEYWORDS = {}
+    make_user("bob", WORDS)
+    assert authenticate(None, username="bob", password="Secret123") is not None
+    assert metrics.get_store().collect() == {}
+
+
+def test_view(client, enabled):
+    metrics.LOGIN_VERDICTS.inc("invalid")
+    response = client.get(reverse("django_honeywords:metrics"))
+    assert response.status_code == 200
+    assert response["Content-Type"] == metrics.CONTENT_TYPE
+    assert 'honeywords_login_verdicts_total{verdict="invalid"} 1' in response.content.decode()
+    assert re.search(r"no-cache|max-age=0", response["Cache-Control"])
+    assert client.post(reverse("django_honeywords:metrics")).status_code == 405
+
+
+def test_view_disabled(client, settings):
+    settings.HONEYWORDS = {}
+    assert client.get(reverse("django_honeywords:metrics")).status_code == 404
+
+
+def test_view_token(client, enabled):
+    enabled.HONEYWORDS = {"METRICS": True, "METRICS_TOKEN": "s3cret"}
+    url = reverse("django_honeywords:metrics")
+    response = client.get(url)
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"] == "Bearer"
+    assert client.get(url, HTTP_AUTHORIZATION="Bearer wrong").status_code == 401
+    assert client.get(url, HTTP_AUTHORIZATION="Bearer s3cret").status_code == 200
@@ -0,0 +1,104 @@
+"""
+Tests for the amnesia_v2 (shared-salt) set format:
+  - success / breach / invalid verdicts
+  - one KDF per login regardless of k
+  - v1 sets keep verifying after switching AMNESIA_ALGORITHM
+  - re-initialization migrates a set between formats
+"""
+import pytest
+from django.contrib.auth import authenticate, get_user_model
+
+from django_honeywords import amnesia_service
+from django_honeywords.amnesia_service import (
+    amnesia_check,
+    amnesia_initialize,
+    amnesia_initialize_from_settings,
+)
+from django_honeywords.models import AmnesiaSet
+from tests.helpers import make_user
+
+
+WORDS = ["Secret123", "h1", "h2", "h3", "h4"]
+
+
+def _make_user(username, algorithm_version=AmnesiaSet.ALGORITHM_V2, words=WORDS):
+    return make_user(username, words, algorithm_version=algorithm_version, iterations=1000)
+
+
+@pytest.mark.django_db
+def test_v2_stores_shared_params():
+    u = _make_user("v2_params")
+    aset = u.amnesia_set
+
+    assert aset.algorithm_version == "amnesia_v2"
+    assert aset.iterations == 1000
+    assert len(aset.salt) >= 16
+    hashes = list(aset.credentials.values_list("password_hash", flat=True))
+    assert len(hashes) == 5
+    assert len(set(hashes)) == 5
+    # Digest only; the hasher parameters live on the set.
+    assert all("$" not in h for h in hashes)
+
+
+@pytest.mark.django_db
+def test_v2_verdicts():
+    u = _make_user("v2_verdicts")
+
+    assert amnesia_check(u, "Secret123") == "success"
+    assert amnesia_check(u, "h1") == "breach"
+    assert amnesia_check(u, "totally-wrong") == "invalid"
+
+
+@pytest.mark.django_db
+def test_v2_derives_once_per_login(monkeypatch):
+    words = ["Secret123"] + [f"h{i}" for i in range(1, 20)]
+    u = _make_user("v2_once", words=words)
+
+    calls = []
+    real_derive = amnesia_service._v2_derive
+
+    def counting(*args):
+        calls.append(args)
+        return real_derive(*args)
+
+    monkeypatch.setattr(amnesia_service, "_v2_derive", counting)
+    assert amnesia_check(u, "totally-wrong") == "invalid"
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_v1_sets_keep_verifying_under_v2_setting(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    settings.HONEYWORDS = {"AMNESIA_ALGORITHM": "amnesia_v2", "AMNESIA_V2_ITERATIONS": 1000}
+
+    _make_user("legacy", algorithm_version=AmnesiaSet.ALGORITHM_V1)
+
+    assert authenticate(username="legacy", password="Secret123") is not None
+    assert authenticate(username="legacy", password="h1") is None
+
+
+@pytest.mark.django_db
+def test_reinitialize_migrates_v1_to_v2(settings):
+    settings.HONEYWORDS = {
+        "AMNESIA_K": 5, "AMNESIA_P_MARK": 0.0, "AMNESIA_P_REMARK": 0.0,
+        "AMNESIA_ALGORITHM": "amnesia_v2", "AMNESIA_V2_ITERATIONS": 1000,
+    }
+    u = _make_user("upgrade", algorithm_version=AmnesiaSet.ALGORITHM_V1)
+
+    amnesia_initialize_from_settings(u, "NewPass2")
+
+    aset = AmnesiaSet.objects.get(user=u)
+    assert aset.algorithm_version == "amnesia_v2"
+    assert aset.iterations == 1000
+    assert aset.credentials.count() == 5
+    assert amnesia_check(u, "Secret123") == "invalid"
+    assert amnesia_check(u, "NewPass2") == "success"
+
+
+@pytest.mark.django_db
+def test_unknown_algorithm_rejected():
+    User = get_user_model()
+    u = User.objects.create_user(username="bad_algo")
+
+    with pytest.raises(ValueError, match="unknown algorithm_version"):
+        amnesia_initialize(u, "Secret123", k=5, algorithm_version="amnesia_v9")
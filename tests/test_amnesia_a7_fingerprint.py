@@ -0,0 +1,82 @@
+"""
+Tests for the peppered fingerprint prefilter:
+  - fingerprints stored at initialization when a pepper is configured
+  - invalid passwords skip check_password entirely on fingerprint miss
+  - only fingerprint-matching candidates are hashed
+  - sets without fingerprints (or with a different length) keep verifying
+"""
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_honeywords import amnesia_service
+from django_honeywords.amnesia_service import amnesia_check
+from tests.helpers import make_user
+
+
+@pytest.fixture
+def count_checks(monkeypatch):
+    calls = []
+    real_check = amnesia_service.check_password
+
+    def counting(password, encoded, *args, **kwargs):
+        calls.append(password)
+        return real_check(password, encoded, *args, **kwargs)
+
+    monkeypatch.setattr(amnesia_service, "check_password", counting)
+    return calls
+
+
+@pytest.mark.django_db
+def test_fingerprints_stored_when_pepper_set(settings):
+    settings.HONEYWORDS = {"FINGERPRINT_PEPPER": "pepper", "FINGERPRINT_LENGTH": 6}
+    u = make_user("fp_store")
+
+    fps = list(u.amnesia_set.credentials.values_list("fingerprint", flat=True))
+    assert all(len(fp) == 6 for fp in fps)
+    assert len(set(fps)) == 5
+
+
+@pytest.mark.django_db
+def test_no_fingerprints_without_pepper():
+    u = make_user("fp_none")
+    assert set(u.amnesia_set.credentials.values_list("fingerprint", flat=True)) == {""}
+
+
+@pytest.mark.django_db
+def test_prefilter_limits_hash_checks(settings, count_checks):
+    settings.HONEYWORDS = {"FINGERPRINT_PEPPER": "pepper", "FINGERPRINT_LENGTH": 16}
+    u = make_user("fp_filter")
+
+    assert amnesia_check(u, "totally-wrong") == "invalid"
+    assert count_checks == []
+
+    assert amnesia_check(u, "h3") == "breach"
+    assert amnesia_check(u, "Secret123") == "success"
+    assert count_checks == ["h3", "Secret123"]
+
+
+@pytest.mark.django_db
+def test_sets_without_fingerprints_fall_back_to_full_scan(settings, count_checks):
+    u = make_user("fp_legacy")
+    settings.HONEYWORDS = {"FINGERPRINT_PEPPER": "pepper"}
+
+    assert amnesia_check(u, "totally-wrong") == "invalid"
+    assert len(count_checks) == 5
+    assert amnesia_check(u, "Secret123") == "success"
+
+
+@pytest.mark.django_db
+def test_length_change_keeps_existing_fingerprints_valid(settings):
+    settings.HONEYWORDS = {"FINGERPRINT_PEPPER": "pepper", "FINGERPRINT_LENGTH": 4}
+    u = make_user("fp_resize")
+
+    settings.HONEYWORDS = {"FINGERPRINT_PEPPER": "pepper", "FINGERPRINT_LENGTH": 8}
+    assert amnesia_check(u, "Secret123") == "success"
+    assert amnesia_check(u, "h1") == "breach"
+
+
+@pytest.mark.django_db
+def test_invalid_fingerprint_length_rejected(settings):
+    settings.HONEYWORDS = {"FINGERPRINT_PEPPER": "pepper", "FINGERPRINT_LENGTH": 0}
+    with pytest.raises(ImproperlyConfigured):
+        make_user("fp_bad")
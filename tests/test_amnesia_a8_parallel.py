@@ -0,0 +1,173 @@
+"""
+Tests for parallel candidate verification:
+  - find_first returns the matching item (or None) and stops early
+  - a match wins over errors in other lanes; queued lanes run inline
+  - amnesia_check verdicts are unchanged with PARALLEL_VERIFY enabled
+  - candidate checks actually run on the shared pool
+  - map_ordered / PARALLEL_INIT hash new sets in order with identical results
+"""
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+
+from django_honeywords import amnesia_service
+from django_honeywords.amnesia_service import amnesia_check
+from django_honeywords.models import AmnesiaSet
+from django_honeywords.parallel import find_first, map_ordered, shutdown_pool
+from tests.helpers import make_user
+
+
+WORDS = ["Secret123"] + [f"h{i}" for i in range(1, 12)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    shutdown_pool()
+    yield
+    shutdown_pool()
+
+
+def test_find_first_returns_match():
+    assert find_first(lambda x: x == 7, list(range(20)), max_workers=4) == 7
+
+
+def test_find_first_returns_none_without_match():
+    assert find_first(lambda x: False, list(range(20)), max_workers=4) is None
+
+
+def test_find_first_single_lane_is_sequential():
+    seen = []
+    assert find_first(lambda x: seen.append(x) or x == 2, [0, 1, 2, 3], max_workers=1) == 2
+    assert seen == [0, 1, 2]
+
+
+def test_find_first_stops_remaining_work():
+    evaluated = []
+    lock = threading.Lock()
+
+    def slow(x):
+        with lock:
+            evaluated.append(x)
+        time.sleep(0.01)
+        return x == 0
+
+    assert find_first(slow, list(range(40)), max_workers=4) == 0
+    assert len(evaluated) < 40
+
+
+def test_find_first_propagates_errors():
+    def boom(x):
+        raise RuntimeError("hasher failed")
+
+    with pytest.raises(RuntimeError, match="hasher failed"):
+        find_first(boom, list(range(8)), max_workers=4)
+
+
+def test_find_first_match_wins_over_late_errors():
+    def check(x):
+        if x == 0:
+            return True
+        time.sleep(0.01)
+        raise RuntimeError("late lane failed")
+
+    assert find_first(check, list(range(8)), max_workers=4) == 0
+
+
+def test_find_first_runs_queued_lanes_inline_when_pool_busy(settings):
+    settings.HONEYWORDS = {"PARALLEL_POOL_SIZE": 1}
+    from django_honeywords.parallel import get_pool
+
+    release = threading.Event()
+    blocker = get_pool().submit(release.wait, 5)
+    try:
+        threads = set()
+        started = time.monotonic()
+        result = find_first(lambda x: threads.add(threading.current_thread().name) or x == 5,
+                            list(range(6)), max_workers=3)
+        elapsed = time.monotonic() - started
+    finally:
+        release.set()
+        blocker.result()
+    assert result == 5
+    assert threads == {threading.current_thread().name}
+    assert elapsed < 1
+
+
+@pytest.mark.django_db
+def test_parallel_verify_verdicts(settings, monkeypatch):
+    settings.HONEYWORDS = {"PARALLEL_VERIFY": True, "PARALLEL_POOL_SIZE": 4, "PARALLEL_VERIFY_MAX_WORKERS": 4}
+
+    u = make_user("par", WORDS)
+
+    threads = set()
+    real_check = amnesia_service.check_password
+
+    def recording(password, encoded, *args, **kwargs):
+        threads.add(threading.current_thread().name)
+        return real_check(password, encoded, *args, **kwargs)
+
+    monkeypatch.setattr(amnesia_service, "check_password", recording)
+
+    assert amnesia_check(u, "Secret123") == "success"
+    assert amnesia_check(u, "h11") == "breach"
+    assert amnesia_check(u, "totally-wrong") == "invalid"
+    assert any(name.startswith("honeywords") for name in threads)
+
+
+def test_map_ordered_preserves_order():
+    assert map_ordered(lambda x: x * x, list(range(23)), max_workers=4) == [x * x for x in range(23)]
+    assert map_ordered(lambda x: x, [], max_workers=4) == []
+
+
+def test_map_ordered_propagates_errors():
+    def boom(x):
+        if x == 5:
+            raise ValueError("boom")
+        return x
+
+    with pytest.raises(ValueError, match="boom"):
+        map_ordered(boom, list(range(10)), max_workers=3)
+
+
+def test_map_ordered_runs_queued_lanes_inline_when_pool_busy(settings):
+    settings.HONEYWORDS = {"PARALLEL_POOL_SIZE": 1}
+    from django_honeywords.parallel import get_pool
+
+    release = threading.Event()
+    blocker = get_pool().submit(release.wait, 5)
+    try:
+        threads = set()
+        result = map_ordered(lambda x: threads.add(threading.current_thread().name) or x, list(range(6)), max_workers=3)
+    finally:
+        release.set()
+        blocker.result()
+    assert result == list(range(6))
+    assert threads == {threading.current_thread().name}
+
+
+def _init(username, algorithm):
+    u = make_user(username, WORDS, algorithm_version=algorithm, iterations=1000)
+    return list(u.amnesia_set.credentials.order_by("index").values_list("password_hash", flat=True))
+
+
+@pytest.mark.django_db
+def test_parallel_init_v2_matches_sequential(settings, monkeypatch):
+    monkeypatch.setattr(amnesia_service, "get_random_string", lambda n: "fixed-salt-for-test-00")
+    sequential = _init("seq", AmnesiaSet.ALGORITHM_V2)
+
+    settings.HONEYWORDS = {"PARALLEL_INIT": True, "PARALLEL_INIT_MAX_WORKERS": 4}
+    parallel = _init("par", AmnesiaSet.ALGORITHM_V2)
+
+    assert parallel == sequential
+
+
+@pytest.mark.django_db
+def test_parallel_init_v1_keeps_order(settings):
+    settings.HONEYWORDS = {"PARALLEL_INIT": True, "PARALLEL_INIT_MAX_WORKERS": 4}
+    hashes = _init("par_v1", AmnesiaSet.ALGORITHM_V1)
+
+    assert [check_password(w, h) for w, h in zip(WORDS, hashes)] == [True] * len(WORDS)
+    assert amnesia_check(get_user_model().objects.get(username="par_v1"), WORDS[0]) == "success"
@@ -0,0 +1,123 @@
+"""
+Tests for the KDF concurrency limiter:
+  - slots are bounded and released
+  - full queue / timeout raise KDFSaturated and are counted
+  - a saturated limiter makes the backend fail fast with a throttled event
+  - a login takes one slot for all of its candidate hashes
+  - enrollment is not limited
+"""
+import threading
+
+import pytest
+from django.contrib.auth import authenticate
+
+from django_honeywords.amnesia_service import amnesia_check
+from django_honeywords.limiter import KDFLimiter, KDFSaturated, get_limiter
+from django_honeywords.models import HoneywordEvent
+from tests.helpers import make_user
+
+
+def test_limiter_counts_and_releases():
+    limiter = KDFLimiter(2)
+    with limiter.slot():
+        with limiter.slot():
+            assert limiter.stats()["inflight"] == 2
+    stats = limiter.stats()
+    assert stats["inflight"] == 0
+    assert stats["acquired"] == 2
+    assert stats["rejected"] == 0
+
+
+def test_limiter_rejects_when_queue_full():
+    limiter = KDFLimiter(1, max_queue=0)
+    with limiter.slot():
+        with pytest.raises(KDFSaturated, match="queue is full"):
+            limiter.acquire()
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_limiter_times_out():
+    limiter = KDFLimiter(1, timeout=0.01)
+    with limiter.slot():
+        with pytest.raises(KDFSaturated, match="no KDF slot"):
+            limiter.acquire()
+    stats = limiter.stats()
+    assert stats["rejected"] == 1
+    assert stats["wait_seconds_max"] >= 0.01
+    assert stats["max_queued"] == 1
+
+
+def test_limiter_hands_slot_to_waiter():
+    limiter = KDFLimiter(1, timeout=5)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def waiter():
+        with limiter.slot():
+            acquired.set()
+
+    t = threading.Thread(target=waiter)
+    t.start()
+    limiter.release()
+    t.join(timeout=5)
+    assert acquired.is_set()
+    assert limiter.stats()["acquired"] == 2
+
+
+def test_limiter_disabled_by_default():
+    assert get_limiter() is None
+
+
+@pytest.mark.django_db
+def test_saturated_limiter_throttles_login(settings):
+    settings.AUTHENTICATION_BACKENDS = ["django_honeywords.backend.HoneywordsBackend"]
+    make_user("flooded")
+    settings.HONEYWORDS = {"KDF_MAX_INFLIGHT": 1, "KDF_MAX_QUEUE": 0}
+
+    HoneywordEvent.objects.all().delete()
+    with get_limiter().slot():
+        assert authenticate(username="flooded", password="Secret123") is None
+
+    events = list(HoneywordEvent.objects.filter(username="flooded"))
+    assert [e.outcome for e in events] == ["throttled"]
+
+    # Capacity is back: the same login succeeds.
+    assert authenticate(username="flooded", password="Secret123") is not None
+
+
+@pytest.mark.django_db
+def test_amnesia_check_returns_throttled(settings):
+    u = make_user("throttled_check")
+    settings.HONEYWORDS = {"KDF_MAX_INFLIGHT": 1, "KDF_QUEUE_TIMEOUT": 0.01}
+
+    with get_limiter().slot():
+        assert amnesia_check(u, "Secret123") == "throttled"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("parallel", [False, True])
+def test_one_admission_per_login(settings, parallel):
+    u = make_user(f"admitted_{parallel}")
+    settings.HONEYWORDS = {
+        "KDF_MAX_INFLIGHT": 1, "KDF_MAX_QUEUE": 0,
+        "PARALLEL_VERIFY": parallel, "PARALLEL_VERIFY_MAX_WORKERS": 3,
+    }
+    limiter = get_limiter()
+    limiter.reset_stats()
+
+    # All five candidates are hashed under a single slot; with the only slot
+    # held per hash, the parallel lanes would have been rejected.
+    assert amnesia_check(u, "wrong") == "invalid"
+    stats = limiter.stats()
+    assert stats["acquired"] == 1
+    assert stats["rejected"] == 0
+    assert stats["inflight"] == 0
+
+
+@pytest.mark.django_db
+def test_enrollment_ignores_saturated_limiter(settings):
+    settings.HONEYWORDS = {"KDF_MAX_INFLIGHT": 1, "KDF_MAX_QUEUE": 0}
+    with get_limiter().slot():
+        u = make_user("signup_during_flood")
+    assert u.amnesia_set.k == 5
+    assert get_limiter().stats()["rejected"] == 0